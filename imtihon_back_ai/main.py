@@ -1,9 +1,11 @@
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse
 from routes.websocket_main import router as websocket_router
+from routes.proctoring_feed import router as proctoring_feed_router
 
 app = FastAPI()
 app.include_router(websocket_router)
+app.include_router(proctoring_feed_router)
 
 
 @app.get("/")
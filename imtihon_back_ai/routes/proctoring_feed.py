@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+
+import redis.asyncio as aioredis
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# same Redis server and secret as the Django app (core/events.py, students/feed.py)
+REDIS_URL = os.environ.get("REDIS_URL", "redis://redis:6379/0")
+FEED_SECRET = os.environ.get("PROCTORING_FEED_SECRET", "")
+if not FEED_SECRET:
+    raise RuntimeError("PROCTORING_FEED_SECRET is not set")
+CHANNEL_PREFIX = "proctoring:assignment:"
+
+QUEUE_SIZE = 256  # events buffered per observer before it has to resync
+HEARTBEAT_SECONDS = 25  # below nginx's 60s proxy_read_timeout
+
+RESYNC = json.dumps({"type": "resync"})
+PING = json.dumps({"type": "ping"})
+
+
+def verify_ticket(ticket):
+    """assignment id of a valid, unexpired ticket issued by Django, else None."""
+    try:
+        assignment_id, user_id, expires, signature = ticket.split(".")
+        expired = int(expires) < time.time()
+    except ValueError:
+        return None
+    message = f"{assignment_id}.{user_id}.{expires}"
+    expected = hmac.new(
+        FEED_SECRET.encode(), message.encode(), hashlib.sha256
+    ).hexdigest()
+    if expired or not hmac.compare_digest(signature, expected):
+        return None
+    return int(assignment_id)
+
+
+class FeedHub:
+    """
+    One Redis pattern subscription per worker process, fanned out to the
+    sockets of that process. Observers cost a queue each, not a Redis
+    connection or a database query.
+    """
+
+    def __init__(self):
+        self.observers = defaultdict(set)
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            try:
+                client = aioredis.from_url(REDIS_URL)
+                async with client.pubsub() as pubsub:
+                    await pubsub.psubscribe(CHANNEL_PREFIX + "*")
+                    async for message in pubsub.listen():
+                        if message["type"] == "pmessage":
+                            self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("proctoring feed: redis connection lost: %s", e)
+                # events were missed while disconnected
+                for queues in self.observers.values():
+                    for queue in queues:
+                        self._force_resync(queue)
+                await asyncio.sleep(1)
+
+    def _dispatch(self, channel, data):
+        assignment_id = int(channel.decode().rsplit(":", 1)[1])
+        for queue in self.observers.get(assignment_id, ()):
+            try:
+                queue.put_nowait(data.decode())
+            except asyncio.QueueFull:
+                self._force_resync(queue)
+
+    @staticmethod
+    def _force_resync(queue):
+        # a slow observer gets one "resync" instead of a backlog; it reloads
+        # the sessions endpoint once and continues from the live events
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC)
+
+    def add(self, assignment_id):
+        self.start()
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.observers[assignment_id].add(queue)
+        return queue
+
+    def remove(self, assignment_id, queue):
+        self.observers[assignment_id].discard(queue)
+        if not self.observers[assignment_id]:
+            del self.observers[assignment_id]
+
+
+hub = FeedHub()
+
+
+@router.websocket("/imtihon/ai/proctoring/ws")
+async def proctoring_feed(websocket: WebSocket, ticket: str = Query(...)):
+    assignment_id = verify_ticket(ticket)
+    if assignment_id is None:
+        await websocket.close(code=1008)  # policy violation
+        return
+
+    await websocket.accept()
+    queue = hub.add(assignment_id)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                event = PING
+            await websocket.send_text(event)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        hub.remove(assignment_id, queue)
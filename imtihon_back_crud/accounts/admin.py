@@ -98,7 +98,7 @@ class UniversityUrlsUnfoldAdmin(ModelAdmin):
         return redirect("..")
 
 
-from .models import APIKey
+from .models import APIKey, RosterImportModel
 
 
 @admin.register(APIKey)
@@ -106,3 +106,24 @@ class APIKeyAdmin(ModelAdmin):
     list_display = ("name", "key", "is_active", "created_at", "last_used_at")
     readonly_fields = ("key", "created_at", "last_used_at")
     search_fields = ("name", "key")
+
+
+@admin.register(RosterImportModel)
+class RosterImportAdmin(ModelAdmin):
+    list_display = (
+        "id",
+        "university",
+        "group",
+        "source",
+        "status",
+        "processed",
+        "total",
+        "created",
+        "created_at",
+    )
+    list_filter = ("status", "source")
+    list_select_related = ("university", "group")
+    # the queued input (rows, token) stays hidden: it holds credentials
+    readonly_fields = [
+        field.name for field in RosterImportModel._meta.fields if field.editable
+    ]
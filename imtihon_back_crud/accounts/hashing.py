@@ -0,0 +1,46 @@
+# hashing.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+# below this many passwords starting worker processes costs more than it saves
+POOL_THRESHOLD = 64
+
+
+def _init_worker():
+    # spawned / forkserver children start without Django configured
+    import django
+
+    django.setup()
+
+
+def _hash_chunk(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def hash_passwords(passwords):
+    """
+    make_password() for each item, keeping order; ``None`` gives an unusable
+    password. PBKDF2 is CPU bound, so many real passwords are split over
+    processes; unusable ones are cheap and made inline.
+    """
+    passwords = list(passwords)
+    real = [i for i, password in enumerate(passwords) if password is not None]
+    workers = getattr(settings, "PASSWORD_HASH_WORKERS", None) or os.cpu_count() or 1
+    if workers < 2 or len(real) < POOL_THRESHOLD:
+        return _hash_chunk(passwords)
+
+    hashed = _hash_chunk(None for _ in passwords)
+    size = -(-len(real) // workers)
+    chunks = [
+        [passwords[i] for i in real[start : start + size]]
+        for start in range(0, len(real), size)
+    ]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        results = (value for chunk in pool.map(_hash_chunk, chunks) for value in chunk)
+        for i, value in zip(real, results):
+            hashed[i] = value
+    return hashed
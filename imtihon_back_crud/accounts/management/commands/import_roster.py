@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import RosterImportModel
+from accounts.roster import RosterError, csv_rows, hemis_rows, import_roster
+from university.models import GroupModel, UniversityModel
+
+
+class Command(BaseCommand):
+    help = "Bulk import students of a university (or one group) from CSV or HEMIS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("university_id", type=int)
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument("--csv", help="path to a roster CSV (UTF-8)")
+        source.add_argument("--hemis-token", help="HEMIS API token of the university")
+        parser.add_argument("--group", type=int, help="put every student into this group")
+
+    def handle(self, *args, **options):
+        try:
+            university = UniversityModel.objects.get(pk=options["university_id"])
+        except UniversityModel.DoesNotExist:
+            raise CommandError("University not found.")
+        group = None
+        if options["group"]:
+            group = GroupModel.objects.filter(
+                pk=options["group"], university=university
+            ).first()
+            if group is None:
+                raise CommandError("Group not found in this university.")
+
+        job = RosterImportModel.objects.create(
+            university=university,
+            group=group,
+            source="csv" if options["csv"] else "hemis",
+        )
+        try:
+            if options["csv"]:
+                with open(options["csv"], encoding="utf-8") as f:
+                    rows = list(csv_rows(f.read()))
+                job.total = len(rows)
+                job.save(update_fields=["total"])
+            else:
+                rows = hemis_rows(job, options["hemis_token"])
+        except (OSError, RosterError) as e:
+            job.delete()
+            raise CommandError(str(e))
+
+        def progress(job):
+            total = f"/{job.total}" if job.total else ""
+            self.stdout.write(
+                f"{job.processed}{total} rows, {job.created} created, "
+                f"{job.linked} group links"
+            )
+
+        import_roster(job, rows, progress=progress)
+        for error in job.errors[:20]:
+            self.stdout.write(self.style.WARNING(str(error)))
+        if job.status == "failed":
+            raise CommandError(f"Import {job.id} failed after {job.processed} rows.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Import {job.id} done: {job.created} students created, "
+                f"{len(job.errors)} rows with errors."
+            )
+        )
@@ -0,0 +1,68 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Q
+
+from accounts.models import RosterImportModel
+from accounts.roster import run_import
+
+# jobs queued through the API carry their input; those of the import_roster
+# command run inside that command and are left to it
+QUEUED = Q(rows__isnull=False) | ~Q(token="")
+
+
+class Command(BaseCommand):
+    help = (
+        "Run roster imports queued through the API. With --watch it is the "
+        "importer process and keeps picking up imports as they are queued."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="run until stopped; run one such process per deployment",
+        )
+
+    def handle(self, *args, **options):
+        if options["watch"]:
+            # the job table is the queue: the API leaves jobs "pending".
+            # "running" at startup was cut off by a stop or crash of this
+            # process, the only one importing; imports can be rerun, so it
+            # is queued again
+            recovered = RosterImportModel.objects.filter(
+                QUEUED, status="running"
+            ).update(status="pending", processed=0, linked=0, errors=[])
+            if recovered:
+                self.stdout.write(f"Requeued {recovered} interrupted imports.")
+
+        while True:
+            close_old_connections()
+            job_id = self.claim_next()
+            if job_id is None:
+                if not options["watch"]:
+                    break
+                time.sleep(settings.ROSTER_IMPORT_POLL_SECONDS)
+                continue
+            job = run_import(job_id)
+            message = (
+                f"Import {job.id} {job.status}: {job.processed} rows, "
+                f"{job.created} students created, {len(job.errors)} errors."
+            )
+            style = self.style.SUCCESS if job.status == "done" else self.style.WARNING
+            self.stdout.write(style(message))
+
+    def claim_next(self):
+        """Oldest pending job, marked running; None when there is none."""
+        for job_id in (
+            RosterImportModel.objects.filter(QUEUED, status="pending")
+            .order_by("id")
+            .values_list("id", flat=True)[:10]
+        ):
+            if RosterImportModel.objects.filter(pk=job_id, status="pending").update(
+                status="running"
+            ):
+                return job_id
+        return None
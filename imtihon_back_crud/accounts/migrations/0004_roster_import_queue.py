@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_roster_import'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rosterimportmodel',
+            name='rows',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='rosterimportmodel',
+            name='token',
+            field=models.CharField(blank=True, editable=False, max_length=512),
+        ),
+    ]
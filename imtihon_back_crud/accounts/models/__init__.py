@@ -1,2 +1,3 @@
 from .university_settings import UniversityUrlsModel
 from .service_keys import APIKey
+from .roster_import import RosterImportModel
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import models
+
+from university.models import GroupModel, UniversityModel
+
+
+class RosterImportModel(models.Model):
+    SOURCE_CHOICES = [
+        ("csv", "CSV upload"),
+        ("hemis", "HEMIS API"),
+    ]
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    university = models.ForeignKey(
+        UniversityModel, on_delete=models.CASCADE, related_name="roster_imports"
+    )
+    # every imported student is put into this group when set
+    group = models.ForeignKey(
+        GroupModel,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="roster_imports",
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+
+    total = models.PositiveIntegerField(null=True, blank=True)
+    processed = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    linked = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+
+    # input of a queued job for the importer process (manage.py
+    # run_roster_imports): parsed CSV rows or the HEMIS token, cleared when
+    # the job finishes since rows may carry passwords
+    rows = models.JSONField(null=True, blank=True, editable=False)
+    token = models.CharField(max_length=512, blank=True, editable=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.university} {self.source} import ({self.status})"
@@ -1,9 +1,13 @@
+from asgiref.sync import sync_to_async
 from django.db import models
 import requests
+from core import http_client
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError
 from university.models import UniversityModel
 
+UNIVERSITY_LIST_URL = "https://student.hemis.uz/rest/v1/public/university-list"
+
 
 class UniversityUrlsModel(models.Model):
     university = models.ForeignKey(
@@ -25,61 +29,77 @@ class UniversityUrlsModel(models.Model):
     @classmethod
     def fetch_and_save_from_api(cls, url: str):
         try:
-            response = requests.get(
-                "https://student.hemis.uz/rest/v1/public/university-list"
-            )
+            response = http_client.get(UNIVERSITY_LIST_URL)
+            response.raise_for_status()
+            return cls.save_university_list(response.json().get("data", []))
+        except requests.RequestException as e:
+            return {"status": "http_error", "error": str(e)}
+        except Exception as e:
+            return {"status": "unknown_error", "error": str(e)}
+
+    @classmethod
+    async def afetch_and_save_from_api(cls, url: str):
+        """fetch_and_save_from_api for async views: the download does not
+        hold a thread, the upserts run in one."""
+        try:
+            response = await http_client.aget(UNIVERSITY_LIST_URL)
             response.raise_for_status()
             data = response.json().get("data", [])
-            print(data)
+        except http_client.ASYNC_REQUEST_ERRORS as e:
+            return {"status": "http_error", "error": str(e)}
+        except Exception as e:
+            return {"status": "unknown_error", "error": str(e)}
+        try:
+            return await sync_to_async(cls.save_university_list)(data)
+        except Exception as e:
+            return {"status": "unknown_error", "error": str(e)}
 
-            def is_valid_url(url):
-                if not url:
-                    return False
-                validator = URLValidator()
-                try:
-                    validator(url)
-                    return True
-                except ValidationError:
-                    return False
+    @classmethod
+    def save_university_list(cls, data):
+        def is_valid_url(url):
+            if not url:
+                return False
+            validator = URLValidator()
+            try:
+                validator(url)
+                return True
+            except ValidationError:
+                return False
 
-            filtered_data = [
-                item
-                for item in data
-                if is_valid_url(item.get("api_url"))
-                and is_valid_url(item.get("student_url"))
-                and is_valid_url(item.get("employee_url"))
-            ]
+        filtered_data = [
+            item
+            for item in data
+            if is_valid_url(item.get("api_url"))
+            and is_valid_url(item.get("student_url"))
+            and is_valid_url(item.get("employee_url"))
+        ]
 
-            created, updated = 0, 0
-            errors = []
-            for item in filtered_data:
-                try:
-                    university, _ = UniversityModel.objects.get_or_create(
-                        name=item["name"]
-                    )
-                    obj, created_flag = cls.objects.update_or_create(
-                        code=item["code"],
-                        defaults={
-                            "api_url": item["api_url"],
-                            "student_url": item["student_url"],
-                            "employee_url": item["employee_url"],
-                            "university": university,
-                        },
-                    )
-                    if created_flag:
-                        created += 1
-                    else:
-                        updated += 1
-                except Exception as e:
-                    errors.append({"code": item.get("code"), "error": str(e)})
+        created, updated = 0, 0
+        errors = []
+        for item in filtered_data:
+            try:
+                university, _ = UniversityModel.objects.get_or_create(
+                    name=item["name"]
+                )
+                obj, created_flag = cls.objects.update_or_create(
+                    code=item["code"],
+                    defaults={
+                        "api_url": item["api_url"],
+                        "student_url": item["student_url"],
+                        "employee_url": item["employee_url"],
+                        "university": university,
+                    },
+                )
+                if created_flag:
+                    created += 1
+                else:
+                    updated += 1
+            except Exception as e:
+                errors.append({"code": item.get("code"), "error": str(e)})
 
-            return {
-                "status": "success" if not errors else "partial_success",
-                "created": created,
-                "updated": updated,
-                "errors": errors,
-            }
-        except requests.RequestException as e:
-            return {"status": "http_error", "error": str(e)}
-        except Exception as e:
-            return {"status": "unknown_error", "error": str(e)}
+        return {
+            "status": "success" if not errors else "partial_success",
+            "created": created,
+            "updated": updated,
+            "errors": errors,
+        }
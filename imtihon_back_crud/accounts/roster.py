@@ -0,0 +1,310 @@
+# roster.py
+
+import csv
+import datetime
+import io
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.hashing import hash_passwords
+from accounts.models import RosterImportModel, UniversityUrlsModel
+from core import http_client
+from core.principal import PROFILE_RELATIONS
+from students.dashboard import invalidate_dashboard
+from students.models import StudentProfileModel, StudentsGroupModel
+from university.models import DepartmentModel, FacultyModel, GroupModel
+
+HEMIS_PAGE_SIZE = 200
+# row errors kept on the job; a bad file should not bloat the row
+MAX_REPORTED_ERRORS = 500
+
+PROFILE_FIELDS = (
+    "first_name",
+    "second_name",
+    "third_name",
+    "full_name",
+    "short_name",
+    "image_url",
+    "birth_date",
+    "passport_pin",
+    "passport_number",
+    "email",
+    "phone",
+    "gender_code",
+    "gender_name",
+    "department",
+)
+
+
+class RosterError(Exception):
+    pass
+
+
+def csv_rows(text):
+    """
+    Rows of an uploaded roster. Only ``student_id_number`` is required;
+    ``group`` names an existing group of the university and ``password`` sets
+    an initial local password (students otherwise sign in through HEMIS).
+    """
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+    if not reader.fieldnames or "student_id_number" not in reader.fieldnames:
+        raise RosterError("CSV must have a student_id_number column.")
+    for line in reader:
+        row = {key: (value or "").strip() for key, value in line.items() if key}
+        if not row.get("first_name"):
+            row["first_name"] = row.get("full_name", "").split(" ")[0]
+        yield row
+
+
+def _hemis_row(item):
+    birth_ts = item.get("birth_date")
+    gender = item.get("gender") or {}
+    return {
+        "student_id_number": str(item.get("student_id_number") or ""),
+        "first_name": item.get("first_name", ""),
+        "second_name": item.get("second_name", ""),
+        "third_name": item.get("third_name", ""),
+        "full_name": item.get("full_name", ""),
+        "short_name": item.get("short_name", ""),
+        "image_url": item.get("image", ""),
+        "birth_date": (
+            datetime.datetime.fromtimestamp(birth_ts, datetime.UTC).date()
+            if isinstance(birth_ts, int)
+            else None
+        ),
+        "passport_pin": item.get("passport_pin", ""),
+        "passport_number": item.get("passport_number", ""),
+        "email": item.get("email", ""),
+        "phone": item.get("phone", ""),
+        "gender_code": gender.get("code", ""),
+        "gender_name": gender.get("name", ""),
+        "department": (item.get("specialty") or {}).get("name"),
+        "group": (item.get("group") or {}).get("name", ""),
+        "faculty_data": item.get("faculty"),
+        "specialty_data": item.get("specialty"),
+    }
+
+
+def hemis_rows(job, token):
+    """
+    Students of ``job.university`` from the HEMIS ``data/student-list``
+    endpoint, page by page. Sets ``job.total`` from the first page.
+    """
+    try:
+        urls = UniversityUrlsModel.objects.get(university=job.university)
+    except UniversityUrlsModel.DoesNotExist:
+        raise RosterError("The university has no HEMIS API configured.")
+    except UniversityUrlsModel.MultipleObjectsReturned:
+        urls = UniversityUrlsModel.objects.filter(university=job.university).first()
+
+    url = urls.api_url.rstrip("/") + "/data/student-list"
+    headers = {"Authorization": f"Bearer {token}"}
+    page = 1
+    while True:
+        resp = http_client.get(
+            url,
+            params={"page": page, "limit": HEMIS_PAGE_SIZE},
+            headers=headers,
+            breaker_key=f"university:{urls.code}",
+        )
+        if not resp.ok or not resp.json().get("success"):
+            raise RosterError(f"HEMIS returned {resp.status_code} on page {page}.")
+        data = resp.json()["data"]
+        pagination = data.get("pagination") or {}
+        if page == 1 and pagination.get("totalCount") is not None:
+            RosterImportModel.objects.filter(pk=job.pk).update(
+                total=pagination["totalCount"]
+            )
+        for item in data.get("items", []):
+            row = _hemis_row(item)
+            # a group import keeps only that group's students
+            if job.group_id is None or row["group"] == job.group.name:
+                yield row
+        if page >= pagination.get("pageCount", page):
+            break
+        page += 1
+
+
+class GroupResolver:
+    """Maps a row to a GroupModel, creating HEMIS faculties/groups once each."""
+
+    def __init__(self, university, group=None):
+        self.university = university
+        self.group = group
+        self._groups = {}
+
+    def __call__(self, row):
+        if self.group is not None:
+            return self.group
+        name = row.get("group")
+        if not name:
+            return None
+        faculty, specialty = row.get("faculty_data"), row.get("specialty_data")
+        key = (
+            name,
+            (faculty or {}).get("code"),
+            (specialty or {}).get("code"),
+        )
+        if key not in self._groups:
+            self._groups[key] = self._resolve(name, faculty, specialty)
+        return self._groups[key]
+
+    def _resolve(self, name, faculty, specialty):
+        if faculty and specialty:
+            # same get_or_create chain ExternalLoginView uses on first login
+            faculty_obj, _ = FacultyModel.objects.get_or_create(
+                code=faculty.get("code", ""),
+                university=self.university,
+                defaults={"name": faculty.get("name", "")},
+            )
+            department_obj, _ = DepartmentModel.objects.get_or_create(
+                code=specialty.get("code", ""),
+                faculty=faculty_obj,
+                defaults={"name": specialty.get("name", "")},
+            )
+            group, _ = GroupModel.objects.get_or_create(
+                name=name, university=self.university, department=department_obj
+            )
+            return group
+        return GroupModel.objects.filter(
+            university=self.university, name=name
+        ).first()
+
+
+def _import_batch(job, rows, resolve_group):
+    """Create missing users/profiles and group links for one batch of rows."""
+    User = get_user_model()
+    errors, by_number = [], {}
+    for position, row in rows:
+        number = row.get("student_id_number")
+        if not number:
+            errors.append({"row": position, "error": "student_id_number is empty"})
+            continue
+        by_number[number] = row  # a repeated number: last row wins
+
+    existing = StudentProfileModel.objects.in_bulk(
+        list(by_number), field_name="student_id_number"
+    )
+    for number, profile in list(existing.items()):
+        if profile.university_id != job.university_id:
+            errors.append(
+                {"student_id_number": number, "error": "enrolled at another university"}
+            )
+            del existing[number], by_number[number]
+    new_rows = [row for number, row in by_number.items() if number not in existing]
+    usernames = [row["student_id_number"] for row in new_rows]
+    # a login of that name already acts as a student, professor or owner; a
+    # student profile on it would give the account a second role
+    has_role = Q()
+    for relation in PROFILE_RELATIONS:
+        has_role |= Q(**{f"{relation}__isnull": False})
+    taken = set(
+        User.objects.filter(has_role, username__in=usernames).values_list(
+            "username", flat=True
+        )
+    )
+    for number in taken:
+        errors.append({"student_id_number": number, "error": "username is taken"})
+        del by_number[number]
+    new_rows = [row for row in new_rows if row["student_id_number"] not in taken]
+    users = User.objects.in_bulk(
+        [row["student_id_number"] for row in new_rows], field_name="username"
+    )
+    missing_users = [row for row in new_rows if row["student_id_number"] not in users]
+    # hash before opening the transaction; PBKDF2 is the slow part of a batch
+    hashed = hash_passwords(row.get("password") or None for row in missing_users)
+
+    with transaction.atomic():
+        created_users = User.objects.bulk_create(
+            [
+                User(username=row["student_id_number"], password=password)
+                for row, password in zip(missing_users, hashed)
+            ]
+        )
+        users.update({user.username: user for user in created_users})
+
+        profiles = StudentProfileModel.objects.bulk_create(
+            [
+                StudentProfileModel(
+                    user=users[row["student_id_number"]],
+                    student_id_number=row["student_id_number"],
+                    university=job.university,
+                    **{field: row[field] for field in PROFILE_FIELDS if row.get(field)},
+                )
+                for row in new_rows
+            ]
+        )
+        existing.update({profile.student_id_number: profile for profile in profiles})
+
+        links = []
+        for number, row in by_number.items():
+            group = resolve_group(row)
+            if group is not None:
+                links.append(StudentsGroupModel(student=existing[number], group=group))
+            elif row.get("group"):
+                errors.append({"student_id_number": number, "error": "unknown group"})
+        StudentsGroupModel.objects.bulk_create(links, ignore_conflicts=True)
+        # bulk_create skips the signals; new group members see new assignments
+        invalidate_dashboard(
+            [link.student_id for link in links], "upcoming_assignments"
+        )
+
+    return len(profiles), len(links), errors
+
+
+def import_roster(job, rows, progress=None):
+    """
+    Import ``rows`` into ``job.university`` in batches of
+    ROSTER_IMPORT_BATCH_SIZE, one transaction per batch, updating the job's
+    counters after each. Students already present are only linked to groups,
+    so an import can be rerun after a failure.
+    """
+    batch_size = getattr(settings, "ROSTER_IMPORT_BATCH_SIZE", 1000)
+    resolve_group = GroupResolver(job.university, job.group)
+    RosterImportModel.objects.filter(pk=job.pk).update(status="running")
+
+    numbered = enumerate(rows, start=1)
+    try:
+        while batch := list(islice(numbered, batch_size)):
+            created, linked, errors = _import_batch(job, batch, resolve_group)
+            job.processed += len(batch)
+            job.created += created
+            job.linked += linked
+            job.errors = (job.errors + errors)[:MAX_REPORTED_ERRORS]
+            RosterImportModel.objects.filter(pk=job.pk).update(
+                processed=job.processed,
+                created=job.created,
+                linked=job.linked,
+                errors=job.errors,
+            )
+            if progress:
+                progress(job)
+    except Exception as e:
+        job.errors.append({"error": str(e)})
+        job.status = "failed"
+    else:
+        job.status = "done"
+    job.finished_at = timezone.now()
+    RosterImportModel.objects.filter(pk=job.pk).update(
+        status=job.status, errors=job.errors, finished_at=job.finished_at
+    )
+    return job
+
+
+def run_import(job_id):
+    """
+    Import a queued job: the CSV rows stored on it, or HEMIS paged with its
+    token. The stored input is dropped once the job is done or failed.
+    """
+    job = RosterImportModel.objects.select_related("university", "group").get(
+        pk=job_id
+    )
+    rows = job.rows if job.source == "csv" else hemis_rows(job, job.token)
+    import_roster(job, rows)
+    RosterImportModel.objects.filter(pk=job.pk).update(rows=None, token="")
+    return job
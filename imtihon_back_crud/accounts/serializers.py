@@ -1,10 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
 from django.db import transaction
-from university.models import UniversityModel
+from university.models import GroupModel, UniversityModel
 from students.models import StudentProfileModel
 from professors.models import ProfessorProfileModel
-from accounts.models import UniversityUrlsModel
+from accounts.models import RosterImportModel, UniversityUrlsModel
 from django.contrib.auth.hashers import check_password
 from django.db import transaction, IntegrityError
 
@@ -168,3 +168,44 @@ class UniversityUrlsSerializer(serializers.ModelSerializer):
     class Meta:
         model = UniversityUrlsModel
         fields = "__all__"
+
+
+class RosterImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RosterImportModel
+        fields = (
+            "id",
+            "university",
+            "group",
+            "source",
+            "status",
+            "total",
+            "processed",
+            "created",
+            "linked",
+            "errors",
+            "created_at",
+            "finished_at",
+        )
+        read_only_fields = fields
+
+
+class RosterImportCreateSerializer(serializers.Serializer):
+    source = serializers.ChoiceField(choices=RosterImportModel.SOURCE_CHOICES)
+    file = serializers.FileField(required=False)
+    token = serializers.CharField(
+        required=False, write_only=True, help_text="HEMIS API token"
+    )
+    group = serializers.PrimaryKeyRelatedField(
+        queryset=GroupModel.objects.all(), required=False, allow_null=True
+    )
+
+    def validate(self, data):
+        if data["source"] == "csv" and not data.get("file"):
+            raise serializers.ValidationError({"file": "A CSV file is required."})
+        if data["source"] == "hemis" and not data.get("token"):
+            raise serializers.ValidationError({"token": "A HEMIS token is required."})
+        group = data.get("group")
+        if group and group.university_id != self.context["university_id"]:
+            raise serializers.ValidationError({"group": "Group not found."})
+        return data
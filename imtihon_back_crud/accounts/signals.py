@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.authentication import FLAG_CLAIMS, revoke_user_tokens
+from professors.models import ProfessorProfileModel
+from students.models import StudentProfileModel
+from university.models import UniversityModel
+
+# tokens carry the role, university and admin flags (core.authentication), and
+# a stateless request never sees the user row: whatever would make an issued
+# token lie revokes the user's tokens. post_init remembers the issued state.
+
+User = get_user_model()
+TOKEN_FIELDS = ("password", "is_active", *FLAG_CLAIMS)
+PROFILE_MODELS = (StudentProfileModel, ProfessorProfileModel, UniversityModel)
+
+
+@receiver(post_init, sender=User)
+def remember_token_fields(sender, instance, **kwargs):
+    instance._token_fields = tuple(instance.__dict__.get(f) for f in TOKEN_FIELDS)
+
+
+@receiver(post_save, sender=User)
+def revoke_changed_user(sender, instance, created, **kwargs):
+    current = tuple(getattr(instance, field) for field in TOKEN_FIELDS)
+    # None: the field was deferred when loaded, so its issued value is unknown
+    changed = any(
+        before is not None and before != after
+        for before, after in zip(instance._token_fields, current)
+    )
+    if changed and not created:
+        revoke_user_tokens(instance.pk)
+    instance._token_fields = current
+
+
+def _owner(instance):
+    return instance.user_id, getattr(instance, "university_id", None)
+
+
+def remember_profile_owner(sender, instance, **kwargs):
+    state = instance.__dict__
+    instance._token_owner = (state.get("user_id"), state.get("university_id"))
+
+
+def revoke_profile_owner(sender, instance, created=False, **kwargs):
+    """A new, moved or deleted profile changes the role claims of its user."""
+    owner = _owner(instance)
+    if created or kwargs["signal"] is post_delete or owner != instance._token_owner:
+        user_ids = {instance._token_owner[0], instance.user_id} - {None}
+        for user_id in user_ids:
+            revoke_user_tokens(user_id)
+    instance._token_owner = owner
+
+
+for model in PROFILE_MODELS:
+    post_init.connect(remember_profile_owner, sender=model)
+    post_save.connect(revoke_profile_owner, sender=model)
+    post_delete.connect(revoke_profile_owner, sender=model)
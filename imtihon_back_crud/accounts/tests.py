@@ -1,3 +1,546 @@
-from django.test import TestCase
+import asyncio
+import json
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import httpx
+import requests
+from psycopg_pool import ConnectionPool
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, connections
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from accounts.hashing import hash_passwords
+from accounts.models import RosterImportModel, UniversityUrlsModel
+from accounts.roster import import_roster
+from core.http_client import CircuitOpenError, ExternalHTTPClient
+from core.authentication import PrincipalJWTAuthentication, tokens_for_user
+from core.principal import get_principal
+from professors.models import ProfessorProfileModel
+from students.models import StudentProfileModel, StudentsGroupModel
+from university.models import DepartmentModel, FacultyModel, GroupModel, UniversityModel
+
+
+def _response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return response
+
+
+class ExternalHTTPClientTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = ExternalHTTPClient(
+            {"BREAKER_FAILURE_THRESHOLD": 2, "BREAKER_RESET_TIMEOUT": 30}
+        )
+
+    def test_default_timeout_is_applied(self):
+        with mock.patch.object(
+            requests.Session, "request", return_value=_response(200)
+        ) as request:
+            self.client.get("https://uni.example/rest/v1/account/me")
+        self.assertEqual(request.call_args.kwargs["timeout"], self.client.timeout)
+
+    def test_breaker_opens_after_repeated_failures(self):
+        with mock.patch.object(
+            requests.Session, "request", side_effect=requests.ConnectionError
+        ) as request:
+            for _ in range(2):
+                with self.assertRaises(requests.ConnectionError):
+                    self.client.get("https://down.example/", breaker_key="uni:1")
+            with self.assertRaises(CircuitOpenError):
+                self.client.get("https://down.example/", breaker_key="uni:1")
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(
+            self.client.metrics.snapshot()["down.example"]["short_circuited"], 1
+        )
+
+    def test_breakers_are_independent_per_university(self):
+        with mock.patch.object(requests.Session, "request", return_value=_response(503)):
+            for _ in range(2):
+                self.client.get("https://shared.example/", breaker_key="uni:1")
+        with mock.patch.object(
+            requests.Session, "request", return_value=_response(200)
+        ):
+            response = self.client.get("https://shared.example/", breaker_key="uni:2")
+        self.assertEqual(response.status_code, 200)
+
+
+def _httpx_response(status_code, payload=None):
+    return httpx.Response(
+        status_code, json=payload, request=httpx.Request("GET", "https://x/")
+    )
+
+
+class AsyncExternalHTTPClientTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = ExternalHTTPClient(
+            {
+                "BREAKER_FAILURE_THRESHOLD": 2,
+                "BREAKER_RESET_TIMEOUT": 30,
+                "BACKOFF_FACTOR": 0,
+            }
+        )
+
+    def test_idempotent_requests_retry_on_gateway_errors(self):
+        responses = [_httpx_response(503), _httpx_response(200)]
+        with mock.patch.object(
+            httpx.AsyncClient, "request", side_effect=responses
+        ) as request:
+            response = asyncio.run(self.client.aget("https://uni.example/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(request.call_count, 2)
+
+    def test_posts_are_not_retried(self):
+        with mock.patch.object(
+            httpx.AsyncClient, "request", return_value=_httpx_response(503)
+        ) as request:
+            response = asyncio.run(self.client.apost("https://uni.example/"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(request.call_count, 1)
+
+    def test_breaker_is_shared_with_sync_requests(self):
+        with mock.patch.object(
+            httpx.AsyncClient, "request", side_effect=httpx.ConnectError("down")
+        ):
+            for _ in range(2):
+                with self.assertRaises(httpx.ConnectError):
+                    asyncio.run(
+                        self.client.apost("https://down.example/", breaker_key="uni:1")
+                    )
+        with self.assertRaises(CircuitOpenError):
+            self.client.get("https://down.example/", breaker_key="uni:1")
+        self.assertEqual(self.client.metrics.snapshot()["down.example"]["failures"], 2)
+
+
+def _json_response(payload):
+    response = _response(200)
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+@override_settings(
+    BACKGROUND_TASKS_EAGER=True,
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class RosterImportTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = get_user_model().objects.create_user(username="owner")
+        self.university = UniversityModel.objects.create(user=self.owner, name="Uni")
+        faculty = FacultyModel.objects.create(
+            university=self.university, name="Faculty", code="F1"
+        )
+        department = DepartmentModel.objects.create(
+            faculty=faculty, name="Dept", code="D1"
+        )
+        self.group = GroupModel.objects.create(
+            university=self.university, department=department, name="G1"
+        )
+        self.client.force_authenticate(self.owner)
+        self.url = reverse("roster-imports")
+
+    def upload(self, text, **data):
+        upload = SimpleUploadedFile("roster.csv", text.encode("utf-8"))
+        return self.client.post(
+            self.url, {"source": "csv", "file": upload, **data}, format="multipart"
+        )
+
+    def test_csv_import(self):
+        response = self.upload(
+            "\ufeffstudent_id_number,full_name,group,password\n"
+            "S1,Ali Valiyev,G1,secret\n"
+            "S2,Vali Aliyev,G1,\n"
+            ",Nobody,G1,\n"
+            "S3,Lost Student,G9,\n"
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = RosterImportModel.objects.get(pk=response.data["id"])
+        self.assertEqual(job.status, "done")
+        self.assertEqual((job.total, job.processed, job.created), (4, 4, 3))
+        self.assertEqual(len(job.errors), 2)
+
+        profile = StudentProfileModel.objects.get(student_id_number="S1")
+        self.assertEqual(profile.first_name, "Ali")
+        self.assertEqual(profile.university, self.university)
+        self.assertTrue(check_password("secret", profile.user.password))
+        # no password: the first HEMIS login sets one
+        self.assertFalse(
+            StudentProfileModel.objects.get(student_id_number="S2")
+            .user.has_usable_password()
+        )
+        self.assertEqual(
+            set(
+                StudentsGroupModel.objects.filter(group=self.group).values_list(
+                    "student__student_id_number", flat=True
+                )
+            ),
+            {"S1", "S2"},
+        )
+
+        detail = self.client.get(reverse("roster-import-detail", args=[job.id]))
+        self.assertEqual(detail.data["processed"], 4)
+
+    def test_rerun_only_links(self):
+        self.upload("student_id_number,full_name\nS1,Ali Valiyev\n")
+        response = self.upload(
+            "student_id_number,full_name\nS1,Ali Valiyev\n", group=self.group.id
+        )
+        job = RosterImportModel.objects.get(pk=response.data["id"])
+        self.assertEqual((job.created, job.linked), (0, 1))
+        self.assertEqual(get_user_model().objects.filter(username="S1").count(), 1)
+        self.assertTrue(
+            StudentsGroupModel.objects.filter(
+                student__student_id_number="S1", group=self.group
+            ).exists()
+        )
+
+    def test_usernames_of_other_roles_are_taken(self):
+        professor = get_user_model().objects.create_user(username="P1")
+        ProfessorProfileModel.objects.create(
+            user=professor, university=self.university, professor_id="P1", name="P"
+        )
+        response = self.upload("student_id_number,full_name\nP1,Ali Valiyev\n")
+        job = RosterImportModel.objects.get(pk=response.data["id"])
+        self.assertEqual(job.created, 0)
+        self.assertEqual(
+            job.errors, [{"student_id_number": "P1", "error": "username is taken"}]
+        )
+        self.assertFalse(StudentProfileModel.objects.filter(user=professor).exists())
+
+        # the owner's login is taken the same way
+        response = self.upload("student_id_number\nowner\n")
+        job = RosterImportModel.objects.get(pk=response.data["id"])
+        self.assertEqual(job.created, 0)
+        self.assertFalse(hasattr(self.owner, "student_profile"))
+
+    def test_imports_are_scoped_from_the_token_claims(self):
+        self.upload("student_id_number\nS1\n")
+        access = tokens_for_user(self.owner).access_token
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertFalse(any("auth_user" in q["sql"] for q in queries.captured_queries))
+
+    def test_students_cannot_import(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(username="nobody")
+        )
+        response = self.upload("student_id_number\nS1\n")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_hemis_import_pages(self):
+        UniversityUrlsModel.objects.create(
+            university=self.university,
+            code="U1",
+            name="Uni",
+            api_url="https://uni.example/rest/v1/",
+            student_url="https://uni.example/",
+            employee_url="https://uni.example/",
+        )
+
+        def student(number):
+            return {
+                "student_id_number": number,
+                "first_name": "Ali",
+                "full_name": f"Ali {number}",
+                "faculty": {"code": "F2", "name": "New faculty"},
+                "specialty": {"code": "D2", "name": "New dept"},
+                "group": {"name": "G2"},
+            }
+
+        pages = [
+            _json_response(
+                {
+                    "success": True,
+                    "data": {
+                        "items": [student("H1"), student("H2")],
+                        "pagination": {"totalCount": 3, "pageCount": 2},
+                    },
+                }
+            ),
+            _json_response(
+                {
+                    "success": True,
+                    "data": {
+                        "items": [student("H3")],
+                        "pagination": {"totalCount": 3, "pageCount": 2},
+                    },
+                }
+            ),
+        ]
+        with mock.patch("accounts.roster.http_client.get", side_effect=pages):
+            response = self.client.post(
+                self.url, {"source": "hemis", "token": "t"}, format="multipart"
+            )
+        job = RosterImportModel.objects.get(pk=response.data["id"])
+        self.assertEqual((job.status, job.total, job.created), ("done", 3, 3))
+        group = GroupModel.objects.get(name="G2", department__code="D2")
+        self.assertEqual(group.students.count(), 3)
+
+    @override_settings(BACKGROUND_TASKS_EAGER=False)
+    def test_imports_are_queued_for_the_importer(self):
+        response = self.upload("student_id_number,password\nS1,secret\n")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "pending")
+        self.assertFalse(StudentProfileModel.objects.exists())
+
+        out = StringIO()
+        call_command("run_roster_imports", stdout=out)
+        job = RosterImportModel.objects.get(pk=response.data["id"])
+        self.assertEqual((job.status, job.created), ("done", 1))
+        # the stored rows held a password
+        self.assertIsNone(job.rows)
+        self.assertIn(f"Import {job.id} done", out.getvalue())
+
+    def test_importer_requeues_interrupted_imports(self):
+        interrupted = RosterImportModel.objects.create(
+            university=self.university,
+            source="csv",
+            status="running",
+            processed=1,
+            rows=[{"student_id_number": "S1"}],
+        )
+        # a job of the import_roster command, running in that command
+        command_job = RosterImportModel.objects.create(
+            university=self.university, source="csv", status="running"
+        )
+        with mock.patch(
+            "accounts.management.commands.run_roster_imports.time.sleep",
+            side_effect=KeyboardInterrupt,
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command("run_roster_imports", "--watch", stdout=StringIO())
+        interrupted.refresh_from_db()
+        self.assertEqual((interrupted.status, interrupted.processed), ("done", 1))
+        self.assertTrue(StudentProfileModel.objects.filter(student_id_number="S1"))
+        command_job.refresh_from_db()
+        self.assertEqual(command_job.status, "running")
+
+    @override_settings(ROSTER_IMPORT_BATCH_SIZE=2)
+    def test_progress_is_reported_per_batch(self):
+        job = RosterImportModel.objects.create(university=self.university, source="csv")
+        seen = []
+        rows = [
+            {"student_id_number": f"B{i}", "first_name": "B"} for i in range(5)
+        ]
+        import_roster(job, rows, progress=lambda job: seen.append(job.processed))
+        self.assertEqual(seen, [2, 4, 5])
+
+
+@override_settings(
+    PASSWORD_HASH_WORKERS=2,
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class PasswordHashingTestCase(SimpleTestCase):
+    def test_process_pool_keeps_order(self):
+        passwords = [f"pw{i}" for i in range(70)]
+        hashed = hash_passwords(passwords)
+        self.assertEqual(len(hashed), 70)
+        self.assertTrue(
+            all(check_password(pw, h) for pw, h in zip(passwords, hashed))
+        )
+
+    def test_unusable_passwords_skip_the_pool(self):
+        passwords = [None] * 70 + ["pw"]
+        with mock.patch("accounts.hashing.ProcessPoolExecutor") as pool:
+            hashed = hash_passwords(passwords)
+        pool.assert_not_called()
+        self.assertTrue(check_password("pw", hashed[-1]))
+        self.assertFalse(any(check_password(None, h) for h in hashed[:-1]))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class StatelessTokenTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        owner = get_user_model().objects.create_user(username="owner")
+        self.university = UniversityModel.objects.create(user=owner, name="Uni")
+        self.user = get_user_model().objects.create_user(
+            username="student", password="testpass"
+        )
+        self.profile = StudentProfileModel.objects.create(
+            user=self.user,
+            student_id_number="S1",
+            image_url="http://a.com/a.png",
+            first_name="Ali",
+            university=self.university,
+        )
+
+    def login(self):
+        response = self.client.post(
+            reverse("login"), {"username": "student", "password": "testpass"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return response
+
+    def queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_login_embeds_principal(self):
+        token = AccessToken(self.login().data["access"])
+        self.assertEqual(
+            (token["role"], token["profile_id"], token["university_id"]),
+            ("student", self.profile.id, self.university.id),
+        )
+        self.assertFalse(token["is_superuser"])
+
+    def test_requests_skip_the_user_lookup(self):
+        url = reverse("student-sessions")
+        self.login()
+        stateless = self.queries(url)
+        legacy = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {legacy}")
+        self.assertEqual(self.queries(url), stateless + 1)
+
+    def test_user_is_loaded_on_demand(self):
+        access = self.login().data["access"]
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        with self.assertNumQueries(0):
+            user, _ = PrincipalJWTAuthentication().authenticate(request)
+            self.assertTrue(user and user.is_authenticated)
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertEqual(get_principal(user).profile_id, self.profile.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.username, "student")
+            self.assertEqual(user.student_profile, self.profile)
+
+    def test_logout_revokes_tokens(self):
+        refresh = self.login().data["refresh"]
+        response = self.client.post(reverse("logout"), {"refresh": refresh})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.get(reverse("student-sessions"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_changes_behind_the_claims_revoke_tokens(self):
+        self.login()
+        # revocation covers tokens issued before the second it happens in
+        later = time.time() + 1
+        with mock.patch("core.authentication.time.time", return_value=later):
+            self.user.is_active = False
+            self.user.save()
+        response = self.client.get(reverse("student-sessions"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        cache.clear()
+        self.user.is_active = True
+        self.user.save()
+        self.login()
+        self.profile.university = UniversityModel.objects.create(
+            user=get_user_model().objects.create_user(username="other"), name="Other"
+        )
+        later = time.time() + 1
+        with mock.patch("core.authentication.time.time", return_value=later):
+            self.profile.save()
+        response = self.client.get(reverse("student-sessions"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ExternalLoginTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        owner = get_user_model().objects.create_user(username="owner")
+        self.university = UniversityModel.objects.create(user=owner, name="Uni")
+        UniversityUrlsModel.objects.create(
+            university=self.university,
+            code="U1",
+            name="Uni",
+            api_url="https://hemis.example/rest/v1/",
+            student_url="https://hemis.example/",
+            employee_url="https://hemis.example/",
+        )
+        self.url = reverse("external-login")
+
+    def hemis(self, method, url, **kwargs):
+        path = httpx.URL(url).path.removeprefix("/rest/v1/")
+        data = {
+            "auth/login": {"token": "hemis-token"},
+            "account/me": {
+                "student_id_number": "S1",
+                "first_name": "Ali",
+                "faculty": {"code": "F1", "name": "Faculty"},
+                "specialty": {"code": "D1", "name": "Dept"},
+                "group": {"name": "G1"},
+            },
+            "education/subjects": [{"subject": {"code": "M1", "name": "Math"}}],
+            "education/schedule": [],
+        }[path]
+        return _httpx_response(200, {"success": True, "data": data})
+
+    def login(self):
+        return self.client.post(
+            self.url,
+            {"username": "S1", "password": "secret", "university_code": "U1"},
+            format="json",
+        )
+
+    def test_login_syncs_the_student(self):
+        with mock.patch.object(
+            httpx.AsyncClient, "request", side_effect=self.hemis
+        ) as request:
+            response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(request.call_count, 4)
+        self.assertEqual(response.data["group"], "G1")
+
+        profile = StudentProfileModel.objects.get(student_id_number="S1")
+        self.assertEqual(profile.university, self.university)
+        self.assertTrue(
+            StudentsGroupModel.objects.filter(student=profile, group__name="G1").exists()
+        )
+        self.assertEqual(profile.subjects.get().subject.code, "M1")
+        token = AccessToken(response.data["token"]["access"])
+        self.assertEqual((token["role"], token["profile_id"]), ("student", profile.id))
+
+    def test_unreachable_university(self):
+        with mock.patch.object(
+            httpx.AsyncClient, "request", side_effect=httpx.ConnectTimeout("slow")
+        ):
+            response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(StudentProfileModel.objects.exists())
+
+
+class DatabasePoolMetricsTestCase(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(username="admin")
+        )
+        self.url = reverse("db-pool-metrics")
+
+    def test_unpooled_connection(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["databases"]["default"], {"pooled": False})
+
+    def test_pool_counters(self):
+        pool = ConnectionPool("", min_size=2, max_size=20, open=False)
+        with mock.patch.object(type(connections["default"]), "pool", pool, create=True):
+            response = self.client.get(self.url)
+        stats = response.data["databases"]["default"]
+        self.assertTrue(stats["pooled"])
+        self.assertEqual((stats["pool_min"], stats["pool_max"]), (2, 20))
+
+    def test_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(username="student")
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
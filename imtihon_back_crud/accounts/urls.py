@@ -4,8 +4,13 @@ from .views import (
     StudentRegistrationView,
     ProfessorRegistrationView,
     LoginView,
+    LogoutView,
     FetchUpdateUniversityUrlsView,
     ExternalLoginView,
+    ExternalHttpMetricsView,
+    DatabasePoolMetricsView,
+    RosterImportView,
+    RosterImportDetailView,
 )
 
 urlpatterns = [
@@ -21,6 +26,7 @@ urlpatterns = [
         name="register-professor",
     ),
     path("login/", LoginView.as_view(), name="login"),
+    path("logout/", LogoutView.as_view(), name="logout"),
     path(
         "fetch-update-university-urls/",
         FetchUpdateUniversityUrlsView.as_view(),
@@ -31,4 +37,20 @@ urlpatterns = [
         ExternalLoginView.as_view(),
         name="external-login",
     ),
+    path(
+        "metrics/external-http/",
+        ExternalHttpMetricsView.as_view(),
+        name="external-http-metrics",
+    ),
+    path(
+        "metrics/db-pool/",
+        DatabasePoolMetricsView.as_view(),
+        name="db-pool-metrics",
+    ),
+    path("roster-imports/", RosterImportView.as_view(), name="roster-imports"),
+    path(
+        "roster-imports/<int:pk>/",
+        RosterImportDetailView.as_view(),
+        name="roster-import-detail",
+    ),
 ]
@@ -1,7 +1,13 @@
+import asyncio
+
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import (
     UniversityRegistrationSerializer,
@@ -9,10 +15,13 @@ from .serializers import (
     ProfessorRegistrationSerializer,
     LoginSerializer,
     ExternalLoginSerializer,  # new
+    RosterImportCreateSerializer,
+    RosterImportSerializer,
 )
 from drf_yasg.utils import swagger_auto_schema
 from accounts.models import UniversityUrlsModel
-from rest_framework.permissions import IsAdminUser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.parsers import FormParser, MultiPartParser
 from students.models import (
     StudentProfileModel,
     StudentSubjectModel,
@@ -20,8 +29,12 @@ from students.models import (
     StudentTimeTablesubjectModel,
 )
 from professors.models import ProfessorProfileModel, ProfessorsSubjectModel
-from accounts.models import UniversityUrlsModel
-import requests
+from accounts.models import RosterImportModel, UniversityUrlsModel
+from accounts.roster import RosterError, csv_rows, run_import
+from core import http_client
+from core.authentication import revoke_token, tokens_for_user
+from core.db import pool_metrics
+from core.principal import get_principal
 from university.models import (
     FacultyModel,
     DepartmentModel,
@@ -66,7 +79,7 @@ class LoginView(APIView):
         serializer = LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data["user"]
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
         return Response(
             {
                 "refresh": str(refresh),
@@ -77,7 +90,33 @@ class LoginView(APIView):
         )
 
 
-class ExternalLoginView(APIView):
+class LogoutView(APIView):
+    """
+    POST: {"refresh": str (optional)}
+
+    Revokes the access token of the request, and the refresh token if given.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(tags=["Authentication"])
+    def post(self, request, *args, **kwargs):
+        revoke_token(request.auth)
+        if request.data.get("refresh"):
+            try:
+                refresh = RefreshToken(request.data["refresh"])
+            except TokenError:
+                refresh = None
+            if refresh is None or refresh.get("user_id") != request.user.pk:
+                return Response(
+                    {"detail": "Invalid refresh token"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            revoke_token(refresh)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ExternalLoginView(AsyncAPIView):
     """
     POST: {
         "username": str,
@@ -91,7 +130,7 @@ class ExternalLoginView(APIView):
         request_body=ExternalLoginSerializer,
         operation_description="Логин через внешний университетский API. Пользователь выбирает университет, вводит логин и пароль. После успешной аутентификации студент и все связанные сущности (факультет, департамент, группа) синхронизируются в локальной базе.",
     )
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         serializer = ExternalLoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
@@ -101,19 +140,32 @@ class ExternalLoginView(APIView):
 
         # 1. Университет
         try:
-            uni_url_obj = UniversityUrlsModel.objects.get(code=university_code)
+            uni_url_obj = await UniversityUrlsModel.objects.select_related(
+                "university"
+            ).aget(code=university_code)
         except UniversityUrlsModel.DoesNotExist:
             return Response(
                 {"success": False, "error": "Университет не найден"}, status=400
             )
         api_url = uni_url_obj.api_url.rstrip("/") + "/"
+        # one circuit breaker per university API
+        breaker_key = f"university:{university_code}"
+        unavailable = Response(
+            {"success": False, "error": "Внешний API университета недоступен"},
+            status=503,
+        )
 
         # 2. Внешний логин
         login_url = api_url + "auth/login"
-        login_resp = requests.post(
-            login_url, json={"login": username, "password": password}
-        )
-        if not login_resp.ok or not login_resp.json().get("success"):
+        try:
+            login_resp = await http_client.apost(
+                login_url,
+                json={"login": username, "password": password},
+                breaker_key=breaker_key,
+            )
+        except http_client.ASYNC_REQUEST_ERRORS:
+            return unavailable
+        if not login_resp.is_success or not login_resp.json().get("success"):
             return Response(
                 {
                     "success": False,
@@ -124,15 +176,52 @@ class ExternalLoginView(APIView):
         token = login_resp.json()["data"]["token"]
 
         # 3. Получить данные студента
+        auth_headers = {"Authorization": f"Bearer {token}"}
         me_url = api_url + "account/me"
-        me_resp = requests.get(me_url, headers={"Authorization": f"Bearer {token}"})
-        if not me_resp.ok or not me_resp.json().get("success"):
+        try:
+            me_resp = await http_client.aget(
+                me_url, headers=auth_headers, breaker_key=breaker_key
+            )
+        except http_client.ASYNC_REQUEST_ERRORS:
+            return unavailable
+        if not me_resp.is_success or not me_resp.json().get("success"):
             return Response(
                 {"success": False, "error": "Ошибка получения данных студента"},
                 status=400,
             )
         student_data = me_resp.json()["data"]
 
+        # Subjects and schedule are optional and independent: fetched
+        # together, and before the database work so a slow upstream does not
+        # hold a connection.
+        subject_entries, schedule_entries = await asyncio.gather(
+            self._fetch_optional(
+                api_url + "education/subjects", auth_headers, breaker_key
+            ),
+            self._fetch_optional(
+                api_url + "education/schedule", auth_headers, breaker_key
+            ),
+        )
+        # the sync below is one transaction, which the async ORM cannot span
+        return await sync_to_async(self.sync_student)(
+            uni_url_obj,
+            username,
+            password,
+            student_data,
+            subject_entries,
+            schedule_entries,
+        )
+
+    def sync_student(
+        self,
+        uni_url_obj,
+        username,
+        password,
+        student_data,
+        subject_entries,
+        schedule_entries,
+    ):
+        """Create or update the student and everything around it locally."""
         # 🔐 Start atomic block
         with transaction.atomic():
             # 4. Факультет
@@ -175,7 +264,8 @@ class ExternalLoginView(APIView):
             # 7. Пользователь и студент
             user_model = get_user_model()
             user, created = user_model.objects.get_or_create(username=username)
-            if created:
+            # roster-imported students get their password on first HEMIS login
+            if created or not user.has_usable_password():
                 user.set_password(password)
                 user.save()
 
@@ -218,13 +308,8 @@ class ExternalLoginView(APIView):
                     student=student_profile, group=group_obj
                 )
             # 9. Получить и сохранить предметы
-            subjects_url = api_url + "education/subjects"
-            subjects_resp = requests.get(
-                subjects_url, headers={"Authorization": f"Bearer {token}"}
-            )
-
-            if subjects_resp.ok and subjects_resp.json().get("success"):
-                subject_entries = subjects_resp.json()["data"]
+            if subject_entries is not None:
+                student_subjects = []
                 for entry in subject_entries:
                     subj_data = entry.get("subject")
                     if not subj_data:
@@ -236,23 +321,21 @@ class ExternalLoginView(APIView):
                         department=department_obj,
                         defaults={"name": subj_data["name"]},
                     )
-
-                    # Связь студент–предмет
-                    StudentSubjectModel.objects.get_or_create(
-                        student=student_profile,
-                        subject=subject_obj,
+                    student_subjects.append(
+                        StudentSubjectModel(student=student_profile, subject=subject_obj)
                     )
+
+                # Связь студент–предмет: one INSERT, existing links are skipped
+                StudentSubjectModel.objects.bulk_create(
+                    student_subjects, ignore_conflicts=True
+                )
             # 11. Fetch and sync schedule
-            schedule_url = api_url + "education/schedule"
-            schedule_resp = requests.get(
-                schedule_url, headers={"Authorization": f"Bearer {token}"}
-            )
-            if schedule_resp.ok and schedule_resp.json().get("success"):
+            if schedule_entries is not None:
                 timetable_obj, _ = StudentTimetableModel.objects.get_or_create(
                     group=group_obj
                 )
 
-                for item in schedule_resp.json()["data"]:
+                for item in schedule_entries:
                     subj = item["subject"]
                     subject_obj, _ = SubjectModel.objects.get_or_create(
                         code=subj["code"],
@@ -309,7 +392,7 @@ class ExternalLoginView(APIView):
                                 end_time=end_time,
                                 room=room,
                             )
-            refresh = RefreshToken.for_user(user)
+            refresh = tokens_for_user(user)
 
         # 🟢 Return after atomic block
         return Response(
@@ -336,11 +419,121 @@ class ExternalLoginView(APIView):
             }
         )
 
+    @staticmethod
+    async def _fetch_optional(url, headers, breaker_key):
+        try:
+            resp = await http_client.aget(url, headers=headers, breaker_key=breaker_key)
+        except http_client.ASYNC_REQUEST_ERRORS:
+            return None
+        if not resp.is_success or not resp.json().get("success"):
+            return None
+        return resp.json()["data"]
+
 
-class FetchUpdateUniversityUrlsView(APIView):
+class FetchUpdateUniversityUrlsView(AsyncAPIView):
     permission_classes = [IsAdminUser]
 
     @swagger_auto_schema(auto_schema=None)
-    def post(self, request, *args, **kwargs):
-        result = UniversityUrlsModel.fetch_and_save_from_api(None)
+    async def post(self, request, *args, **kwargs):
+        result = await UniversityUrlsModel.afetch_and_save_from_api(None)
         return Response(result)
+
+
+class ExternalHttpMetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(auto_schema=None)
+    def get(self, request, *args, **kwargs):
+        return Response(http_client.metrics_snapshot())
+
+
+class DatabasePoolMetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(auto_schema=None)
+    def get(self, request, *args, **kwargs):
+        return Response(pool_metrics())
+
+
+def roster_university_id(user):
+    """Id of the university a user may import students into, or None."""
+    principal = get_principal(user)
+    return principal.university_id if principal.is_staff else None
+
+
+class RosterImportView(generics.ListAPIView):
+    serializer_class = RosterImportSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = (MultiPartParser, FormParser)
+
+    def get_queryset(self):
+        university_id = roster_university_id(self.request.user)
+        if university_id is None:
+            return RosterImportModel.objects.none()
+        return RosterImportModel.objects.filter(university_id=university_id)
+
+    @swagger_auto_schema(tags=["Roster import"])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        tags=["Roster import"],
+        request_body=RosterImportCreateSerializer,
+        operation_description="Start a bulk import of students into the university (optionally into one group) from an uploaded CSV or the HEMIS API. The import runs in the background; poll the returned job for progress.",
+        responses={202: RosterImportSerializer},
+    )
+    def post(self, request, *args, **kwargs):
+        university_id = roster_university_id(request.user)
+        if university_id is None:
+            return Response(
+                {"detail": "Only university owners and professors can import."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        serializer = RosterImportCreateSerializer(
+            data=request.data, context={"university_id": university_id}
+        )
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        rows = None
+        if data["source"] == "csv":
+            try:
+                text = data["file"].read().decode("utf-8")
+                rows = list(csv_rows(text))
+            except (UnicodeDecodeError, RosterError) as e:
+                return Response({"file": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = RosterImportModel.objects.create(
+            university_id=university_id,
+            group=data.get("group"),
+            created_by=request.user,
+            source=data["source"],
+            total=len(rows) if rows is not None else None,
+            rows=rows,
+            token=data.get("token", ""),
+        )
+        if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+            run_import(job.id)
+            job.refresh_from_db()
+        # otherwise "pending" queues it for the importer process
+        # (manage.py run_roster_imports --watch): a large roster takes longer
+        # than the web process's background pool should be held, and a web
+        # worker restart would lose it
+        return Response(
+            RosterImportSerializer(job).data, status=status.HTTP_202_ACCEPTED
+        )
+
+
+class RosterImportDetailView(generics.RetrieveAPIView):
+    serializer_class = RosterImportSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        university_id = roster_university_id(self.request.user)
+        if university_id is None:
+            return RosterImportModel.objects.none()
+        return RosterImportModel.objects.filter(university_id=university_id)
+
+    @swagger_auto_schema(tags=["Roster import"])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
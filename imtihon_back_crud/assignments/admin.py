@@ -1,4 +1,5 @@
 from unfold.admin import ModelAdmin, TabularInline
+from unfold.contrib.filters.admin import AutocompleteSelectFilter
 from .models import (
     AssignmentModel,
     QuestionModel,
@@ -29,7 +30,15 @@ class AssignmentModelAdmin(ModelAdmin):
         "description",
     )
     search_fields = ("subject__name", "professor__professor_id", "description")
-    list_filter = ("type", "subject", "professor", "start_time", "end_time")
+    list_filter = (
+        "type",
+        ("subject", AutocompleteSelectFilter),
+        ("professor", AutocompleteSelectFilter),
+        "start_time",
+        "end_time",
+    )
+    list_select_related = ("subject__university", "professor__university")
+    autocomplete_fields = ("subject", "professor")
     ordering = ("subject", "start_time")
     readonly_fields = ("id",)
 
@@ -45,7 +54,9 @@ class QuestionModelAdmin(ModelAdmin):
         "true_false_answer",
     )
     search_fields = ("assignment__subject__name", "question")
-    list_filter = ("assignment", "type")
+    list_filter = (("assignment", AutocompleteSelectFilter), "type")
+    list_select_related = ("assignment__subject", "assignment__professor")
+    autocomplete_fields = ("assignment",)
     ordering = ("assignment", "type")
     readonly_fields = ("id",)
 
@@ -54,7 +65,9 @@ class QuestionModelAdmin(ModelAdmin):
 class QuestionChoiceModelAdmin(ModelAdmin):
     list_display = ("id", "question", "choice", "is_correct")
     search_fields = ("question__question", "choice")
-    list_filter = ("question", "is_correct")
+    list_filter = (("question", AutocompleteSelectFilter), "is_correct")
+    list_select_related = ("question",)
+    autocomplete_fields = ("question",)
     ordering = ("question",)
     readonly_fields = ("id",)
 
@@ -63,7 +76,9 @@ class QuestionChoiceModelAdmin(ModelAdmin):
 class AssignmentAttachmentsModelAdmin(ModelAdmin):
     list_display = ("id", "assignment", "attachment_file")
     search_fields = ("assignment__description",)
-    list_filter = ("assignment",)
+    list_filter = (("assignment", AutocompleteSelectFilter),)
+    list_select_related = ("assignment__subject", "assignment__professor")
+    autocomplete_fields = ("assignment",)
     ordering = ("assignment",)
     readonly_fields = ("id",)
 
@@ -71,7 +86,16 @@ class AssignmentAttachmentsModelAdmin(ModelAdmin):
 @admin.register(AssignmentsGroupModel)
 class AssignmentsGroupModelAdmin(ModelAdmin):
     list_display = ("id", "assignment", "group")
-    search_fields = ("assignment__description", "group__number")
-    list_filter = ("assignment", "group")
+    search_fields = ("assignment__description", "group__name")
+    list_filter = (
+        ("assignment", AutocompleteSelectFilter),
+        ("group", AutocompleteSelectFilter),
+    )
+    list_select_related = (
+        "assignment__subject",
+        "assignment__professor",
+        "group__university",
+    )
+    autocomplete_fields = ("assignment", "group")
     ordering = ("assignment", "group")
     readonly_fields = ("id",)
@@ -0,0 +1,157 @@
+# analytics.py
+
+from collections import Counter, defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BooleanField, ExpressionWrapper
+
+from assignments.models import QuestionChoiceModel, QuestionModel
+from core.cache import bump_version, get_version
+from students.grading import GRADABLE, correct_answer
+from students.models import StudentAnswerModel
+
+
+def answers_namespace(assignment_id):
+    return f"assignment_answers:{assignment_id}"
+
+
+def invalidate_analytics(assignment_id):
+    bump_version(answers_namespace(assignment_id))
+
+
+def _correlation(x, y):
+    """Pearson r, or None when either side has no variance."""
+    if len(x) < 2 or np.std(x) == 0 or np.std(y) == 0:
+        return None
+    return round(float(np.corrcoef(x, y)[0, 1]), 4)
+
+
+def _round(value, digits=4):
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+def compute_analytics(assignment):
+    """
+    Item statistics of an assignment from one streamed query over its answers:
+    a session x question matrix of correctness (NaN = not answered) feeds
+    difficulty, point-biserial discrimination and the cheating correlation.
+    """
+    questions = list(
+        QuestionModel.objects.filter(assignment=assignment)
+        .annotate(gradable=ExpressionWrapper(GRADABLE, output_field=BooleanField()))
+        .order_by("id")
+        .values_list("id", "type", "question", "gradable")
+    )
+    question_index = {question[0]: i for i, question in enumerate(questions)}
+    gradable = np.array([bool(question[3]) for question in questions], dtype=bool)
+    choices = defaultdict(list)
+    for choice_id, question_id, text, is_correct in QuestionChoiceModel.objects.filter(
+        question__assignment=assignment
+    ).values_list("id", "question_id", "choice", "is_correct"):
+        choices[question_id].append((choice_id, text, is_correct))
+
+    rows = (
+        StudentAnswerModel.objects.filter(session__assignment=assignment)
+        .annotate(
+            is_correct=ExpressionWrapper(correct_answer(), output_field=BooleanField())
+        )
+        .values_list(
+            "session_id",
+            "question_id",
+            "is_correct",
+            "choice_id",
+            "answered_at",
+            "session__start_time",
+            "session__cheating_score",
+        )
+        .order_by()
+        .iterator(chunk_size=5000)
+    )
+
+    session_index, cheating, cells = {}, [], []
+    choice_counts = defaultdict(Counter)
+    seconds = defaultdict(list)
+    for session_id, question_id, is_correct, choice_id, answered_at, started, score in rows:
+        if session_id not in session_index:
+            session_index[session_id] = len(session_index)
+            cheating.append(np.nan if score is None else score)
+        cells.append(
+            (session_index[session_id], question_index[question_id], bool(is_correct))
+        )
+        if choice_id is not None:
+            choice_counts[question_id][choice_id] += 1
+        if answered_at is not None and started is not None:
+            seconds[question_id].append((answered_at - started).total_seconds())
+
+    matrix = np.full((len(session_index), len(questions)), np.nan)
+    if cells:
+        s_idx, q_idx, values = zip(*cells)
+        matrix[list(s_idx), list(q_idx)] = np.array(values, dtype=float)
+
+    answered = ~np.isnan(matrix)
+    # open questions without a key cannot be right or wrong
+    matrix[:, ~gradable] = np.nan
+    scored = np.nan_to_num(matrix, nan=0.0)  # unanswered counts as wrong
+    totals = scored.sum(axis=1)
+    cheating = np.array(cheating, dtype=float)
+    has_score = ~np.isnan(cheating)
+
+    items = []
+    for i, (question_id, question_type, text, _) in enumerate(questions):
+        times = np.array(seconds.get(question_id, []), dtype=float)
+        item = {
+            "question": question_id,
+            "type": question_type,
+            "text": text,
+            "gradable": bool(gradable[i]),
+            "answered": int(answered[:, i].sum()),
+            "correct_rate": (
+                _round(np.nanmean(matrix[:, i]))
+                if gradable[i] and answered[:, i].any()
+                else None
+            ),
+            # correlation of the item with the rest of the test
+            "discrimination": _correlation(scored[:, i], totals - scored[:, i]),
+            "cheating_correlation": _correlation(
+                scored[has_score, i], cheating[has_score]
+            ),
+            "seconds_to_answer": {
+                "median": _round(np.median(times), 1) if times.size else None,
+                "mean": _round(times.mean(), 1) if times.size else None,
+            },
+        }
+        if question_type == "mcq":
+            item["choices"] = [
+                {
+                    "choice": choice_id,
+                    "text": choice_text,
+                    "is_correct": is_correct,
+                    "count": choice_counts[question_id][choice_id],
+                }
+                for choice_id, choice_text, is_correct in choices[question_id]
+            ]
+        items.append(item)
+
+    return {
+        "assignment": assignment.id,
+        "sessions": len(session_index),
+        "questions": items,
+        "score_cheating_correlation": _correlation(
+            totals[has_score], cheating[has_score]
+        ),
+    }
+
+
+def assignment_analytics(assignment):
+    """Cached compute_analytics; answer and key writes bump the version."""
+    key = (
+        f"assignment_analytics:{assignment.id}:"
+        f"v{get_version(answers_namespace(assignment.id))}"
+    )
+    result = cache.get(key)
+    if result is None:
+        result = compute_analytics(assignment)
+        cache.set(key, result, settings.ASSIGNMENT_ANALYTICS_CACHE_TIMEOUT)
+    return result
@@ -44,7 +44,7 @@ class AssignmentAttachmentsModel(models.Model):
     attachment_file = models.FileField()
 
     def __str__(self) -> str:
-        return f"attachment for assignment: {self.assignment.id}"
+        return f"attachment for assignment: {self.assignment_id}"
 
 
 class AssignmentsGroupModel(models.Model):
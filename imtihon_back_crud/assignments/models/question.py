@@ -19,7 +19,7 @@ class QuestionModel(models.Model):
 
     def __str__(self) -> str:
         preview = self.question[:40] + ("..." if len(self.question) > 40 else "")
-        return f"Assignment: {self.assignment.id} | Type: {self.type} | Q: {preview}"
+        return f"Assignment: {self.assignment_id} | Type: {self.type} | Q: {preview}"
 
 
 class QuestionChoiceModel(models.Model):
@@ -29,4 +29,4 @@ class QuestionChoiceModel(models.Model):
 
     def __str__(self) -> str:
         preview = self.choice[:30] + ("..." if len(self.choice) > 30 else "")
-        return f"Q: {self.question.id} | Choice: {preview} | Correct: {self.is_correct}"
+        return f"Q: {self.question_id} | Choice: {preview} | Correct: {self.is_correct}"
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from assignments.analytics import invalidate_analytics
+from assignments.models import QuestionChoiceModel, QuestionModel
+
+
+@receiver([post_save, post_delete], sender=QuestionModel)
+def refresh_analytics_questions(sender, instance, **kwargs):
+    invalidate_analytics(instance.assignment_id)
+
+
+@receiver([post_save, post_delete], sender=QuestionChoiceModel)
+def refresh_analytics_choices(sender, instance, **kwargs):
+    assignment_ids = QuestionModel.objects.filter(
+        pk=instance.question_id
+    ).values_list("assignment_id", flat=True)
+    for assignment_id in assignment_ids:
+        invalidate_analytics(assignment_id)
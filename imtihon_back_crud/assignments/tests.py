@@ -1,3 +1,6 @@
+import csv
+import io
+
 from rest_framework.test import APITestCase
 from django.urls import reverse
 from rest_framework import status
@@ -16,7 +19,13 @@ from university.models import (
     FacultyModel,
     UniversityModel,
 )
+from core.testing import StudentFixtureMixin
 from professors.models import ProfessorProfileModel
+from students.models import (
+    StudentAnswerModel,
+    StudentProfileModel,
+    StudentSessionModel,
+)
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils import timezone
 from datetime import timedelta
@@ -191,3 +200,132 @@ class AssignmentsAPITestCase(APITestCase):
         self.assertIn(
             response.status_code, [status.HTTP_201_CREATED, status.HTTP_400_BAD_REQUEST]
         )
+
+
+class AssignmentFixtureMixin(StudentFixtureMixin):
+    """Exam with an easy and a hard question answered by two strong, two weak."""
+
+    def setUp(self):
+        super().setUp()
+        self.easy = QuestionModel.objects.create(
+            assignment=self.assignment,
+            question="Sky is blue",
+            type="true_false",
+            true_false_answer=True,
+        )
+        self.hard = QuestionModel.objects.create(
+            assignment=self.assignment, question="2+2?", type="mcq"
+        )
+        self.right = QuestionChoiceModel.objects.create(
+            question=self.hard, choice="4", is_correct=True
+        )
+        self.wrong = QuestionChoiceModel.objects.create(
+            question=self.hard, choice="5", is_correct=False
+        )
+
+        # strong students answer both right, weak ones only the easy one
+        for i, strong in enumerate([True, True, False, False]):
+            student_user = User.objects.create_user(username=f"s{i}", password="x")
+            student = StudentProfileModel.objects.create(
+                user=student_user,
+                student_id_number=f"S{i}",
+                image_url="http://a.com/a.png",
+                first_name="Student",
+                university=self.university,
+            )
+            session = StudentSessionModel.objects.create(
+                student=student,
+                assignment=self.assignment,
+                cheating_score=0 if strong else 40,
+            )
+            StudentAnswerModel.objects.bulk_create(
+                [
+                    StudentAnswerModel(
+                        session=session, question=self.easy, true_false_answer=True
+                    ),
+                    StudentAnswerModel(
+                        session=session,
+                        question=self.hard,
+                        choice=self.right if strong else self.wrong,
+                    ),
+                ]
+            )
+
+        self.client.force_authenticate(self.professor.user)
+
+
+class AssignmentAnalyticsTestCase(AssignmentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("assignmentmodel-analytics", args=[self.assignment.id])
+
+    def test_item_statistics(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data["sessions"], 4)
+        easy, hard = data["questions"]
+        self.assertEqual(easy["correct_rate"], 1.0)
+        self.assertIsNone(easy["discrimination"])  # everybody got it right
+        self.assertEqual(hard["correct_rate"], 0.5)
+        self.assertEqual(
+            {item["choice"]: item["count"] for item in hard["choices"]},
+            {self.right.id: 2, self.wrong.id: 2},
+        )
+        self.assertEqual(hard["cheating_correlation"], -1.0)
+        self.assertEqual(data["score_cheating_correlation"], -1.0)
+
+    def test_cached_until_answers_change(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):  # the assignment itself
+            self.client.get(self.url)
+
+        session = StudentSessionModel.objects.filter(cheating_score=40).first()
+        StudentAnswerModel.objects.filter(session=session, question=self.hard).update(
+            choice=self.right
+        )
+        QuestionChoiceModel.objects.get(pk=self.right.pk).save()
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["questions"][1]["correct_rate"], 0.75)
+
+
+class AssignmentExportTestCase(AssignmentFixtureMixin, APITestCase):
+    def read_csv(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        self.assertIn("attachment", response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_export_results(self):
+        StudentSessionModel.objects.update(grade=50)
+        rows = self.read_csv(
+            reverse("assignmentmodel-export-results", args=[self.assignment.id])
+        )
+        self.assertEqual(rows[0][:3], ["session", "student_id_number", "full_name"])
+        self.assertEqual([row[1] for row in rows[1:]], ["S0", "S1", "S2", "S3"])
+        self.assertEqual({(row[5], row[7]) for row in rows[1:]}, {("50", "100")})
+
+    def test_export_integrity(self):
+        StudentSessionModel.objects.filter(student__student_id_number="S2").update(
+            tab_switch_count=3
+        )
+        rows = self.read_csv(
+            reverse("assignmentmodel-export-integrity", args=[self.assignment.id])
+        )
+        header = rows[0]
+        by_student = {row[1]: dict(zip(header, row)) for row in rows[1:]}
+        self.assertEqual(by_student["S2"]["tab_switch_count"], "3")
+        self.assertEqual(by_student["S2"]["cheating_score"], "40")
+        self.assertEqual(by_student["S0"]["tab_switch_count"], "0")
+
+    def test_students_cannot_export(self):
+        self.client.force_authenticate(User.objects.get(username="s0"))
+        response = self.client.get(
+            reverse("assignmentmodel-export-results", args=[self.assignment.id])
+        )
+        self.assertIn(
+            response.status_code,
+            [status.HTTP_403_FORBIDDEN, status.HTTP_404_NOT_FOUND],
+        )
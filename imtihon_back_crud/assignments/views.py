@@ -1,6 +1,7 @@
 from django.shortcuts import render
-from rest_framework import viewsets
-from drf_yasg.utils import swagger_auto_schema
+from rest_framework import viewsets, response, status
+from rest_framework.decorators import action
+from drf_yasg.utils import swagger_auto_schema, no_body
 from drf_yasg import openapi
 from assignments.models import (
     AssignmentModel,
@@ -18,7 +19,8 @@ from .serializers import (
     AssignmentCreateSerializer,
 )
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from core.authentication import PrincipalJWTAuthentication
+from core.principal import get_principal
 from rest_framework import permissions
 from core.permissions import (
     IsProfessorOrReadOnly,
@@ -26,6 +28,15 @@ from core.permissions import (
 )
 from rest_framework import serializers
 from .serializers import QuestionCreateSerializer
+from core.pagination import values_paginated_response
+from core.renderers import FAST_RENDERER_CLASSES
+from core.exports import queryset_rows, stream_csv
+from students.feed import issue_ticket
+from django.conf import settings
+from students.models import StudentSessionModel
+from students.serializers import StudentSessionMonitorSerializer
+from students.grading import grade_sessions
+from assignments.analytics import assignment_analytics
 
 # Create your views here.
 
@@ -54,7 +65,7 @@ class AssignmentModelViewSet(viewsets.ModelViewSet):
 
     queryset = AssignmentModel.objects.all()
     serializer_class = AssignmentModelSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
     permission_classes = [IsProfessorOrReadOnly]
 
     def get_serializer_class(self):
@@ -87,20 +98,13 @@ class AssignmentModelViewSet(viewsets.ModelViewSet):
         serializer.save(professor=professor, subject=subject)
 
     def get_queryset(self):
-        user = self.request.user
-        if not user.is_authenticated:
-            return AssignmentModel.objects.none()
-        # Professors see their own assignments
-        if hasattr(user, "professor_profile"):
-            return AssignmentModel.objects.filter(professor=user.professor_profile)
-        # University owners see all assignments for their university
-        if hasattr(user, "universities"):
-            return AssignmentModel.objects.filter(professor__university__user=user)
-        # Students see assignments for their university or group
-        if hasattr(user, "student_profile"):
-            student = user.student_profile
+        principal = get_principal(self.request.user)
+        # Professors see their own, owners and students their university's
+        if principal.is_professor:
+            return AssignmentModel.objects.filter(professor_id=principal.profile_id)
+        if principal.university_id is not None:
             return AssignmentModel.objects.filter(
-                professor__university=student.university
+                professor__university_id=principal.university_id
             )
         return AssignmentModel.objects.none()
 
@@ -203,6 +207,216 @@ class AssignmentModelViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
+    def can_monitor(self, assignment):
+        """The assignment's professor or its university owner."""
+        principal = get_principal(self.request.user)
+        if principal.is_professor and assignment.professor_id == principal.profile_id:
+            return True
+        return principal.is_owner
+
+    @swagger_auto_schema(
+        tags=["Assignments"],
+        operation_summary="Monitor student sessions of an assignment",
+        operation_description="Sessions with their evidence counters and live cheating score. Pass `live=true` to get only sessions that are still open.",
+        manual_parameters=[
+            openapi.Parameter(
+                "live",
+                openapi.IN_QUERY,
+                description="Only open sessions",
+                type=openapi.TYPE_BOOLEAN,
+            )
+        ],
+        responses={200: StudentSessionMonitorSerializer(many=True)},
+    )
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="sessions",
+        renderer_classes=FAST_RENDERER_CLASSES,
+    )
+    def sessions(self, request, pk=None):
+        assignment = self.get_object()
+        if not self.can_monitor(assignment):
+            return response.Response(
+                {"detail": "Only the assignment's professor can monitor sessions."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # student fields come from the join in .values()
+        sessions = StudentSessionModel.objects.filter(assignment=assignment)
+        if request.query_params.get("live") in ("true", "1"):
+            sessions = sessions.filter(end_time__isnull=True)
+        return values_paginated_response(
+            request, sessions, StudentSessionMonitorSerializer, view=self
+        )
+
+    @swagger_auto_schema(
+        tags=["Assignments"],
+        operation_summary="Regrade finished sessions",
+        operation_description="Recomputes the grade of every finished session from the current answer keys, e.g. after correcting a key.",
+        request_body=no_body,
+        responses={
+            200: openapi.Response(
+                description="Number of sessions graded",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={"graded": openapi.Schema(type=openapi.TYPE_INTEGER)},
+                ),
+            ),
+            403: "Forbidden - Not the assignment's professor",
+        },
+    )
+    @action(detail=True, methods=["post"], url_path="regrade")
+    def regrade(self, request, pk=None):
+        assignment = self.get_object()
+        principal = get_principal(request.user)
+        if (
+            not principal.is_professor
+            or assignment.professor_id != principal.profile_id
+        ):
+            return response.Response(
+                {"detail": "Only the assignment's professor can regrade it."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return response.Response({"graded": grade_sessions(assignment)})
+
+    @swagger_auto_schema(
+        tags=["Assignments"],
+        operation_summary="Ticket for the live proctoring feed",
+        operation_description="Returns a short-lived ticket and the WebSocket URL that streams session start/end, liveness and new evidence of this assignment. Connect with ?ticket=<ticket>; fetch the current state once from the sessions endpoint.",
+        responses={
+            200: openapi.Response(
+                description="Feed ticket",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "ticket": openapi.Schema(type=openapi.TYPE_STRING),
+                        "url": openapi.Schema(type=openapi.TYPE_STRING),
+                        "expires_in": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    },
+                ),
+            ),
+            403: "Forbidden - Not the assignment's professor",
+        },
+    )
+    @action(detail=True, methods=["get"], url_path="live-feed")
+    def live_feed(self, request, pk=None):
+        assignment = self.get_object()
+        if not self.can_monitor(assignment):
+            return response.Response(
+                {"detail": "Only the assignment's professor can monitor sessions."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        ticket = issue_ticket(assignment.id, request.user.id)
+        return response.Response(
+            {
+                "ticket": ticket,
+                "url": f"{settings.PROCTORING_FEED_URL}?ticket={ticket}",
+                "expires_in": settings.PROCTORING_FEED_TICKET_TTL,
+            }
+        )
+
+    @swagger_auto_schema(
+        tags=["Assignments"],
+        operation_summary="Item analytics of an assignment",
+        operation_description="Per question: correct rate, choice distribution, point-biserial discrimination, time to answer and correlation with the cheating score.",
+        responses={
+            200: openapi.Response(description="Assignment analytics"),
+            403: "Forbidden - Not the assignment's professor",
+        },
+    )
+    @action(detail=True, methods=["get"], url_path="analytics")
+    def analytics(self, request, pk=None):
+        assignment = self.get_object()
+        if not self.can_monitor(assignment):
+            return response.Response(
+                {"detail": "Only the assignment's professor can view analytics."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return response.Response(assignment_analytics(assignment))
+
+    @swagger_auto_schema(
+        tags=["Assignments"],
+        operation_summary="Export assignment results (CSV)",
+        operation_description="Streams one row per student session: grade, cheating score and timing.",
+        responses={200: "text/csv attachment", 403: "Forbidden"},
+    )
+    @action(detail=True, methods=["get"], url_path="export-results")
+    def export_results(self, request, pk=None):
+        assignment = self.get_object()
+        if not self.can_monitor(assignment):
+            return response.Response(
+                {"detail": "Only the assignment's professor can export results."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        sessions = StudentSessionModel.objects.filter(assignment=assignment).order_by(
+            "id"
+        )
+        rows = (
+            row + (assignment.max_grade,)
+            for row in queryset_rows(
+                sessions,
+                "id",
+                "student__student_id_number",
+                "student__full_name",
+                "start_time",
+                "end_time",
+                "grade",
+                "cheating_score",
+            )
+        )
+        return stream_csv(
+            request,
+            f"assignment_{assignment.id}_results.csv",
+            [
+                "session",
+                "student_id_number",
+                "full_name",
+                "start_time",
+                "end_time",
+                "grade",
+                "cheating_score",
+                "max_grade",
+            ],
+            rows,
+        )
+
+    @swagger_auto_schema(
+        tags=["Assignments"],
+        operation_summary="Export session integrity summary (CSV)",
+        operation_description="Streams one row per session with evidence counts per type and the cheating score.",
+        responses={200: "text/csv attachment", 403: "Forbidden"},
+    )
+    @action(detail=True, methods=["get"], url_path="export-integrity")
+    def export_integrity(self, request, pk=None):
+        assignment = self.get_object()
+        if not self.can_monitor(assignment):
+            return response.Response(
+                {"detail": "Only the assignment's professor can export results."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        fields = [
+            "id",
+            "student__student_id_number",
+            "student__full_name",
+            "is_live",
+            "device_count",
+            "multiple_people_count",
+            "audio_count",
+            "ai_count",
+            "tab_switch_count",
+            "cheating_score",
+        ]
+        sessions = StudentSessionModel.objects.filter(assignment=assignment).order_by(
+            "id"
+        )
+        return stream_csv(
+            request,
+            f"assignment_{assignment.id}_integrity.csv",
+            ["session", "student_id_number", "full_name"] + fields[3:],
+            queryset_rows(sessions, *fields),
+        )
+
 
 class AssignmentAttachmentsModelViewSet(viewsets.ModelViewSet):
     """
@@ -223,7 +437,7 @@ class AssignmentAttachmentsModelViewSet(viewsets.ModelViewSet):
     serializer_class = AssignmentAttachmentsModelSerializer
     parser_classes = (MultiPartParser, FormParser)
 
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     @swagger_auto_schema(
         tags=["Assignment Attachments"],
@@ -341,23 +555,18 @@ class AssignmentsGroupModelViewSet(viewsets.ModelViewSet):
     queryset = AssignmentsGroupModel.objects.all()
     serializer_class = AssignmentsGroupModelSerializer
     permission_classes = [IsProfessorsGroupAssignmentOrReadOnly]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get_queryset(self):
-        user = self.request.user
-        if not user.is_authenticated:
-            return AssignmentsGroupModel.objects.none()
-        if hasattr(user, "professor_profile"):
-            return AssignmentsGroupModel.objects.filter(
-                assignment__professor=user.professor_profile
-            )
-        if hasattr(user, "universities"):
+        principal = get_principal(self.request.user)
+        # Professors see their own, owners and students their university's
+        if principal.is_professor:
             return AssignmentsGroupModel.objects.filter(
-                assignment__professor__university__user=user
+                assignment__professor_id=principal.profile_id
             )
-        if hasattr(user, "student_profile"):
+        if principal.university_id is not None:
             return AssignmentsGroupModel.objects.filter(
-                assignment__professor__university=user.student_profile.university
+                assignment__professor__university_id=principal.university_id
             )
         return AssignmentsGroupModel.objects.none()
 
@@ -481,7 +690,7 @@ class QuestionModelViewSet(viewsets.ModelViewSet):
     queryset = QuestionModel.objects.all()
     serializer_class = QuestionModelSerializer
     permission_classes = [IsProfessorOrReadOnly]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -506,20 +715,15 @@ class QuestionModelViewSet(viewsets.ModelViewSet):
         serializer.save(assignment=assignment)
 
     def get_queryset(self):
-        user = self.request.user
-        if not user.is_authenticated:
-            return QuestionModel.objects.none()
-        if hasattr(user, "professor_profile"):
-            return QuestionModel.objects.filter(
-                assignment__professor=user.professor_profile
-            )
-        if hasattr(user, "universities"):
+        principal = get_principal(self.request.user)
+        # Professors see their own, owners and students their university's
+        if principal.is_professor:
             return QuestionModel.objects.filter(
-                assignment__professor__university__user=user
+                assignment__professor_id=principal.profile_id
             )
-        if hasattr(user, "student_profile"):
+        if principal.university_id is not None:
             return QuestionModel.objects.filter(
-                assignment__professor__university=user.student_profile.university
+                assignment__professor__university_id=principal.university_id
             )
         return QuestionModel.objects.none()
 
@@ -635,23 +839,18 @@ class QuestionChoiceModelViewSet(viewsets.ModelViewSet):
     queryset = QuestionChoiceModel.objects.all()
     serializer_class = QuestionChoiceModelSerializer
     permission_classes = [IsProfessorOrReadOnly]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get_queryset(self):
-        user = self.request.user
-        if not user.is_authenticated:
-            return QuestionChoiceModel.objects.none()
-        if hasattr(user, "professor_profile"):
-            return QuestionChoiceModel.objects.filter(
-                question__assignment__professor=user.professor_profile
-            )
-        if hasattr(user, "universities"):
+        principal = get_principal(self.request.user)
+        # Professors see their own, owners and students their university's
+        if principal.is_professor:
             return QuestionChoiceModel.objects.filter(
-                question__assignment__professor__university__user=user
+                question__assignment__professor_id=principal.profile_id
             )
-        if hasattr(user, "student_profile"):
+        if principal.university_id is not None:
             return QuestionChoiceModel.objects.filter(
-                question__assignment__professor__university=user.student_profile.university
+                question__assignment__professor__university_id=principal.university_id
             )
         return QuestionChoiceModel.objects.none()
 
@@ -0,0 +1,163 @@
+# authentication.py
+
+import time
+
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.principal import PROFILE_RELATIONS, Principal, get_principal
+
+# claims written at issuance; a token without ROLE_CLAIM predates them
+ROLE_CLAIM = "role"
+PRINCIPAL_CLAIMS = ("profile_id", "university_id")
+FLAG_CLAIMS = ("is_staff", "is_superuser")
+
+
+def users_with_profiles(user_model):
+    """Users with every role relation joined in, for core.principal."""
+    return user_model.objects.select_related(*PROFILE_RELATIONS)
+
+
+def tokens_for_user(user):
+    """
+    RefreshToken for ``user`` carrying its Principal and admin flags; the
+    access token derived from it copies them.
+    """
+    refresh = RefreshToken.for_user(user)
+    principal = get_principal(user)
+    refresh[ROLE_CLAIM] = principal.role
+    for claim in PRINCIPAL_CLAIMS:
+        refresh[claim] = getattr(principal, claim)
+    for claim in FLAG_CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    return refresh
+
+
+# revocation: entries only need to outlive the tokens they reject, so they
+# expire with them instead of piling up
+
+
+def _revoked_token_key(jti):
+    return f"revoked_token:{jti}"
+
+
+def _revoked_user_key(user_id):
+    return f"revoked_user:{user_id}"
+
+
+def revoke_token(token):
+    """Reject ``token`` (access or refresh) until it expires."""
+    remaining = token["exp"] - int(time.time())
+    if remaining > 0:
+        cache.set(_revoked_token_key(token[api_settings.JTI_CLAIM]), True, remaining)
+
+
+def revoke_user_tokens(user_id):
+    """Reject every token of the user issued before now."""
+    lifetime = max(
+        api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME
+    )
+    cache.set(
+        _revoked_user_key(user_id), int(time.time()), int(lifetime.total_seconds())
+    )
+
+
+def is_revoked(token):
+    token_key = _revoked_token_key(token.get(api_settings.JTI_CLAIM))
+    user_key = _revoked_user_key(token.get(api_settings.USER_ID_CLAIM))
+    found = cache.get_many([token_key, user_key])
+    if found.get(token_key):
+        return True
+    cutoff = found.get(user_key)
+    return cutoff is not None and token.get("iat", 0) < cutoff
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    request.user for a token that carries its claims: the id, role and
+    admin flags are answered from the token, and the User row (with its
+    profiles) is only loaded when something else is asked of it.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token, load):
+        super().__init__(load)
+        # straight into __dict__: LazyObject.__setattr__ would load the user
+        self.__dict__["token"] = token
+        self.__dict__["_principal"] = Principal(
+            token[api_settings.USER_ID_CLAIM],
+            token[ROLE_CLAIM],
+            *(token.get(claim) for claim in PRINCIPAL_CLAIMS),
+        )
+
+    def __bool__(self):
+        return True
+
+    @property
+    def pk(self):
+        return self._principal.user_id
+
+    id = pk
+
+    @property
+    def is_staff(self):
+        return self.token.get("is_staff", False)
+
+    @property
+    def is_superuser(self):
+        return self.token.get("is_superuser", False)
+
+
+class PrincipalJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that does not look the user up. Tokens issued by
+    tokens_for_user carry the Principal, so request.user is a TokenUser and
+    views that only need the role and ids never query for it.
+
+    Older tokens fall back to loading the user together with its student,
+    professor and university relations in one query. Either way revoked
+    tokens (logout, deactivation, password or role change) are rejected.
+    """
+
+    def get_user(self, validated_token):
+        if is_revoked(validated_token):
+            raise AuthenticationFailed(
+                _("Token has been revoked"), code="token_revoked"
+            )
+        if ROLE_CLAIM not in validated_token:
+            return self.load_user(validated_token)
+        return TokenUser(validated_token, lambda: self.load_user(validated_token))
+
+    def load_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = users_with_profiles(self.user_model).get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
@@ -0,0 +1,50 @@
+# background.py
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "BACKGROUND_WORKERS", 2),
+                thread_name_prefix="background",
+            )
+        return _executor
+
+
+def _run(fn, args, kwargs):
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    except Exception:
+        logger.exception("background task %s failed", fn.__name__)
+        raise
+    finally:
+        # worker threads own their connections; do not leak them between tasks
+        close_old_connections()
+
+
+def submit(fn, *args, **kwargs):
+    """
+    Run ``fn`` after the current transaction commits, on a small in-process
+    thread pool. With BACKGROUND_TASKS_EAGER it runs inline (tests, scripts).
+    Work that must survive a restart belongs in a management command instead.
+    """
+    if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+        return fn(*args, **kwargs)
+
+    from django.db import transaction
+
+    transaction.on_commit(lambda: _get_executor().submit(_run, fn, args, kwargs))
@@ -0,0 +1,104 @@
+# cache.py
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+
+def _version_key(namespace):
+    return f"cache_version:{namespace}"
+
+
+def get_version(namespace):
+    """Current version counter of a cache namespace (starts at 1)."""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(*namespaces):
+    """Invalidate every entry cached under the given namespaces."""
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        cache.add(key, 1, None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+
+
+def _etag_matches(request, etag):
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or any(
+        value.removeprefix("W/") == etag for value in candidates
+    )
+
+
+class VersionedCacheMixin:
+    """
+    Caches list/retrieve responses of read-only viewsets under a versioned
+    namespace and answers conditional requests with 304 Not Modified.
+
+    Subclasses implement ``get_cache_scope`` returning ``(namespace, label)``
+    or ``None`` to skip caching; ``label`` separates users that share a
+    namespace but see different querysets.
+    """
+
+    cache_timeout = None
+
+    def get_cache_scope(self):
+        raise NotImplementedError
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return getattr(settings, "VIEW_CACHE_TIMEOUT", 300)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        scope = self.get_cache_scope()
+        if scope is None:
+            return handler(request, *args, **kwargs)
+        namespace, label = scope
+
+        path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = (
+            f"view_cache:{self.basename}:{self.action}:{namespace}:{label}:"
+            f"v{get_version(namespace)}:{path_hash}"
+        )
+        cached = cache.get(key)
+        if cached is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            body = JSONRenderer().render(response.data)
+            cached = {
+                "etag": f'"{hashlib.md5(body).hexdigest()}"',
+                "data": json.loads(body),
+            }
+            cache.set(key, cached, self.get_cache_timeout())
+
+        headers = {
+            "ETag": cached["etag"],
+            "Cache-Control": "private, no-cache",
+            "Vary": "Authorization",
+        }
+        if _etag_matches(request, cached["etag"]):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(cached["data"], headers=headers)
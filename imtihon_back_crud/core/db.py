@@ -0,0 +1,24 @@
+# db.py
+
+import os
+
+from django.conf import settings
+from django.db import connections
+
+
+def pool_metrics():
+    """
+    psycopg pool counters of this worker process, per database alias. Each
+    worker has its own pool, so the pid tells apart what a load balancer
+    spreads over several of them.
+    """
+    result = {"pid": os.getpid(), "mode": settings.DB_POOL, "databases": {}}
+    for alias in connections:
+        # the postgresql backend only has a pool with OPTIONS["pool"]
+        pool = getattr(connections[alias], "pool", None)
+        if pool is None:
+            result["databases"][alias] = {"pooled": False}
+            continue
+        # pool_size/pool_available, requests_waiting, connections_num, ...
+        result["databases"][alias] = {"pooled": True, **pool.get_stats()}
+    return result
@@ -0,0 +1,42 @@
+# events.py
+
+import json
+import logging
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def get_redis():
+    """Shared Redis client for pub/sub, or None when REDIS_URL is not set."""
+    global _client
+    if _client is None and getattr(settings, "REDIS_URL", None):
+        import redis
+
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def publish(channel, event):
+    """
+    Publish ``event`` as JSON on a Redis channel once the current transaction
+    commits, so subscribers never see rolled back state. Publishing is best
+    effort: a Redis outage is logged, never raised into the request.
+    """
+    client = get_redis()
+    if client is None:
+        return
+    message = json.dumps(event, cls=DjangoJSONEncoder)
+
+    def send():
+        try:
+            client.publish(channel, message)
+        except Exception:
+            logger.warning("could not publish to %s", channel, exc_info=True)
+
+    transaction.on_commit(send)
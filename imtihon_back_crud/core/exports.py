@@ -0,0 +1,45 @@
+# exports.py
+
+import csv
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
+from core.streaming import streaming_body
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_chunks(header, rows):
+    writer = csv.writer(Echo())
+    # BOM so Excel opens UTF-8 (Cyrillic / Uzbek names) correctly
+    yield "\ufeff" + writer.writerow(header)
+    rows = iter(rows)
+    while chunk := list(islice(rows, EXPORT_CHUNK_SIZE)):
+        yield "".join(writer.writerow(row) for row in chunk)
+
+
+def stream_csv(request, filename, header, rows):
+    """
+    Stream ``rows`` (any iterable, typically ``values_list(...).iterator()``)
+    as a CSV download; only one chunk of rows is held in memory at a time,
+    under WSGI and ASGI alike.
+    """
+    response = StreamingHttpResponse(
+        streaming_body(request, _csv_chunks(header, rows)),
+        content_type="text/csv; charset=utf-8",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def queryset_rows(queryset, *fields):
+    """Server-side cursor over ``fields`` of ``queryset``."""
+    return queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
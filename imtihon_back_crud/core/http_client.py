@@ -0,0 +1,313 @@
+# http_client.py
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    "CONNECT_TIMEOUT": 3.0,
+    "READ_TIMEOUT": 10.0,
+    "RETRIES": 2,
+    "BACKOFF_FACTOR": 0.3,
+    "POOL_MAXSIZE": 10,
+    "ASYNC_MAX_CONNECTIONS": 100,
+    "BREAKER_FAILURE_THRESHOLD": 5,
+    "BREAKER_RESET_TIMEOUT": 30,
+}
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRY_STATUSES = (502, 503, 504)
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+# what the async methods raise when an upstream cannot be reached
+ASYNC_REQUEST_ERRORS = (httpx.HTTPError, CircuitOpenError)
+
+
+class CircuitBreaker:
+    """
+    Per-upstream breaker. State lives in the Django cache so every worker
+    sharing the cache sees the same open/closed state.
+    """
+
+    def __init__(self, key, failure_threshold, reset_timeout):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures_key = f"http_breaker:{key}:failures"
+        self._opened_key = f"http_breaker:{key}:opened_at"
+        self._trial_key = f"http_breaker:{key}:trial"
+
+    def allow(self):
+        opened_at = cache.get(self._opened_key)
+        if opened_at is None:
+            return True
+        if time.time() - opened_at < self.reset_timeout:
+            return False
+        # half-open: let exactly one request through to probe the upstream
+        return cache.add(self._trial_key, 1, self.reset_timeout)
+
+    def record_success(self):
+        cache.delete_many([self._failures_key, self._opened_key, self._trial_key])
+
+    def record_failure(self):
+        cache.add(self._failures_key, 0, self.reset_timeout)
+        try:
+            failures = cache.incr(self._failures_key)
+        except ValueError:
+            failures = 1
+            cache.set(self._failures_key, failures, self.reset_timeout)
+        if failures >= self.failure_threshold:
+            if cache.get(self._opened_key) is None:
+                logger.warning("Circuit opened for %s after %s failures", self.key, failures)
+            cache.set(self._opened_key, time.time(), self.reset_timeout * 10)
+            cache.delete(self._trial_key)
+
+
+class HostMetrics:
+    """In-process latency and error counters, keyed by upstream host."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def record(self, host, elapsed=None, status=None, failed=False, short_circuited=False):
+        with self._lock:
+            stats = self._hosts.setdefault(
+                host,
+                {
+                    "requests": 0,
+                    "failures": 0,
+                    "short_circuited": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "last_status": None,
+                },
+            )
+            if short_circuited:
+                stats["short_circuited"] += 1
+                return
+            stats["requests"] += 1
+            if failed:
+                stats["failures"] += 1
+            if elapsed is not None:
+                elapsed_ms = elapsed * 1000
+                stats["total_ms"] += elapsed_ms
+                stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["last_status"] = status
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for host, stats in self._hosts.items():
+                data = dict(stats)
+                data["avg_ms"] = (
+                    round(stats["total_ms"] / stats["requests"], 2)
+                    if stats["requests"]
+                    else None
+                )
+                data["total_ms"] = round(stats["total_ms"], 2)
+                data["max_ms"] = round(stats["max_ms"], 2)
+                result[host] = data
+            return result
+
+
+class ExternalHTTPClient:
+    """
+    Shared client for university / HEMIS APIs: one pooled session per host,
+    connect/read timeouts, retries for idempotent requests and a circuit
+    breaker per upstream.
+
+    ``arequest``/``aget``/``apost`` are the same for async views, on an
+    httpx.AsyncClient per event loop; breakers and metrics are shared.
+    """
+
+    def __init__(self, config=None):
+        self.config = {**DEFAULTS, **(config or {})}
+        self.timeout = (self.config["CONNECT_TIMEOUT"], self.config["READ_TIMEOUT"])
+        self.metrics = HostMetrics()
+        self._sessions = {}
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(getattr(settings, "EXTERNAL_HTTP", None))
+
+    def _session_for(self, host):
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                retry = Retry(
+                    total=self.config["RETRIES"],
+                    backoff_factor=self.config["BACKOFF_FACTOR"],
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=IDEMPOTENT_METHODS,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.config["POOL_MAXSIZE"],
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+        return session
+
+    def breaker(self, key):
+        return CircuitBreaker(
+            key,
+            self.config["BREAKER_FAILURE_THRESHOLD"],
+            self.config["BREAKER_RESET_TIMEOUT"],
+        )
+
+    def request(self, method, url, breaker_key=None, **kwargs):
+        host = urlsplit(url).netloc
+        breaker = self.breaker(breaker_key or host)
+        if not breaker.allow():
+            self.metrics.record(host, short_circuited=True)
+            raise CircuitOpenError(f"Upstream {breaker.key} is unavailable, try again later")
+
+        kwargs.setdefault("timeout", self.timeout)
+        started = time.perf_counter()
+        try:
+            response = self._session_for(host).request(method, url, **kwargs)
+        except requests.RequestException:
+            elapsed = time.perf_counter() - started
+            breaker.record_failure()
+            self.metrics.record(host, elapsed=elapsed, failed=True)
+            logger.warning("%s %s failed after %.0f ms", method, url, elapsed * 1000)
+            raise
+
+        elapsed = time.perf_counter() - started
+        failed = response.status_code >= 500
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        self.metrics.record(host, elapsed=elapsed, status=response.status_code, failed=failed)
+        logger.debug(
+            "%s %s -> %s in %.0f ms", method, url, response.status_code, elapsed * 1000
+        )
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def _async_client(self):
+        # an AsyncClient's connections belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    self.config["READ_TIMEOUT"], connect=self.config["CONNECT_TIMEOUT"]
+                ),
+                limits=httpx.Limits(
+                    max_connections=self.config["ASYNC_MAX_CONNECTIONS"],
+                    max_keepalive_connections=self.config["POOL_MAXSIZE"],
+                ),
+                # retries failed connects; status retries are done below
+                transport=httpx.AsyncHTTPTransport(retries=self.config["RETRIES"]),
+            )
+            self._async_clients[loop] = client
+        return client
+
+    async def arequest(self, method, url, breaker_key=None, **kwargs):
+        host = urlsplit(url).netloc
+        breaker = self.breaker(breaker_key or host)
+        if not await sync_to_async(breaker.allow)():
+            self.metrics.record(host, short_circuited=True)
+            raise CircuitOpenError(f"Upstream {breaker.key} is unavailable, try again later")
+
+        client = self._async_client()
+        retries = self.config["RETRIES"] if method in IDEMPOTENT_METHODS else 0
+        started = time.perf_counter()
+        try:
+            for attempt in range(retries + 1):
+                response = await client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    break
+                await asyncio.sleep(self.config["BACKOFF_FACTOR"] * 2**attempt)
+        except httpx.HTTPError:
+            elapsed = time.perf_counter() - started
+            await sync_to_async(breaker.record_failure)()
+            self.metrics.record(host, elapsed=elapsed, failed=True)
+            logger.warning("%s %s failed after %.0f ms", method, url, elapsed * 1000)
+            raise
+
+        elapsed = time.perf_counter() - started
+        failed = response.status_code >= 500
+        if failed:
+            await sync_to_async(breaker.record_failure)()
+        else:
+            await sync_to_async(breaker.record_success)()
+        self.metrics.record(host, elapsed=elapsed, status=response.status_code, failed=failed)
+        logger.debug(
+            "%s %s -> %s in %.0f ms", method, url, response.status_code, elapsed * 1000
+        )
+        return response
+
+    async def aget(self, url, **kwargs):
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url, **kwargs):
+        return await self.arequest("POST", url, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ExternalHTTPClient.from_settings()
+    return _client
+
+
+def get(url, **kwargs):
+    return get_client().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return get_client().post(url, **kwargs)
+
+
+async def aget(url, **kwargs):
+    return await get_client().aget(url, **kwargs)
+
+
+async def apost(url, **kwargs):
+    return await get_client().apost(url, **kwargs)
+
+
+def metrics_snapshot():
+    return get_client().metrics.snapshot()
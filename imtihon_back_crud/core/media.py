@@ -0,0 +1,109 @@
+# media.py
+
+import mimetypes
+import os
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.http import FileResponse, HttpResponse
+from rest_framework import authentication, exceptions
+
+from core.authentication import users_with_profiles
+from core.streaming import iterate_in_thread, served_over_asgi
+
+TOKEN_SALT = "core.media"
+MEDIA_CHUNK_SIZE = 64 * 1024
+
+# not in every system mime.types; nginx keeps the type Django sets
+mimetypes.add_type("application/vnd.apple.mpegurl", ".m3u8")
+mimetypes.add_type("video/mp2t", ".ts")
+
+
+def media_token(user_id, path, prefix=False):
+    """
+    Signed ``(user, path, expiry)`` for a protected media URL; with
+    ``prefix`` it opens every path below ``path`` (an HLS rendition set).
+    The expiry is rounded up to the TTL so one lesson keeps one URL for a
+    while and the browser cache is reused across page loads.
+    """
+    ttl = settings.PROTECTED_MEDIA_TOKEN_TTL
+    expires = (int(time.time()) // ttl + 2) * ttl
+    payload = {"u": user_id, "p": path, "e": expires}
+    if prefix:
+        payload["x"] = 1
+    return signing.Signer(salt=TOKEN_SALT).sign_object(payload)
+
+
+def signed_media_url(request, path, prefix=None):
+    """
+    ``path?token=...`` for ``request.user``, absolute like FileField URLs;
+    the token covers everything below ``prefix`` when given.
+    """
+    if prefix is None:
+        token = media_token(request.user.pk, path)
+    else:
+        token = media_token(request.user.pk, prefix, prefix=True)
+    return request.build_absolute_uri(f"{path}?token={token}")
+
+
+def _token_allows(payload, path):
+    scope = payload.get("p") or ""
+    if payload.get("x"):
+        return bool(scope) and path.startswith(scope)
+    return path == scope
+
+
+class MediaTokenAuthentication(authentication.BaseAuthentication):
+    """
+    ``?token=`` from signed_media_url. A <video> element cannot send the JWT
+    header, so the URL carries the user; the view's queryset still decides
+    access. A token only opens the path, or for HLS the directory, it was
+    issued for.
+    """
+
+    def authenticate(self, request):
+        token = request.query_params.get("token")
+        if not token:
+            return None
+        try:
+            payload = signing.Signer(salt=TOKEN_SALT).unsign_object(token)
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed("Invalid media token.")
+        if not _token_allows(payload, request.path):
+            raise exceptions.AuthenticationFailed("Media token is for another URL.")
+        if payload.get("e", 0) < time.time():
+            raise exceptions.AuthenticationFailed("Media token expired.")
+        user = users_with_profiles(get_user_model()).filter(pk=payload.get("u")).first()
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed("User not found.")
+        return user, None
+
+
+def protected_file_response(request, name):
+    """
+    Hand the MEDIA_ROOT file ``name`` to nginx's internal PROTECTED_MEDIA_URL
+    location with X-Accel-Redirect; nginx answers Range requests with
+    sendfile. Without nginx (DEBUG, tests) Django streams the file itself.
+    """
+    content_type, _ = mimetypes.guess_type(name)
+    content_type = content_type or "application/octet-stream"
+    if not settings.PROTECTED_MEDIA_X_ACCEL:
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+        if served_over_asgi(request):
+            # headers stay as set from the file; it is still closed with
+            # the response
+            file = response.file_to_stream
+            response.streaming_content = iterate_in_thread(
+                iter(lambda: file.read(MEDIA_CHUNK_SIZE), b"")
+            )
+        return response
+
+    response = HttpResponse(content_type=content_type)
+    response["X-Accel-Redirect"] = quote(settings.PROTECTED_MEDIA_URL + name)
+    # kept by nginx on the final response; the URL is per user and expiring
+    response["Cache-Control"] = f"private, max-age={settings.PROTECTED_MEDIA_TOKEN_TTL}"
+    return response
@@ -0,0 +1,95 @@
+# pagination.py
+
+import json
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from core.values import values_serializer
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over a unique, index-backed ordering (``-id`` unless the
+    view sets ``cursor_ordering``), so page N costs the same as page 1.
+
+    No ``COUNT(*)`` is issued unless asked for with ``?count=exact``;
+    ``?count=estimate`` returns the planner's row estimate instead.
+    """
+
+    ordering = "-id"
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+
+    def __init__(self):
+        self.page_size = settings.PAGINATION_PAGE_SIZE
+        self.max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
+        self.count = None
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "cursor_ordering", None) or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == "exact":
+            self.count = queryset.count()
+        elif mode == "estimate":
+            self.count = estimate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+        if self.count is not None:
+            payload = {"count": self.count, **payload}
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"] = {
+            "type": "integer",
+            "description": "Only present with ?count=exact or ?count=estimate",
+        }
+        return response_schema
+
+
+def estimate_count(queryset):
+    """Row estimate from the Postgres planner; exact count on other backends."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginated_response(request, queryset, serializer_class, view=None, **kwargs):
+    """Paginate a custom ``@action`` the same way generic list endpoints are."""
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    serializer = serializer_class(page, many=True, **kwargs)
+    return paginator.get_paginated_response(serializer.data)
+
+
+def values_paginated_response(request, queryset, serializer_class, view=None):
+    """
+    paginated_response for hot read-only lists: the page is fetched with
+    .values() and shaped by core.values, with the same output.
+    """
+    fast = values_serializer(serializer_class)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(fast.values(queryset), request, view=view)
+    return paginator.get_paginated_response(fast.to_representation(page, request))
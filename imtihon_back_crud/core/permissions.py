@@ -1,7 +1,5 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
-from university.models import UniversityModel
-from students.models import StudentProfileModel
-from professors.models import ProfessorProfileModel
+from core.principal import get_principal
 
 
 class IsUniversityOwnerOrReadOnly(BasePermission):
@@ -30,19 +28,14 @@ class IsProfessorOrReadOnly(BasePermission):
         if request.method in SAFE_METHODS:
             return request.user and request.user.is_authenticated
         # Only allow if user is a professor
-        return (
-            request.user
-            and request.user.is_authenticated
-            and hasattr(request.user, "professor_profile")
-        )
+        return get_principal(request.user).is_professor
 
     def has_object_permission(self, request, view, obj):
         if request.method in SAFE_METHODS:
             return True
         # Only allow professors to modify their own assignments
-        if hasattr(request.user, "professor_profile"):
-            return obj.professor == request.user.professor_profile
-        return False
+        principal = get_principal(request.user)
+        return principal.is_professor and obj.professor_id == principal.profile_id
 
 
 class IsProfessorsGroupAssignmentOrReadOnly(BasePermission):
@@ -54,19 +47,17 @@ class IsProfessorsGroupAssignmentOrReadOnly(BasePermission):
         if request.method in SAFE_METHODS:
             return request.user and request.user.is_authenticated
         # Only allow if user is a professor
-        return (
-            request.user
-            and request.user.is_authenticated
-            and hasattr(request.user, "professor_profile")
-        )
+        return get_principal(request.user).is_professor
 
     def has_object_permission(self, request, view, obj):
         if request.method in SAFE_METHODS:
             return True
         # Only allow professors to modify their own assignments
-        if hasattr(request.user, "professor_profile"):
-            return obj.assignment.professor == request.user.professor_profile
-        return False
+        principal = get_principal(request.user)
+        return (
+            principal.is_professor
+            and obj.assignment.professor_id == principal.profile_id
+        )
 
 
 class IsStudentOwnerOrReadOnly(BasePermission):
@@ -0,0 +1,73 @@
+# principal.py
+
+from dataclasses import dataclass
+
+STUDENT = "student"
+PROFESSOR = "professor"
+UNIVERSITY = "university"
+
+# reverse one-to-ones of User that decide the role, in precedence order: a
+# user with several profiles (roster imports refuse to create one, older data
+# may have them) acts as the first, as the views always checked
+PROFILE_RELATIONS = ("professor_profile", "university", "student_profile")
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Who a request acts as: the role and the ids that scope its data.
+    ``profile_id`` is the StudentProfileModel or ProfessorProfileModel id,
+    or the UniversityModel id for a university owner.
+    """
+
+    user_id: int | None = None
+    role: str | None = None
+    profile_id: int | None = None
+    university_id: int | None = None
+
+    @property
+    def is_student(self):
+        return self.role == STUDENT
+
+    @property
+    def is_professor(self):
+        return self.role == PROFESSOR
+
+    @property
+    def is_owner(self):
+        return self.role == UNIVERSITY
+
+    @property
+    def is_staff(self):
+        """Professors and university owners: the ones who manage content."""
+        return self.role in (PROFESSOR, UNIVERSITY)
+
+
+ANONYMOUS = Principal()
+
+
+def get_principal(user):
+    """
+    The user's Principal, worked out once per user object. Users loaded by
+    PrincipalJWTAuthentication carry their profile relations, so this costs
+    no query; other users pay at most one per relation, as hasattr() did.
+    """
+    principal = getattr(user, "_principal", None)
+    if principal is not None:
+        return principal
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS
+
+    principal = Principal(user.pk)
+    for relation in PROFILE_RELATIONS:
+        profile = getattr(user, relation, None)
+        if profile is None:
+            continue
+        if relation == "university":
+            principal = Principal(user.pk, UNIVERSITY, profile.pk, profile.pk)
+        else:
+            role = STUDENT if relation == "student_profile" else PROFESSOR
+            principal = Principal(user.pk, role, profile.pk, profile.university_id)
+        break
+    user._principal = principal
+    return principal
@@ -0,0 +1,33 @@
+# renderers.py
+
+import orjson
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# datetimes are left to DRF's encoder, which formats them differently
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_SERIALIZE_NUMPY
+)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    JSON through orjson, for the list endpoints fed by core.values. Output
+    matches JSONRenderer's compact form; anything orjson does not know
+    (Decimal, lazy translations, ...) goes through DRF's encoder.
+    """
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return orjson.dumps(data, default=JSONEncoder().default, option=ORJSON_OPTIONS)
+
+
+# renderer_classes of actions answering with values_paginated_response
+FAST_RENDERER_CLASSES = [ORJSONRenderer, BrowsableAPIRenderer]
@@ -36,6 +36,7 @@ CSRF_TRUSTED_ORIGINS = [
 
 INSTALLED_APPS = [
     "unfold",
+    "unfold.contrib.filters",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -51,6 +52,7 @@ INSTALLED_APPS = [
     "assignments",
     "course",
     "accounts",
+    "uploads",
     "django_cleanup.apps.CleanupConfig",
 ]
 
@@ -88,6 +90,19 @@ WSGI_APPLICATION = "core.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# connections: DB_POOL=django keeps a psycopg pool per worker process,
+# DB_POOL=pgbouncer leaves pooling to a PgBouncer in front of Postgres
+# (docker-compose.prod.yml), DB_POOL=off opens one connection per request.
+# Persistent connections (CONN_MAX_AGE) do not fit ASGI, whose sync views
+# run in per-request threads.
+
+DB_POOL = os.getenv("DB_POOL", "django")
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "4"))
+# connections the service may hold in total, split between the workers; keep
+# it under Postgres' max_connections (100 by default) with room for admin
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+DB_POOL_SIZE = max(2, DB_MAX_CONNECTIONS // WEB_WORKERS)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -96,8 +111,22 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD", "imtihon_pass"),
         "HOST": os.getenv("DB_HOST", "localhost"),
         "PORT": os.getenv("DB_PORT", "5432"),
+        # pooled connections are checked before they are handed out
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
     }
 }
+
+if DB_POOL == "django":
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": 2,
+        "max_size": DB_POOL_SIZE,
+        "timeout": 10,  # seconds a request waits for a free connection
+        "max_idle": 300,
+    }
+elif DB_POOL == "pgbouncer":
+    # transaction pooling hands each transaction any server connection
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -139,6 +168,57 @@ STATIC_ROOT = "/app/static"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = "/app/media"
 
+# evidence and course media are stored once per distinct content under
+# MEDIA_ROOT/cas/ and reference-counted (uploads/storage.py)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+    },
+    "blobs": {"BACKEND": "uploads.storage.ContentAddressedStorage"},
+}
+
+# course videos: Django checks access, then X-Accel-Redirect hands the file
+# to nginx's internal location below (core/media.py); Django streams it
+# itself when there is no nginx in front
+PROTECTED_MEDIA_URL = "/protected-media/"
+PROTECTED_MEDIA_X_ACCEL = bool(
+    int(os.environ.get("PROTECTED_MEDIA_X_ACCEL", "0" if DEBUG else "1"))
+)
+# signed video URLs live between one and two of these (seconds)
+PROTECTED_MEDIA_TOKEN_TTL = int(
+    os.environ.get("PROTECTED_MEDIA_TOKEN_TTL", 60 * 60 * 3)
+)
+
+# lesson videos are transcoded in the background into these HLS renditions
+# (course/transcoding.py); renditions above the source height are skipped
+FFMPEG_BINARY = os.environ.get("FFMPEG_BINARY", "ffmpeg")
+FFPROBE_BINARY = os.environ.get("FFPROBE_BINARY", "ffprobe")
+HLS_SEGMENT_SECONDS = 6
+HLS_TRANSCODE_TIMEOUT = int(os.environ.get("HLS_TRANSCODE_TIMEOUT", 60 * 60 * 2))
+# how often the transcoder process looks for pending lessons when idle
+HLS_WORKER_POLL_SECONDS = int(os.environ.get("HLS_WORKER_POLL_SECONDS", 5))
+HLS_RENDITIONS = [
+    {"height": 360, "video_kbps": 800, "audio_kbps": 64},
+    {"height": 480, "video_kbps": 1400, "audio_kbps": 96},
+    {"height": 720, "video_kbps": 2800, "audio_kbps": 128},
+    {"height": 1080, "video_kbps": 5000, "audio_kbps": 160},
+]
+
+# resumable uploads (uploads/resumable.py): chunks are assembled in this
+# MEDIA_ROOT-relative directory; nginx buffers each chunk before Django sees it
+RESUMABLE_UPLOAD_DIR = "partial"
+RESUMABLE_UPLOAD_CHUNK_SIZE = int(
+    os.environ.get("RESUMABLE_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024)
+)
+RESUMABLE_UPLOAD_MAX_SIZE = int(
+    os.environ.get("RESUMABLE_UPLOAD_MAX_SIZE", 4 * 1024 * 1024 * 1024)
+)
+# unfinished uploads idle this long are removed by purge_stale_uploads
+RESUMABLE_UPLOAD_EXPIRY_HOURS = int(
+    os.environ.get("RESUMABLE_UPLOAD_EXPIRY_HOURS", 24)
+)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -235,10 +315,15 @@ from core.unfold_config import UNFOLD
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.PrincipalJWTAuthentication",
     ),
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetPagination",
 }
 
+# ?page_size= is honoured up to PAGINATION_MAX_PAGE_SIZE
+PAGINATION_PAGE_SIZE = int(os.environ.get("PAGINATION_PAGE_SIZE", 50))
+PAGINATION_MAX_PAGE_SIZE = int(os.environ.get("PAGINATION_MAX_PAGE_SIZE", 200))
+
 from datetime import timedelta
 
 SIMPLE_JWT = {
@@ -251,3 +336,88 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),  # Needed for Authorization: Bearer <token>
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
 }
+
+
+# external HTTP client (HEMIS and university APIs), see core/http_client.py
+
+EXTERNAL_HTTP = {
+    "CONNECT_TIMEOUT": float(os.environ.get("EXTERNAL_HTTP_CONNECT_TIMEOUT", "3")),
+    "READ_TIMEOUT": float(os.environ.get("EXTERNAL_HTTP_READ_TIMEOUT", "10")),
+    "RETRIES": 2,  # only idempotent requests are retried
+    "BACKOFF_FACTOR": 0.3,
+    "POOL_MAXSIZE": 10,
+    # async views share one pool per worker; caps concurrent upstream calls
+    "ASYNC_MAX_CONNECTIONS": 100,
+    "BREAKER_FAILURE_THRESHOLD": 5,
+    "BREAKER_RESET_TIMEOUT": 30,  # seconds an open circuit fails fast
+}
+
+
+# cache: Redis shared by all workers when REDIS_URL is set, per-process otherwise
+
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# seconds a cached list/retrieve response lives; signals invalidate it earlier
+VIEW_CACHE_TIMEOUT = int(os.environ.get("VIEW_CACHE_TIMEOUT", 60 * 60 * 6))
+
+# short TTL on top of signal invalidation for student dashboard sections
+STUDENT_DASHBOARD_CACHE_TIMEOUT = int(
+    os.environ.get("STUDENT_DASHBOARD_CACHE_TIMEOUT", 60)
+)
+
+# live proctoring feed: Django publishes to Redis, the AI service's websocket
+# fans out to professors holding a ticket signed with this shared secret; both
+# services read it from the same variable and there is no default
+PROCTORING_FEED_SECRET = os.environ.get("PROCTORING_FEED_SECRET", "")
+PROCTORING_FEED_TICKET_TTL = int(os.environ.get("PROCTORING_FEED_TICKET_TTL", 60))
+PROCTORING_FEED_URL = os.environ.get(
+    "PROCTORING_FEED_URL", "/imtihon/ai/proctoring/ws"
+)
+
+# evidence previews: longest side in px and WebP quality (students/thumbnails.py)
+EVIDENCE_THUMBNAIL_SIZE = int(os.environ.get("EVIDENCE_THUMBNAIL_SIZE", 320))
+EVIDENCE_THUMBNAIL_QUALITY = int(os.environ.get("EVIDENCE_THUMBNAIL_QUALITY", 70))
+# frames of one session whose perceptual hashes differ in at most this many of
+# 64 bits share the earlier frame's file; unset keeps every frame
+EVIDENCE_PHASH_THRESHOLD = (
+    int(os.environ["EVIDENCE_PHASH_THRESHOLD"])
+    if os.environ.get("EVIDENCE_PHASH_THRESHOLD")
+    else None
+)
+
+# in-process background work (core/background.py); eager runs it inline
+BACKGROUND_WORKERS = int(os.environ.get("BACKGROUND_WORKERS", 2))
+BACKGROUND_TASKS_EAGER = False
+
+# roster import: rows per transaction and processes hashing passwords
+ROSTER_IMPORT_BATCH_SIZE = int(os.environ.get("ROSTER_IMPORT_BATCH_SIZE", 1000))
+# how often the importer process looks for queued imports when idle
+ROSTER_IMPORT_POLL_SECONDS = int(os.environ.get("ROSTER_IMPORT_POLL_SECONDS", 5))
+PASSWORD_HASH_WORKERS = int(
+    os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1)
+)
+
+# cheating score: students.scoring.weighted_score unless overridden; per
+# assignment type overrides of "weights" and "saturation", e.g.
+# {"exam": {"weights": {"ai": 0.4, "tab_switch": 0.0}}}
+CHEATING_SCORE_FUNCTION = "students.scoring.weighted_score"
+CHEATING_SCORING = {}
+
+# per-assignment item analytics; answer writes invalidate it earlier
+ASSIGNMENT_ANALYTICS_CACHE_TIMEOUT = int(
+    os.environ.get("ASSIGNMENT_ANALYTICS_CACHE_TIMEOUT", 60 * 10)
+)
@@ -0,0 +1,31 @@
+# streaming.py
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+_DONE = object()
+
+
+def served_over_asgi(request):
+    """``request`` (Django's or DRF's) came in through core.asgi."""
+    return isinstance(getattr(request, "_request", request), ASGIRequest)
+
+
+async def iterate_in_thread(iterator):
+    """
+    Async iterator over a sync ``iterator``. Under ASGI Django consumes a
+    sync streaming body with sync_to_async(list), i.e. whole, before the
+    first byte goes out; this pulls one item at a time instead, in the
+    thread sync views run in, so a server-side cursor stays on the
+    connection that opened it.
+    """
+    take = sync_to_async(next)
+    while (item := await take(iterator, _DONE)) is not _DONE:
+        yield item
+
+
+def streaming_body(request, iterator):
+    """``iterator`` as a StreamingHttpResponse body for ``request``."""
+    if served_over_asgi(request):
+        return iterate_in_thread(iterator)
+    return iterator
@@ -0,0 +1,97 @@
+# testing.py
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+
+from assignments.models import AssignmentModel, AssignmentsGroupModel
+from core.authentication import users_with_profiles
+from course.models import CourseLessonModel, CourseModel, CourseSectionModel
+from professors.models import ProfessorProfileModel
+from students.models import (
+    StudentCourseModel,
+    StudentCourseProgressModel,
+    StudentProfileModel,
+    StudentsGroupModel,
+)
+from university.models import (
+    DepartmentModel,
+    FacultyModel,
+    GroupModel,
+    SubjectModel,
+    UniversityModel,
+)
+
+
+class StudentFixtureMixin:
+    """University, group, course and an exam assigned to a logged-in student."""
+
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user(username="owner", password="testpass")
+        self.university = UniversityModel.objects.create(user=owner, name="Uni")
+        faculty = FacultyModel.objects.create(
+            university=self.university, name="Faculty", code="F1"
+        )
+        department = DepartmentModel.objects.create(
+            faculty=faculty, name="Dept", code="D1"
+        )
+        self.group = GroupModel.objects.create(
+            university=self.university, department=department, name="G1"
+        )
+        self.subject = SubjectModel.objects.create(
+            university=self.university, department=department, name="Math", code="M1"
+        )
+        professor_user = User.objects.create_user(username="prof", password="testpass")
+        self.professor = ProfessorProfileModel.objects.create(
+            user=professor_user,
+            university=self.university,
+            professor_id="P001",
+            name="Prof",
+        )
+        self.user = User.objects.create_user(username="student", password="testpass")
+        self.profile = StudentProfileModel.objects.create(
+            user=self.user,
+            student_id_number="S001",
+            image_url="http://a.com/a.png",
+            first_name="Ali",
+            university=self.university,
+        )
+        StudentsGroupModel.objects.create(student=self.profile, group=self.group)
+
+        self.course = CourseModel.objects.create(
+            subject=self.subject, name="Course", description="desc"
+        )
+        self.section = CourseSectionModel.objects.create(
+            course=self.course, name="Section", description="desc"
+        )
+        self.lessons = [
+            CourseLessonModel.objects.create(
+                section=self.section, name=f"L{i}", text="t"
+            )
+            for i in range(2)
+        ]
+        self.student_course = StudentCourseModel.objects.create(
+            course=self.course, student=self.profile, start_time=timezone.now()
+        )
+        StudentCourseProgressModel.objects.create(
+            student_course=self.student_course,
+            lesson=self.lessons[0],
+            is_completed=True,
+        )
+
+        self.assignment = AssignmentModel.objects.create(
+            subject=self.subject,
+            professor=self.professor,
+            type="exam",
+            start_time=timezone.now(),
+            end_time=timezone.now() + timedelta(hours=1),
+            description="desc",
+            max_grade=100,
+        )
+        AssignmentsGroupModel.objects.create(assignment=self.assignment, group=self.group)
+
+        # loaded as PrincipalJWTAuthentication does, with the profiles joined
+        self.client.force_authenticate(users_with_profiles(User).get(pk=self.user.pk))
@@ -1,9 +1,6 @@
 from django.templatetags.static import static
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
-from drf_yasg import openapi
 
 # from django.templatetags.static import static
 from django.urls import reverse
@@ -326,16 +323,3 @@ LOGGING = {
 def setup_logging():
     logging.config.dictConfig(LOGGING)
 
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Imtihon Educational Management System",
-        default_version="v1",
-        description="API for Imtihon Educational Management System",
-        terms_of_service="https:#www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@imtihon.local"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
@@ -15,6 +15,7 @@ urlpatterns = [
     path("imtihon/crud/api/students/", include("students.urls")),
     # path("api/professors/", include("professors.urls")),
     path("imtihon/crud/api/auth/", include("accounts.urls")),
+    path("imtihon/crud/api/uploads/", include("uploads.urls")),
     # 🚨 Import only this: routes limited by patterns in schema_urls.py
     path("imtihon/crud/docs/", include("core.schema_urls")),
 ]
@@ -0,0 +1,103 @@
+# values.py
+
+from functools import lru_cache
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+
+# to_representation() of these returns a value .values() already gives as is
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesSerializer:
+    """
+    Read-only twin of a ModelSerializer for large lists: the fields are
+    compiled once into ``.values()`` lookups and per-field converters, and
+    rows go from the queryset to dicts without model instances or the
+    per-field serializer machinery. The output is the serializer's own.
+
+    Only fields with a plain column behind them are supported (dotted
+    sources become joins); anything else is rejected when the class is
+    compiled, so the two paths cannot drift apart silently.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        serializer = serializer_class()
+        self.fields = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            self.fields.append((name, self._lookup(field), *self._converter(field)))
+        self.lookups = tuple(dict.fromkeys(lookup for _, lookup, _, _ in self.fields))
+
+    def _lookup(self, field):
+        unsupported = (
+            serializers.BaseSerializer,
+            serializers.ManyRelatedField,
+            serializers.SerializerMethodField,
+        )
+        if (
+            isinstance(field, unsupported)
+            or field.source == "*"
+            or (
+                isinstance(field, serializers.RelatedField)
+                and not isinstance(field, serializers.PrimaryKeyRelatedField)
+            )
+        ):
+            raise ImproperlyConfigured(
+                f"{self.serializer_class.__name__}.{field.field_name} has no "
+                ".values() equivalent"
+            )
+        return field.source.replace(".", "__")
+
+    def _converter(self, field):
+        """(converter, needs request) for one field; None keeps the value."""
+        if isinstance(field, serializers.FileField):
+            return _file_url(field), True
+        if isinstance(field, PASSTHROUGH_FIELDS) and not isinstance(
+            field, serializers.MultipleChoiceField
+        ):
+            return None, False
+        return field.to_representation, False
+
+    def values(self, queryset):
+        return queryset.values(*self.lookups)
+
+    def to_representation(self, rows, request=None):
+        fields = self.fields
+        data = []
+        for row in rows:
+            item = {}
+            for name, lookup, convert, with_request in fields:
+                value = row[lookup]
+                if convert is not None and value is not None:
+                    value = convert(value, request) if with_request else convert(value)
+                item[name] = value
+            data.append(item)
+        return data
+
+
+def _file_url(field):
+    storage = field.parent.Meta.model._meta.get_field(field.source).storage
+
+    def convert(name, request):
+        # as FileField.to_representation: "" is no file, URLs absolute with a request
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return convert
+
+
+@lru_cache(maxsize=None)
+def values_serializer(serializer_class):
+    return ValuesSerializer(serializer_class)
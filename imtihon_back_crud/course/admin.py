@@ -1,4 +1,5 @@
 from unfold.admin import ModelAdmin
+from unfold.contrib.filters.admin import AutocompleteSelectFilter
 from .models import (
     CourseModel,
     CourseSectionModel,
@@ -28,7 +29,9 @@ class CourseModelAdmin(ModelAdmin):
         "subject__name",
         "description",
     )
-    list_filter = ("subject",)
+    list_filter = (("subject", AutocompleteSelectFilter),)
+    list_select_related = ("subject__university",)
+    autocomplete_fields = ("subject",)
     ordering = ("name",)
     readonly_fields = ("id",)
     inlines = [CourseAttachmentsModelInline]
@@ -38,7 +41,9 @@ class CourseModelAdmin(ModelAdmin):
 class CourseSectionModelAdmin(ModelAdmin):
     list_display = ("id", "name", "course", "description", "intro_video", "intro_image")
     search_fields = ("name", "course__name", "description")
-    list_filter = ("course",)
+    list_filter = (("course", AutocompleteSelectFilter),)
+    list_select_related = ("course",)
+    autocomplete_fields = ("course",)
     ordering = ("course", "name")
     readonly_fields = ("id",)
 
@@ -47,6 +52,8 @@ class CourseSectionModelAdmin(ModelAdmin):
 class CourseLessonModelAdmin(ModelAdmin):
     list_display = ("id", "name", "section", "text", "video", "image")
     search_fields = ("name", "section__name", "text")
-    list_filter = ("section",)
+    list_filter = (("section", AutocompleteSelectFilter),)
+    list_select_related = ("section__course",)
+    autocomplete_fields = ("section",)
     ordering = ("section", "name")
     readonly_fields = ("id",)
@@ -0,0 +1,97 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import F, Q
+
+from course.models import CourseLessonModel
+from course.transcoding import transcode_lesson
+
+
+class Command(BaseCommand):
+    help = (
+        "Transcode lesson videos that are waiting: uploaded before HLS, or "
+        "queued and not yet picked up. With --watch it is the transcoder "
+        "process and keeps picking up lessons as they are uploaded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retry-failed", action="store_true", help="also retry failed lessons"
+        )
+        parser.add_argument("--limit", type=int, help="stop after this many lessons")
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="run until stopped; run one such process per deployment",
+        )
+
+    def handle(self, *args, **options):
+        if options["watch"]:
+            return self.watch()
+
+        statuses = ["pending", "processing"]
+        if options["retry_failed"]:
+            statuses.append("failed")
+        pending = (
+            CourseLessonModel.objects.exclude(video="")
+            .exclude(video__isnull=True)
+            .filter(Q(hls_status__in=statuses) | ~Q(hls_source=F("video")))
+            .order_by("id")
+            .values_list("id", "video")
+        )
+        if options["limit"]:
+            pending = pending[: options["limit"]]
+
+        ready = failed = 0
+        for lesson_id, video in pending:
+            CourseLessonModel.objects.filter(pk=lesson_id).update(
+                hls_source=video, hls_status="pending"
+            )
+            if self.transcode(lesson_id):
+                ready += 1
+            else:
+                failed += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Transcoded {ready} lessons, {failed} failed.")
+        )
+
+    def watch(self):
+        # the lesson table is the queue: uploads leave lessons "pending".
+        # "processing" at startup was cut off by a stop or crash of this
+        # process, the only one transcoding, so it is queued again.
+        recovered = CourseLessonModel.objects.filter(hls_status="processing").update(
+            hls_status="pending"
+        )
+        if recovered:
+            self.stdout.write(f"Requeued {recovered} interrupted lessons.")
+        while True:
+            close_old_connections()
+            lesson_id = self.claim_next()
+            if lesson_id is None:
+                time.sleep(settings.HLS_WORKER_POLL_SECONDS)
+                continue
+            self.transcode(lesson_id)
+
+    def claim_next(self):
+        """Oldest pending lesson, marked processing; None when there is none."""
+        for lesson_id in (
+            CourseLessonModel.objects.filter(hls_status="pending")
+            .order_by("id")
+            .values_list("id", flat=True)[:10]
+        ):
+            if CourseLessonModel.objects.filter(
+                pk=lesson_id, hls_status="pending"
+            ).update(hls_status="processing"):
+                return lesson_id
+        return None
+
+    def transcode(self, lesson_id):
+        transcode_lesson(lesson_id)
+        lesson = CourseLessonModel.objects.get(pk=lesson_id)
+        if lesson.hls_status == "ready":
+            return True
+        self.stdout.write(self.style.WARNING(f"lesson {lesson_id}: {lesson.hls_error}"))
+        return False
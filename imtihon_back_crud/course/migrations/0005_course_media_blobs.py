@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:44
+
+import uploads.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0004_alter_courseattachmentsmodel_course_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='courseattachmentsmodel',
+            name='attachment_file',
+            field=models.FileField(storage=uploads.storage.blob_storage, upload_to=''),
+        ),
+        migrations.AlterField(
+            model_name='courselessonmodel',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=uploads.storage.blob_storage, upload_to='uploads/course_lesson/image/%Y/%m/%d/'),
+        ),
+        migrations.AlterField(
+            model_name='courselessonmodel',
+            name='video',
+            field=models.FileField(blank=True, null=True, storage=uploads.storage.blob_storage, upload_to='uploads/course_lesson/video/%Y/%m/%d/'),
+        ),
+        migrations.AlterField(
+            model_name='coursemodel',
+            name='intro_image',
+            field=models.ImageField(blank=True, null=True, storage=uploads.storage.blob_storage, upload_to='uploads/course/%Y/%m/%d/'),
+        ),
+        migrations.AlterField(
+            model_name='coursesectionmodel',
+            name='intro_image',
+            field=models.ImageField(blank=True, null=True, storage=uploads.storage.blob_storage, upload_to='uploads/course_section/video/%Y/%m/%d/'),
+        ),
+        migrations.AlterField(
+            model_name='coursesectionmodel',
+            name='intro_video',
+            field=models.FileField(blank=True, null=True, storage=uploads.storage.blob_storage, upload_to='uploads/course_section/video/%Y/%m/%d/'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:50
+
+import uploads.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0005_course_media_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courselessonmodel',
+            name='duration',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='courselessonmodel',
+            name='hls_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='courselessonmodel',
+            name='hls_path',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='courselessonmodel',
+            name='hls_source',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='courselessonmodel',
+            name='hls_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='courselessonmodel',
+            name='poster',
+            field=models.ImageField(blank=True, null=True, storage=uploads.storage.blob_storage, upload_to=''),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    CourseModel = apps.get_model("course", "CourseModel")
+    CourseSectionModel = apps.get_model("course", "CourseSectionModel")
+
+    sections = list(
+        CourseSectionModel.objects.annotate(count=models.Count("lessons"))
+    )
+    for section in sections:
+        section.lesson_count = section.count
+    CourseSectionModel.objects.bulk_update(
+        sections, ["lesson_count"], batch_size=1000
+    )
+
+    courses = list(CourseModel.objects.annotate(count=models.Count("sections__lessons")))
+    for course in courses:
+        course.lesson_count = course.count
+    CourseModel.objects.bulk_update(courses, ["lesson_count"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0006_lesson_hls'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursemodel',
+            name='lesson_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='coursesectionmodel',
+            name='lesson_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from university.models import UniversityModel, SubjectModel
 from professors.models import ProfessorProfileModel
+from uploads.storage import blob_storage
 
 
 class CourseModel(models.Model):
@@ -11,8 +12,13 @@ class CourseModel(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField()
     intro_image = models.ImageField(
-        upload_to="uploads/course/%Y/%m/%d/", null=True, blank=True
+        upload_to="uploads/course/%Y/%m/%d/",
+        null=True,
+        blank=True,
+        storage=blob_storage,
     )
+    # kept by students.progress as lessons come and go
+    lesson_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self) -> str:
         return f"id: {self.id} name: {self.name}"
@@ -25,28 +31,59 @@ class CourseSectionModel(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField()
     intro_video = models.FileField(
-        upload_to="uploads/course_section/video/%Y/%m/%d/", null=True, blank=True
+        upload_to="uploads/course_section/video/%Y/%m/%d/",
+        null=True,
+        blank=True,
+        storage=blob_storage,
     )
     intro_image = models.ImageField(
-        upload_to="uploads/course_section/video/%Y/%m/%d/", null=True, blank=True
+        upload_to="uploads/course_section/video/%Y/%m/%d/",
+        null=True,
+        blank=True,
+        storage=blob_storage,
     )
+    lesson_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self) -> str:
         return f"course: {self.course.name} - section: {self.name}"
 
 
 class CourseLessonModel(models.Model):
+    HLS_STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
+
     section = models.ForeignKey(
         CourseSectionModel, on_delete=models.CASCADE, related_name="lessons"
     )
     name = models.CharField(max_length=255)
     text = models.TextField()
     video = models.FileField(
-        upload_to="uploads/course_lesson/video/%Y/%m/%d/", null=True, blank=True
+        upload_to="uploads/course_lesson/video/%Y/%m/%d/",
+        null=True,
+        blank=True,
+        storage=blob_storage,
     )
     image = models.ImageField(
-        upload_to="uploads/course_lesson/image/%Y/%m/%d/", null=True, blank=True
+        upload_to="uploads/course_lesson/image/%Y/%m/%d/",
+        null=True,
+        blank=True,
+        storage=blob_storage,
+    )
+
+    # HLS renditions and poster made in the background by course.transcoding
+    hls_status = models.CharField(
+        max_length=10, choices=HLS_STATUS_CHOICES, blank=True, default=""
     )
+    # video file name the current renditions are (being) made from
+    hls_source = models.CharField(max_length=255, blank=True, default="")
+    hls_path = models.CharField(max_length=255, blank=True, default="")
+    hls_error = models.TextField(blank=True, default="")
+    poster = models.ImageField(null=True, blank=True, storage=blob_storage)
+    duration = models.FloatField(null=True, blank=True)
 
     def __str__(self) -> str:
         return f"course: {self.section.course.name} - lesson: {self.name}"
@@ -59,7 +96,7 @@ class CourseAttachmentsModel(models.Model):
     course = models.ForeignKey(
         CourseModel, on_delete=models.CASCADE, related_name="course_attachments"
     )
-    attachment_file = models.FileField()
+    attachment_file = models.FileField(storage=blob_storage)
 
     def __str__(self) -> str:
-        return f"attachment for course: {self.course.id}"
+        return f"attachment for course: {self.course_id}"
@@ -1,34 +1,63 @@
+from django.urls import reverse
 from rest_framework import serializers
+
+from core.media import signed_media_url
+from core.principal import get_principal
 from course.models import (
     CourseModel,
     CourseSectionModel,
     CourseLessonModel,
     CourseAttachmentsModel,
 )
+from students.progress import completion_percent
 
 
 class CourseLessonModelSerializer(serializers.ModelSerializer):
+    hls = serializers.SerializerMethodField(
+        help_text="Signed HLS master playlist URL once hls_status is ready."
+    )
+
     class Meta:
         model = CourseLessonModel
-        fields = ["id", "section", "name", "text", "video", "image"]
+        fields = [
+            "id",
+            "section",
+            "name",
+            "text",
+            "video",
+            "image",
+            "poster",
+            "duration",
+            "hls_status",
+            "hls",
+        ]
+        read_only_fields = ["poster", "duration", "hls_status"]
+
+    def get_hls(self, instance):
+        request = self.context.get("request")
+        if instance.hls_status != "ready" or request is None:
+            return None
+        base = reverse("courselessonmodel-detail", args=[instance.pk]) + "hls/"
+        return signed_media_url(request, f"{base}master.m3u8/", prefix=base)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        request = self.context.get("request")
+        # videos are only reachable through the access-checked endpoint
+        if instance.video and request is not None:
+            data["video"] = signed_media_url(
+                request, reverse("courselessonmodel-video", args=[instance.pk])
+            )
+        return data
 
     def validate_section(self, section):
-        user = self.context["request"].user
-
-        if hasattr(user, "student_profile"):
-            university = user.student_profile.university
-
-        elif hasattr(user, "professor_profile"):
-            university = user.professor_profile.university
-        elif hasattr(user, "university"):
-            university = user.university
-
-        else:
+        university_id = get_principal(self.context["request"].user).university_id
+        if university_id is None:
             raise serializers.ValidationError(
                 "User is not associated with a university."
             )
 
-        if section.course.subject.university != university:
+        if section.course.subject.university_id != university_id:
             raise serializers.ValidationError(
                 "You can only assign sections from your own university."
             )
@@ -48,26 +77,28 @@ class CourseSectionModelSerializer(serializers.ModelSerializer):
             "description",
             "intro_video",
             "intro_image",
+            "lesson_count",
             "lessons",
         ]
 
-    def validate_course(self, course):
-        user = self.context["request"].user
-
-        if hasattr(user, "student_profile"):
-            university = user.student_profile.university
-
-        elif hasattr(user, "professor_profile"):
-            university = user.professor_profile.university
-        elif hasattr(user, "university"):
-            university = user.university
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        request = self.context.get("request")
+        if instance.intro_video and request is not None:
+            data["intro_video"] = signed_media_url(
+                request,
+                reverse("coursesectionmodel-intro-video", args=[instance.pk]),
+            )
+        return data
 
-        else:
+    def validate_course(self, course):
+        university_id = get_principal(self.context["request"].user).university_id
+        if university_id is None:
             raise serializers.ValidationError(
                 "User is not associated with a university."
             )
 
-        if course.subject.university != university:
+        if course.subject.university_id != university_id:
             raise serializers.ValidationError(
                 "You can only assign courses from your own university."
             )
@@ -81,22 +112,13 @@ class CourseAttachmentModelSerializer(serializers.ModelSerializer):
         fields = ["id", "course", "attachment_file"]
 
     def validate_course(self, course):
-        user = self.context["request"].user
-
-        if hasattr(user, "student_profile"):
-            university = user.student_profile.university
-
-        elif hasattr(user, "professor_profile"):
-            university = user.professor_profile.university
-        elif hasattr(user, "university"):
-            university = user.university
-
-        else:
+        university_id = get_principal(self.context["request"].user).university_id
+        if university_id is None:
             raise serializers.ValidationError(
                 "User is not associated with a university."
             )
 
-        if course.subject.university != university:
+        if course.subject.university_id != university_id:
             raise serializers.ValidationError(
                 "You can only assign courses from your own university."
             )
@@ -106,6 +128,9 @@ class CourseAttachmentModelSerializer(serializers.ModelSerializer):
 
 class CourseModelSerializer(serializers.ModelSerializer):
     course_attachments = CourseAttachmentModelSerializer(many=True, read_only=True)
+    completion_percent = serializers.SerializerMethodField(
+        help_text="The student's progress; null when not enrolled or not a student."
+    )
 
     class Meta:
         model = CourseModel
@@ -115,26 +140,26 @@ class CourseModelSerializer(serializers.ModelSerializer):
             "intro_image",
             "name",
             "description",
+            "lesson_count",
+            "completion_percent",
             "course_attachments",
         ]
 
-    def validate_subject(self, subject):
-        user = self.context["request"].user
-
-        if hasattr(user, "student_profile"):
-            university = user.student_profile.university
+    def get_completion_percent(self, instance):
+        # annotated by CourseModelViewSet.get_queryset for students
+        completed = getattr(instance, "completed_lessons", None)
+        if completed is None:
+            return None
+        return completion_percent(completed, instance.lesson_count)
 
-        elif hasattr(user, "professor_profile"):
-            university = user.professor_profile.university
-        elif hasattr(user, "university"):
-            university = user.university
-
-        else:
+    def validate_subject(self, subject):
+        university_id = get_principal(self.context["request"].user).university_id
+        if university_id is None:
             raise serializers.ValidationError(
                 "User is not associated with a university."
             )
 
-        if subject.university != university:
+        if subject.university_id != university_id:
             raise serializers.ValidationError(
                 "You can only assign subjects from your own university."
             )
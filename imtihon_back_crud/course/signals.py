@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from course.models import (
+    CourseAttachmentsModel,
+    CourseLessonModel,
+    CourseModel,
+    CourseSectionModel,
+)
+from course.transcoding import remove_hls, transcode_lesson
+from course.tree import invalidate_tree
+
+
+@receiver(post_save, sender=CourseLessonModel)
+def queue_lesson_transcode(sender, instance, **kwargs):
+    name = instance.video.name if instance.video else ""
+    if name == instance.hls_source:
+        return
+    # written with update() so this handler does not run again
+    CourseLessonModel.objects.filter(pk=instance.pk).update(
+        hls_source=name,
+        hls_status="pending" if name else "",
+        hls_path="",
+        hls_error="",
+    )
+    instance.hls_source = name
+    if not name:
+        transaction.on_commit(lambda: remove_hls(instance.pk))
+    elif getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+        transcode_lesson(instance.pk)
+    # otherwise "pending" queues it for the transcoder process
+    # (manage.py transcode_lessons --watch): an ffmpeg run takes up to
+    # HLS_TRANSCODE_TIMEOUT, too long for the web process's background pool
+
+
+@receiver(post_delete, sender=CourseLessonModel)
+def remove_lesson_renditions(sender, instance, **kwargs):
+    lesson_id = instance.pk
+    transaction.on_commit(lambda: remove_hls(lesson_id))
+
+
+# cached course trees: post_init remembers the parent a row was loaded under so
+# a move also drops the tree it left
+
+
+@receiver(post_init, sender=CourseLessonModel)
+def remember_tree_section(sender, instance, **kwargs):
+    instance._tree_section_id = instance.__dict__.get("section_id")
+
+
+@receiver([post_save, post_delete], sender=CourseLessonModel)
+def refresh_tree_lesson(sender, instance, **kwargs):
+    section_ids = {instance._tree_section_id, instance.section_id}
+    instance._tree_section_id = instance.section_id
+    invalidate_tree(
+        *CourseSectionModel.objects.filter(pk__in=section_ids - {None})
+        .values_list("course_id", flat=True)
+        .distinct()
+    )
+
+
+@receiver(post_init, sender=CourseSectionModel)
+def remember_tree_course(sender, instance, **kwargs):
+    instance._tree_course_id = instance.__dict__.get("course_id")
+
+
+@receiver([post_save, post_delete], sender=CourseSectionModel)
+def refresh_tree_section(sender, instance, **kwargs):
+    invalidate_tree(instance._tree_course_id, instance.course_id)
+    instance._tree_course_id = instance.course_id
+
+
+@receiver([post_save, post_delete], sender=CourseAttachmentsModel)
+def refresh_tree_attachment(sender, instance, **kwargs):
+    invalidate_tree(instance.course_id)
+
+
+@receiver([post_save, post_delete], sender=CourseModel)
+def refresh_tree_course(sender, instance, **kwargs):
+    invalidate_tree(instance.pk)
@@ -1,8 +1,32 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
 from rest_framework.test import APITestCase
 from django.urls import reverse
 from rest_framework import status
+from django.conf import settings
 from django.contrib.auth.models import User
-from course.models import CourseModel, CourseSectionModel, CourseLessonModel
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from course.models import (
+    CourseAttachmentsModel,
+    CourseModel,
+    CourseSectionModel,
+    CourseLessonModel,
+)
+from course.transcoding import hls_directory
+from core.authentication import tokens_for_user
+from core.testing import StudentFixtureMixin
+from students.models import StudentCourseModel, StudentProfileModel
 from university.models import UniversityModel
 from professors.models import ProfessorProfileModel
 
@@ -51,3 +75,368 @@ class CourseAPITestCase(APITestCase):
         url = reverse('courselessonmodel-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class CourseProgressExportTestCase(StudentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("coursemodel-export-progress", args=[self.course.id])
+
+    def test_professor_exports_progress(self):
+        self.client.force_authenticate(self.professor.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = (
+            b"".join(response.streaming_content).decode("utf-8-sig").splitlines()
+        )
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith("student_id_number,full_name"))
+        self.assertTrue(lines[1].startswith("S001,"))
+        self.assertTrue(lines[1].endswith(",1,2"))
+
+    async def test_streams_without_buffering_over_asgi(self):
+        token = await sync_to_async(tokens_for_user)(self.professor.user)
+        response = await self.async_client.get(
+            self.url, headers={"authorization": f"Bearer {token.access_token}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.decode("utf-8-sig").splitlines()), 2)
+
+    def test_student_cannot_export(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CourseProgressCounterTestCase(StudentFixtureMixin, APITestCase):
+    def counters(self):
+        self.course.refresh_from_db()
+        self.section.refresh_from_db()
+        self.student_course.refresh_from_db()
+        return (
+            self.course.lesson_count,
+            self.section.lesson_count,
+            self.student_course.completed_lessons,
+        )
+
+    def test_counters_follow_lessons_and_progress(self):
+        self.assertEqual(self.counters(), (2, 2, 1))
+
+        response = self.client.post(
+            reverse("studentcoursemodel-add-progress"),
+            {
+                "student_course": self.student_course.id,
+                "lesson": self.lessons[1].id,
+                "is_completed": False,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.counters(), (2, 2, 1))
+        url = reverse("studentcoursemodel-complete", args=[response.data["id"]])
+        self.client.post(url)
+        self.client.post(url)  # already completed, not counted twice
+        self.assertEqual(self.counters(), (2, 2, 2))
+
+        self.lessons[1].delete()
+        self.assertEqual(self.counters(), (1, 1, 1))
+
+        other = CourseSectionModel.objects.create(
+            course=self.course, name="Other", description="desc"
+        )
+        self.lessons[0].section = other
+        self.lessons[0].save()
+        other.refresh_from_db()
+        self.assertEqual(self.counters(), (1, 0, 1))
+        self.assertEqual(other.lesson_count, 1)
+
+    def test_course_list_shows_progress_without_extra_queries(self):
+        url = reverse("coursemodel-list")
+        with CaptureQueriesContext(connection) as one:
+            response = self.client.get(url)
+        course = response.data["results"][0]
+        self.assertEqual(course["lesson_count"], 2)
+        self.assertEqual(course["completion_percent"], 50)
+
+        for i in range(3):
+            CourseModel.objects.create(
+                subject=self.subject, name=f"C{i}", description="desc"
+            )
+        with self.assertNumQueries(len(one)):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 4)
+
+        response = self.client.get(reverse("student-courses"))
+        self.assertEqual(response.data["results"][0]["completion_percent"], 50)
+
+    def test_starting_a_course_again_keeps_the_enrollment(self):
+        response = self.client.post(
+            reverse("studentcoursemodel-student-course"), {"course": self.course.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], self.student_course.id)
+        self.assertEqual(self.counters(), (2, 2, 1))
+
+    def test_recount_command_repairs_drift(self):
+        StudentCourseModel.objects.update(completed_lessons=7)
+        CourseModel.objects.update(lesson_count=0)
+        call_command("recount_course_progress", stdout=StringIO())
+        self.assertEqual(self.counters(), (2, 2, 1))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class CourseTreeTestCase(StudentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("coursemodel-tree", args=[self.course.id])
+
+    def test_tree_nests_sections_lessons_and_attachments(self):
+        with mock.patch("course.signals.transcode_lesson"):
+            self.lessons[0].video = SimpleUploadedFile("a.mp4", b"\x00" * 16)
+            self.lessons[0].save()
+        CourseAttachmentsModel.objects.create(
+            course=self.course, attachment_file=SimpleUploadedFile("a.pdf", b"pdf")
+        )
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["lesson_count"], 2)
+        attachment = data["course_attachments"][0]
+        self.assertTrue(attachment["attachment_file"].startswith("http"))
+        section = data["sections"][0]
+        names = [lesson["name"] for lesson in section["lessons"]]
+        self.assertEqual(names, ["L0", "L1"])
+        video = section["lessons"][0]["video"]
+        self.assertIn("?token=", video)
+        self.assertIsNone(section["lessons"][1]["video"])
+        self.assertEqual(self.client.get(video).status_code, status.HTTP_200_OK)
+
+        # the cached structure is shared, the signature is not
+        self.client.force_authenticate(self.professor.user)
+        other = self.client.get(self.url).json()["sections"][0]["lessons"][0]["video"]
+        self.assertNotEqual(other, video)
+
+    def test_queries_do_not_grow_and_changes_invalidate(self):
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get(self.url)
+        with CaptureQueriesContext(connection) as warm:
+            self.client.get(self.url)
+        self.assertLess(len(warm), len(cold))
+
+        cache.clear()
+        for i in range(5):
+            section = CourseSectionModel.objects.create(
+                course=self.course, name=f"S{i}", description="desc"
+            )
+            CourseLessonModel.objects.create(section=section, name="L", text="t")
+        with self.assertNumQueries(len(cold)):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data["sections"]), 6)
+
+        self.lessons[1].name = "renamed"
+        self.lessons[1].save()
+        lessons = self.client.get(self.url).data["sections"][0]["lessons"]
+        self.assertEqual([lesson["name"] for lesson in lessons], ["L0", "renamed"])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), PROTECTED_MEDIA_X_ACCEL=True)
+class LessonVideoTestCase(StudentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.lesson = CourseLessonModel.objects.filter(
+            section__course=self.course
+        ).first()
+        self.lesson.video = SimpleUploadedFile("lecture.mp4", b"\x00" * 2048)
+        self.lesson.save()
+        self.video_url = reverse("courselessonmodel-video", args=[self.lesson.id])
+
+    def signed_url(self):
+        response = self.client.get(
+            reverse("courselessonmodel-detail", args=[self.lesson.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["video"]
+
+    def test_signed_url_hands_off_to_nginx(self):
+        url = self.signed_url()
+        self.assertIn(self.video_url + "?token=", url)
+        # the <video> element sends no Authorization header
+        self.client.force_authenticate(None)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response["X-Accel-Redirect"], "/protected-media/" + self.lesson.video.name
+        )
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertEqual(response.content, b"")
+
+    def test_token_opens_only_its_own_path(self):
+        token = self.signed_url().split("?token=")[1]
+        self.client.force_authenticate(None)
+        other = reverse("courselessonmodel-video", args=[self.lesson.id + 1])
+        response = self.client.get(other, {"token": token})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get(self.video_url, {"token": token + "x"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_other_university_gets_404(self):
+        other_owner = User.objects.create_user(username="owner2", password="x")
+        other_user = User.objects.create_user(username="student2", password="x")
+        StudentProfileModel.objects.create(
+            user=other_user,
+            student_id_number="S002",
+            university=UniversityModel.objects.create(user=other_owner, name="U2"),
+        )
+        self.client.force_authenticate(other_user)
+        response = self.client.get(self.video_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(PROTECTED_MEDIA_X_ACCEL=False)
+    def test_streams_without_nginx(self):
+        response = self.client.get(self.video_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), b"\x00" * 2048)
+
+    @override_settings(PROTECTED_MEDIA_X_ACCEL=False)
+    async def test_streams_without_nginx_over_asgi(self):
+        url = await sync_to_async(self.signed_url)()
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        self.assertEqual(response["Content-Length"], "2048")
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(content, b"\x00" * 2048)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), PROTECTED_MEDIA_X_ACCEL=True)
+class LessonTranscodeTestCase(StudentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.lesson = CourseLessonModel.objects.filter(
+            section__course=self.course
+        ).first()
+
+    def upload(self, content=b"\x00" * 2048):
+        self.lesson.video = SimpleUploadedFile("lecture.mp4", content)
+        self.lesson.save()
+        self.lesson.refresh_from_db()
+
+    def test_new_video_is_queued_for_the_transcoder(self):
+        with mock.patch("course.signals.transcode_lesson") as transcode:
+            self.upload()
+            self.lesson.name = "renamed"
+            self.lesson.save()
+        transcode.assert_not_called()
+        self.assertEqual(self.lesson.hls_status, "pending")
+        self.assertEqual(self.lesson.hls_source, self.lesson.video.name)
+
+    def test_transcoder_requeues_interrupted_lessons(self):
+        with mock.patch("course.signals.transcode_lesson"):
+            self.upload()
+        stuck = CourseLessonModel.objects.exclude(pk=self.lesson.pk).first()
+        CourseLessonModel.objects.filter(pk=stuck.pk).update(
+            video="stuck.mp4", hls_source="stuck.mp4", hls_status="processing"
+        )
+        done = []
+
+        def transcode(lesson_id):
+            done.append(lesson_id)
+            CourseLessonModel.objects.filter(pk=lesson_id).update(hls_status="ready")
+
+        with mock.patch(
+            "course.management.commands.transcode_lessons.transcode_lesson",
+            side_effect=transcode,
+        ), mock.patch(
+            "course.management.commands.transcode_lessons.time.sleep",
+            side_effect=KeyboardInterrupt,
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command("transcode_lessons", "--watch", stdout=StringIO())
+        self.assertEqual(sorted(done), sorted([self.lesson.pk, stuck.pk]))
+
+    @override_settings(BACKGROUND_TASKS_EAGER=True, FFPROBE_BINARY="/missing/ffprobe")
+    def test_failure_is_recorded(self):
+        self.upload()
+        self.assertEqual(self.lesson.hls_status, "failed")
+        self.assertIn("not installed", self.lesson.hls_error)
+        response = self.client.get(
+            reverse("courselessonmodel-detail", args=[self.lesson.id])
+        )
+        self.assertIsNone(response.data["hls"])
+
+    def test_playlists_carry_signed_absolute_urls(self):
+        with mock.patch("course.signals.transcode_lesson"):
+            self.upload()
+        directory = hls_directory(self.lesson.id, self.lesson.video.name)
+        root = os.path.join(settings.MEDIA_ROOT, directory)
+        os.makedirs(root)
+        with open(os.path.join(root, "master.m3u8"), "w") as f:
+            f.write("#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=880000\nv0.m3u8\n")
+        with open(os.path.join(root, "v0.m3u8"), "w") as f:
+            f.write("#EXTM3U\n#EXTINF:6.0,\nv0_0000.ts\n#EXT-X-ENDLIST\n")
+        with open(os.path.join(root, "v0_0000.ts"), "wb") as f:
+            f.write(b"G" * 188)
+        CourseLessonModel.objects.filter(pk=self.lesson.pk).update(
+            hls_status="ready", hls_path=directory
+        )
+
+        master_url = self.client.get(
+            reverse("courselessonmodel-detail", args=[self.lesson.id])
+        ).data["hls"]
+        self.client.force_authenticate(None)
+        master = self.client.get(master_url)
+        self.assertEqual(master.status_code, status.HTTP_200_OK)
+        self.assertEqual(master["Content-Type"], "application/vnd.apple.mpegurl")
+        variant_url = master.content.decode().splitlines()[-1]
+        self.assertIn("/hls/v0.m3u8/?token=", variant_url)
+
+        variant = self.client.get(variant_url)
+        segment_url = variant.content.decode().splitlines()[2]
+        self.assertIn("/hls/v0_0000.ts/?token=", segment_url)
+        segment = self.client.get(segment_url)
+        self.assertEqual(segment.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            segment["X-Accel-Redirect"],
+            f"/protected-media/{directory}/v0_0000.ts",
+        )
+        self.assertEqual(segment["Content-Type"], "video/mp2t")
+
+        # the token is scoped to this lesson's renditions
+        token = segment_url.split("?token=")[1]
+        other = reverse("courselessonmodel-video", args=[self.lesson.id])
+        response = self.client.get(other, {"token": token})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @skipUnless(shutil.which("ffmpeg") and shutil.which("ffprobe"), "needs ffmpeg")
+    @override_settings(BACKGROUND_TASKS_EAGER=True)
+    def test_transcodes_renditions_and_poster(self):
+        source = os.path.join(tempfile.mkdtemp(), "source.mp4")
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-v",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                "testsrc=duration=3:size=854x480:rate=25",
+                "-f",
+                "lavfi",
+                "-i",
+                "sine=duration=3",
+                "-shortest",
+                source,
+            ],
+            check=True,
+        )
+        with open(source, "rb") as f:
+            self.upload(f.read())
+
+        self.assertEqual(self.lesson.hls_status, "ready", self.lesson.hls_error)
+        self.assertTrue(self.lesson.poster)
+        self.assertAlmostEqual(self.lesson.duration, 3, delta=0.5)
+        with open(
+            os.path.join(settings.MEDIA_ROOT, self.lesson.hls_path, "master.m3u8")
+        ) as f:
+            master = f.read()
+        # 360p and 480p; 720p and 1080p would be upscaled
+        self.assertEqual(master.count("#EXT-X-STREAM-INF"), 2)
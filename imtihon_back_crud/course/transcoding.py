@@ -0,0 +1,241 @@
+# transcoding.py
+
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import shutil
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+from course.models import CourseLessonModel
+from course.tree import invalidate_tree
+
+logger = logging.getLogger(__name__)
+
+HLS_ROOT = "hls/lessons"
+MASTER_PLAYLIST = "master.m3u8"
+POSTER_HEIGHT = 720
+
+
+class TranscodeError(Exception):
+    pass
+
+
+def hls_directory(lesson_id, video_name):
+    """MEDIA_ROOT-relative output directory of one uploaded video version."""
+    version = hashlib.sha1(video_name.encode()).hexdigest()[:12]
+    return f"{HLS_ROOT}/{lesson_id}/{version}"
+
+
+def _run(args):
+    try:
+        result = subprocess.run(
+            args,
+            capture_output=True,
+            text=True,
+            timeout=settings.HLS_TRANSCODE_TIMEOUT,
+        )
+    except FileNotFoundError:
+        raise TranscodeError(f"{args[0]} is not installed")
+    except subprocess.TimeoutExpired:
+        raise TranscodeError(f"{args[0]} timed out")
+    if result.returncode != 0:
+        raise TranscodeError(result.stderr.strip()[-1000:] or "ffmpeg failed")
+    return result.stdout
+
+
+def probe(path):
+    """(height, duration in seconds, has audio) of a video file."""
+    output = _run(
+        [
+            settings.FFPROBE_BINARY,
+            "-v",
+            "error",
+            "-show_entries",
+            "stream=codec_type,height:format=duration",
+            "-of",
+            "json",
+            path,
+        ]
+    )
+    info = json.loads(output)
+    streams = info.get("streams", [])
+    heights = [
+        stream["height"]
+        for stream in streams
+        if stream.get("codec_type") == "video" and stream.get("height")
+    ]
+    if not heights:
+        raise TranscodeError("no video stream")
+    duration = float((info.get("format") or {}).get("duration") or 0)
+    has_audio = any(stream.get("codec_type") == "audio" for stream in streams)
+    return heights[0], duration, has_audio
+
+
+def renditions_for(height):
+    """HLS_RENDITIONS up to the source height, lowest first; never upscaled."""
+    renditions = sorted(settings.HLS_RENDITIONS, key=lambda r: r["height"])
+    return [r for r in renditions if r["height"] <= height] or renditions[:1]
+
+
+def hls_command(source, output, renditions, has_audio):
+    """
+    One ffmpeg run: the decoded source is split and scaled once per
+    rendition, keyframes are forced on segment boundaries so players can
+    switch renditions between any two segments. Everything lands flat in
+    ``output``: master.m3u8, v0.m3u8, v0_0000.ts, ...
+    """
+    count = len(renditions)
+    seconds = settings.HLS_SEGMENT_SECONDS
+    graph = [f"[0:v]split={count}" + "".join(f"[s{i}]" for i in range(count))]
+    graph += [f"[s{i}]scale=-2:{r['height']}[v{i}]" for i, r in enumerate(renditions)]
+
+    args = [settings.FFMPEG_BINARY, "-y", "-v", "error", "-i", source]
+    args += ["-filter_complex", ";".join(graph)]
+    stream_map = []
+    for i, rendition in enumerate(renditions):
+        kbps = rendition["video_kbps"]
+        args += ["-map", f"[v{i}]", f"-b:v:{i}", f"{kbps}k"]
+        args += [f"-maxrate:v:{i}", f"{kbps}k", f"-bufsize:v:{i}", f"{2 * kbps}k"]
+        if has_audio:
+            args += ["-map", "a:0", f"-b:a:{i}", f"{rendition['audio_kbps']}k"]
+            stream_map.append(f"v:{i},a:{i}")
+        else:
+            stream_map.append(f"v:{i}")
+    args += ["-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p"]
+    args += ["-force_key_frames", f"expr:gte(t,n_forced*{seconds})"]
+    if has_audio:
+        args += ["-c:a", "aac", "-ac", "2"]
+    args += [
+        "-f",
+        "hls",
+        "-hls_time",
+        str(seconds),
+        "-hls_playlist_type",
+        "vod",
+        "-hls_flags",
+        "independent_segments",
+        "-hls_segment_filename",
+        os.path.join(output, "v%v_%04d.ts"),
+        "-master_pl_name",
+        MASTER_PLAYLIST,
+        "-var_stream_map",
+        " ".join(stream_map),
+        os.path.join(output, "v%v.m3u8"),
+    ]
+    return args
+
+
+def poster_command(source, output, duration):
+    """A frame a little into the video; the very first is often black."""
+    at = min(duration / 10, 5.0)
+    return [
+        settings.FFMPEG_BINARY,
+        "-y",
+        "-v",
+        "error",
+        "-ss",
+        f"{at:.2f}",
+        "-i",
+        source,
+        "-frames:v",
+        "1",
+        "-vf",
+        f"scale=-2:'min({POSTER_HEIGHT},ih)'",
+        "-q:v",
+        "3",
+        output,
+    ]
+
+
+def remove_hls(lesson_id, keep=None):
+    """Delete rendition directories of a lesson except ``keep``."""
+    root = os.path.join(settings.MEDIA_ROOT, HLS_ROOT, str(lesson_id))
+    if not os.path.isdir(root):
+        return
+    for entry in os.listdir(root):
+        if keep is None or posixpath.join(HLS_ROOT, str(lesson_id), entry) != keep:
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+
+
+def transcode_lesson(lesson_id):
+    """
+    Transcoder entry point (manage.py transcode_lessons): HLS renditions and
+    a poster for the lesson's current video. Renditions are written to a
+    scratch directory and renamed into place, so a half-written set is never
+    served. A video replaced while this runs leaves the result unused; the
+    new upload is queued again.
+    """
+    lesson = (
+        CourseLessonModel.objects.select_related("section").filter(pk=lesson_id).first()
+    )
+    if lesson is None or not lesson.video:
+        return
+    source_name = lesson.video.name
+    current = CourseLessonModel.objects.filter(pk=lesson_id, hls_source=source_name)
+    current.update(hls_status="processing", hls_error="")
+    # update() sends no signals; cached course trees show hls_status
+    course_id = lesson.section.course_id
+    invalidate_tree(course_id)
+
+    directory = hls_directory(lesson_id, source_name)
+    scratch_root = os.path.join(settings.MEDIA_ROOT, HLS_ROOT)
+    os.makedirs(scratch_root, exist_ok=True)
+    scratch = tempfile.mkdtemp(prefix=".tmp-", dir=scratch_root)
+    poster_path = os.path.join(scratch, "poster.jpg")
+    try:
+        height, duration, has_audio = probe(lesson.video.path)
+        renditions = renditions_for(height)
+        _run(hls_command(lesson.video.path, scratch, renditions, has_audio))
+        _run(poster_command(lesson.video.path, poster_path, duration))
+    except TranscodeError as e:
+        shutil.rmtree(scratch, ignore_errors=True)
+        logger.warning("could not transcode lesson %s: %s", lesson_id, e)
+        current.update(hls_status="failed", hls_error=str(e))
+        invalidate_tree(course_id)
+        return
+
+    with open(poster_path, "rb") as f:
+        poster = ContentFile(f.read())
+    os.remove(poster_path)
+    output = os.path.join(settings.MEDIA_ROOT, directory)
+    shutil.rmtree(output, ignore_errors=True)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    os.rename(scratch, output)
+
+    old_poster = lesson.poster.name if lesson.poster else None
+    lesson.poster.save("poster.jpg", poster, save=False)
+    updated = current.update(
+        hls_status="ready",
+        hls_path=directory,
+        poster=lesson.poster.name,
+        duration=duration,
+    )
+    storage = lesson.poster.storage
+    if not updated:
+        shutil.rmtree(output, ignore_errors=True)
+        storage.delete(lesson.poster.name)
+        return
+    invalidate_tree(course_id)
+    # update() skips django_cleanup; release what this run replaced
+    if old_poster:
+        storage.delete(old_poster)
+    remove_hls(lesson_id, keep=directory)
+
+
+def rewrite_playlist(text, base_url, token):
+    """
+    Make every URI line of an HLS playlist absolute and signed; players
+    resolve relative URIs against the playlist URL, which drops the token.
+    """
+    lines = []
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            line = f"{base_url}{line}/?token={token}"
+        lines.append(line)
+    return "\n".join(lines) + "\n"
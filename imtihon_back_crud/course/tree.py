@@ -0,0 +1,190 @@
+# tree.py
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+
+from core.cache import bump_version, get_version
+from core.media import signed_media_url
+from course.models import (
+    CourseAttachmentsModel,
+    CourseLessonModel,
+    CourseModel,
+    CourseSectionModel,
+)
+from uploads.storage import blob_storage
+
+LESSON_FIELDS = (
+    "id",
+    "section_id",
+    "name",
+    "text",
+    "video",
+    "image",
+    "poster",
+    "duration",
+    "hls_status",
+)
+
+
+def tree_namespace(course_id):
+    return f"course_tree:{course_id}"
+
+
+def invalidate_tree(*course_ids):
+    bump_version(*(tree_namespace(course_id) for course_id in course_ids if course_id))
+
+
+def _file_url(name):
+    # public media: the URL does not depend on who asks, so it can be cached
+    return blob_storage().url(name) if name else None
+
+
+def build_tree(course_id):
+    """
+    A course with its attachments, sections and their lessons in four
+    queries of plain values. Protected videos are kept as flags here and
+    signed per user by ``render_tree``, so the result can be shared.
+    """
+    course = (
+        CourseModel.objects.filter(pk=course_id)
+        .values(
+            "id", "subject_id", "intro_image", "name", "description", "lesson_count"
+        )
+        .first()
+    )
+    if course is None:
+        return None
+
+    attachments = CourseAttachmentsModel.objects.filter(course_id=course_id)
+    lessons = defaultdict(list)
+    for lesson in (
+        CourseLessonModel.objects.filter(section__course_id=course_id)
+        .order_by("id")
+        .values(*LESSON_FIELDS)
+    ):
+        lessons[lesson["section_id"]].append(
+            {
+                "id": lesson["id"],
+                "section": lesson["section_id"],
+                "name": lesson["name"],
+                "text": lesson["text"],
+                "video": bool(lesson["video"]),
+                "image": _file_url(lesson["image"]),
+                "poster": _file_url(lesson["poster"]),
+                "duration": lesson["duration"],
+                "hls_status": lesson["hls_status"],
+            }
+        )
+
+    return {
+        "id": course["id"],
+        "subject": course["subject_id"],
+        "intro_image": _file_url(course["intro_image"]),
+        "name": course["name"],
+        "description": course["description"],
+        "lesson_count": course["lesson_count"],
+        "course_attachments": [
+            {
+                "id": attachment["id"],
+                "course": course_id,
+                "attachment_file": _file_url(attachment["attachment_file"]),
+            }
+            for attachment in attachments.order_by("id").values(
+                "id", "attachment_file"
+            )
+        ],
+        "sections": [
+            {
+                "id": section["id"],
+                "course": course_id,
+                "name": section["name"],
+                "description": section["description"],
+                "intro_video": bool(section["intro_video"]),
+                "intro_image": _file_url(section["intro_image"]),
+                "lesson_count": section["lesson_count"],
+                "lessons": lessons[section["id"]],
+            }
+            for section in CourseSectionModel.objects.filter(course_id=course_id)
+            .order_by("id")
+            .values(
+                "id",
+                "name",
+                "description",
+                "intro_video",
+                "intro_image",
+                "lesson_count",
+            )
+        ],
+    }
+
+
+def get_tree(course_id):
+    key = f"course_tree:{course_id}:v{get_version(tree_namespace(course_id))}"
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_tree(course_id)
+        cache.set(key, tree, settings.VIEW_CACHE_TIMEOUT)
+    return tree
+
+
+def _absolute(request, url):
+    return request.build_absolute_uri(url) if url else None
+
+
+def render_tree(request, tree):
+    """
+    The cached tree for ``request.user``: absolute file URLs, and signed
+    URLs for videos and HLS playlists, as the model serializers give them.
+    """
+    sections = []
+    for section in tree["sections"]:
+        lessons = []
+        for lesson in section["lessons"]:
+            video = hls = None
+            if lesson["video"]:
+                video = signed_media_url(
+                    request, reverse("courselessonmodel-video", args=[lesson["id"]])
+                )
+            if lesson["hls_status"] == "ready":
+                base = reverse("courselessonmodel-detail", args=[lesson["id"]])
+                hls = signed_media_url(
+                    request, f"{base}hls/master.m3u8/", prefix=f"{base}hls/"
+                )
+            lessons.append(
+                {
+                    **lesson,
+                    "video": video,
+                    "image": _absolute(request, lesson["image"]),
+                    "poster": _absolute(request, lesson["poster"]),
+                    "hls": hls,
+                }
+            )
+        intro_video = None
+        if section["intro_video"]:
+            intro_video = signed_media_url(
+                request,
+                reverse("coursesectionmodel-intro-video", args=[section["id"]]),
+            )
+        sections.append(
+            {
+                **section,
+                "intro_video": intro_video,
+                "intro_image": _absolute(request, section["intro_image"]),
+                "lessons": lessons,
+            }
+        )
+    return {
+        **tree,
+        "intro_image": _absolute(request, tree["intro_image"]),
+        "course_attachments": [
+            {
+                **attachment,
+                "attachment_file": _absolute(request, attachment["attachment_file"]),
+            }
+            for attachment in tree["course_attachments"]
+        ],
+        "sections": sections,
+    }
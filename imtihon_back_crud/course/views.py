@@ -1,4 +1,10 @@
+import os
+import posixpath
+
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.urls import reverse
 from rest_framework import viewsets, response, status, serializers
 from django.utils import timezone
 from drf_yasg.utils import swagger_auto_schema
@@ -18,8 +24,19 @@ from .serializers import (
     CourseAttachmentModelSerializer,  # fix import
 )
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from core.authentication import PrincipalJWTAuthentication
+from core.principal import get_principal
 from rest_framework.decorators import action
+from core.pagination import paginated_response
+from core.exports import queryset_rows, stream_csv
+from core.media import (
+    MediaTokenAuthentication,
+    media_token,
+    protected_file_response,
+)
+from course.transcoding import rewrite_playlist
+from course.tree import get_tree, render_tree
+from django.db.models import OuterRef, Subquery
 from students.serializers import (
     StudentCourseModelSerializer,
     StudentCourseProgressModel,
@@ -48,25 +65,24 @@ class CourseModelViewSet(viewsets.ModelViewSet):
     queryset = CourseModel.objects.all()
     serializer_class = CourseModelSerializer
     parser_classes = (MultiPartParser, FormParser)
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get_queryset(self):
-        if not self.request.user.is_authenticated:
+        principal = get_principal(self.request.user)
+        if principal.university_id is None:
             return CourseModel.objects.none()
-
-        if hasattr(self.request.user, "student_profile"):
-            return CourseModel.objects.filter(
-                subject__university=self.request.user.student_profile.university
-            )
-
-        if hasattr(self.request.user, "professor_profile"):
-            return CourseModel.objects.filter(
-                subject__university=self.request.user.professor_profile.university
-            )
-        if hasattr(self.request.user, "university"):
-            return CourseModel.objects.filter(
-                subject__university=self.request.user.university
-            )
+        courses = CourseModel.objects.filter(
+            subject__university_id=principal.university_id
+        )
+        if principal.is_student:
+            # progress straight from the enrollment's counter, in the same query
+            completed = StudentCourseModel.objects.filter(
+                student_id=principal.profile_id, course=OuterRef("pk")
+            ).values("completed_lessons")
+            courses = courses.annotate(
+                completed_lessons=Subquery(completed)
+            ).prefetch_related("course_attachments")
+        return courses
 
     @swagger_auto_schema(
         tags=["Courses"],
@@ -99,14 +115,14 @@ class CourseModelViewSet(viewsets.ModelViewSet):
         },
     )
     def create(self, request, *args, **kwargs):
-        user = request.user
+        principal = get_principal(request.user)
 
-        if hasattr(user, "student_profile"):
+        if principal.is_student:
             return response.Response(
                 data={"detail": "Students are not allowed to create courses."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        if not (hasattr(user, "professor_profile") or hasattr(user, "university")):
+        if not principal.is_staff:
             return response.Response(
                 {"detail": "Only professors or university staff can create courses."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -181,6 +197,68 @@ class CourseModelViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
+    @swagger_auto_schema(
+        methods=["get"],
+        tags=["Courses"],
+        operation_summary="Export course progress (CSV)",
+        operation_description="Streams one row per enrolled student with completed lessons out of the course total.",
+        responses={200: "text/csv attachment", 403: "Forbidden"},
+    )
+    @action(detail=True, methods=["get"], url_path="export-progress")
+    def export_progress(self, request, pk=None):
+        course = self.get_object()
+        if not get_principal(request.user).is_staff:
+            return response.Response(
+                {"detail": "Only professors and university owners can export."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        enrollments = StudentCourseModel.objects.filter(course=course).order_by("id")
+        rows = (
+            row + (course.lesson_count,)
+            for row in queryset_rows(
+                enrollments,
+                "student__student_id_number",
+                "student__full_name",
+                "start_time",
+                "end_time",
+                "is_completed",
+                "grade",
+                "completed_lessons",
+            )
+        )
+        return stream_csv(
+            request,
+            f"course_{course.id}_progress.csv",
+            [
+                "student_id_number",
+                "full_name",
+                "start_time",
+                "end_time",
+                "is_completed",
+                "grade",
+                "completed_lessons",
+                "total_lessons",
+            ],
+            rows,
+        )
+
+    @swagger_auto_schema(
+        methods=["get"],
+        tags=["Courses"],
+        operation_summary="Course with all sections, lessons and attachments",
+        operation_description="The whole course in one response, nested like the section and lesson endpoints. The structure is cached until a section, lesson or attachment of the course changes; video and HLS URLs are signed for the caller.",
+        responses={200: "Course tree", 404: "Not Found - Course not found"},
+    )
+    @action(detail=True, methods=["get"], url_path="tree")
+    def tree(self, request, pk=None):
+        course = self.get_object()
+        tree = get_tree(course.pk)
+        if tree is None:
+            return response.Response(
+                {"detail": "Course not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return response.Response(render_tree(request, tree))
+
 
 class CourseSectionModelViewSet(viewsets.ModelViewSet):
     """
@@ -201,26 +279,18 @@ class CourseSectionModelViewSet(viewsets.ModelViewSet):
     queryset = CourseSectionModel.objects.all()
     serializer_class = CourseSectionModelSerializer
     parser_classes = (MultiPartParser, FormParser)
+    # course content is read in authoring order
+    cursor_ordering = "id"
 
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get_queryset(self):
-        if not self.request.user.is_authenticated:
+        principal = get_principal(self.request.user)
+        if principal.university_id is None:
             return CourseSectionModel.objects.none()
-
-        if hasattr(self.request.user, "student_profile"):
-            return CourseSectionModel.objects.filter(
-                course__subject__university=self.request.user.student_profile.university
-            )
-
-        if hasattr(self.request.user, "professor_profile"):
-            return CourseSectionModel.objects.filter(
-                course__subject__university=self.request.user.professor_profile.university
-            )
-        if hasattr(self.request.user, "university"):
-            return CourseSectionModel.objects.filter(
-                course__subject__university=self.request.user.university
-            )
+        return CourseSectionModel.objects.filter(
+            course__subject__university_id=principal.university_id
+        )
 
     @swagger_auto_schema(
         tags=["Course Sections"],
@@ -260,28 +330,18 @@ class CourseSectionModelViewSet(viewsets.ModelViewSet):
                 "Missing 'course_id' in query parameters."
             )
 
-        user = request.user
-
-        if hasattr(user, "student_profile"):
-            university = user.student_profile.university
-
-        elif hasattr(user, "professor_profile"):
-            university = user.professor_profile.university
-        elif hasattr(user, "university"):
-            university = user.university
-
-        else:
+        university_id = get_principal(request.user).university_id
+        if university_id is None:
             return response.Response(
                 {"detail": "User is not associated with a university."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         data = CourseSectionModel.objects.filter(
-            course__id=course_id, course__subject__university=university
-        )
+            course__id=course_id, course__subject__university_id=university_id
+        ).prefetch_related("lessons")
 
-        return response.Response(
-            data=CourseSectionModelSerializer(data, many=True).data,
-            status=status.HTTP_200_OK,
+        return paginated_response(
+            request, data, CourseSectionModelSerializer, view=self
         )
 
     @swagger_auto_schema(
@@ -366,6 +426,37 @@ class CourseSectionModelViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
+    @swagger_auto_schema(
+        methods=["get"],
+        tags=["Course Sections"],
+        operation_summary="Play the section intro video",
+        operation_description="Checks that the course belongs to the user's university, then nginx serves the file with byte-range support so the player can seek.",
+        manual_parameters=[
+            openapi.Parameter(
+                "token",
+                openapi.IN_QUERY,
+                description="Signed token from the serialized URL, for players that cannot send the Authorization header",
+                type=openapi.TYPE_STRING,
+            )
+        ],
+        responses={
+            200: "Video file",
+            206: "Partial content of a Range request",
+            404: "Not Found - Section or video not found",
+        },
+    )
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="intro-video",
+        authentication_classes=[PrincipalJWTAuthentication, MediaTokenAuthentication],
+    )
+    def intro_video(self, request, pk=None):
+        section = self.get_object()
+        if not section.intro_video:
+            return response.Response({"detail": "No intro video."}, status=404)
+        return protected_file_response(request, section.intro_video.name)
+
 
 class CourseLessonModelViewSet(viewsets.ModelViewSet):
     """
@@ -386,27 +477,18 @@ class CourseLessonModelViewSet(viewsets.ModelViewSet):
     queryset = CourseLessonModel.objects.all()
     serializer_class = CourseLessonModelSerializer
     parser_classes = (MultiPartParser, FormParser)
+    # course content is read in authoring order
+    cursor_ordering = "id"
 
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get_queryset(self):
-        if not self.request.user.is_authenticated:
+        principal = get_principal(self.request.user)
+        if principal.university_id is None:
             return CourseLessonModel.objects.none()
-
-        if hasattr(self.request.user, "student_profile"):
-            return CourseLessonModel.objects.filter(
-                section__course__subject__university=self.request.user.student_profile.university
-            )
-
-        if hasattr(self.request.user, "professor_profile"):
-            return CourseLessonModel.objects.filter(
-                section__course__subject__university=self.request.user.professor_profile.university
-            )
-
-        if hasattr(self.request.user, "university"):
-            return CourseLessonModel.objects.filter(
-                section__course__subject__university=self.request.user.university
-            )
+        return CourseLessonModel.objects.filter(
+            section__course__subject__university_id=principal.university_id
+        )
 
     @swagger_auto_schema(
         tags=["Course Lessons"],
@@ -505,31 +587,104 @@ class CourseLessonModelViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
+    @swagger_auto_schema(
+        methods=["get"],
+        tags=["Course Lessons"],
+        operation_summary="Play the lesson video",
+        operation_description="Checks that the course belongs to the user's university, then nginx serves the file with byte-range support so the player can seek.",
+        manual_parameters=[
+            openapi.Parameter(
+                "token",
+                openapi.IN_QUERY,
+                description="Signed token from the serialized URL, for players that cannot send the Authorization header",
+                type=openapi.TYPE_STRING,
+            )
+        ],
+        responses={
+            200: "Video file",
+            206: "Partial content of a Range request",
+            404: "Not Found - Lesson or video not found",
+        },
+    )
+    @action(
+        detail=True,
+        methods=["get"],
+        authentication_classes=[PrincipalJWTAuthentication, MediaTokenAuthentication],
+    )
+    def video(self, request, pk=None):
+        lesson = self.get_object()
+        if not lesson.video:
+            return response.Response({"detail": "No video."}, status=404)
+        return protected_file_response(request, lesson.video.name)
+
+    @swagger_auto_schema(
+        methods=["get"],
+        tags=["Course Lessons"],
+        operation_summary="HLS playlists and segments of the lesson video",
+        operation_description="Follow the signed hls URL of a lesson: playlists come back with absolute, signed segment URLs, segments are handed to nginx. Players pick a rendition matching the connection.",
+        manual_parameters=[
+            openapi.Parameter(
+                "token",
+                openapi.IN_QUERY,
+                description="Signed token from the serialized hls URL",
+                type=openapi.TYPE_STRING,
+            )
+        ],
+        responses={
+            200: "HLS playlist or MPEG-TS segment",
+            404: "Not Found - Lesson not found or renditions not ready",
+        },
+    )
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path=r"hls/(?P<path>[\w./-]+)",
+        authentication_classes=[PrincipalJWTAuthentication, MediaTokenAuthentication],
+    )
+    def hls(self, request, pk=None, path=None):
+        lesson = self.get_object()
+        if (
+            lesson.hls_status != "ready"
+            or ".." in path.split("/")
+            or not path.endswith((".m3u8", ".ts"))
+        ):
+            return response.Response({"detail": "Not found."}, status=404)
+        name = f"{lesson.hls_path}/{path}"
+        if path.endswith(".ts"):
+            return protected_file_response(request, name)
+
+        try:
+            with open(os.path.join(settings.MEDIA_ROOT, name)) as f:
+                playlist = f.read()
+        except FileNotFoundError:
+            return response.Response({"detail": "Not found."}, status=404)
+        base = reverse("courselessonmodel-detail", args=[lesson.pk]) + "hls/"
+        playlist_dir = posixpath.join(base, posixpath.dirname(path), "")
+        return HttpResponse(
+            rewrite_playlist(
+                playlist,
+                request.build_absolute_uri(playlist_dir),
+                media_token(request.user.pk, base, prefix=True),
+            ),
+            content_type="application/vnd.apple.mpegurl",
+            headers={"Cache-Control": "private, no-cache"},
+        )
+
 
 class CourseAttachmentModelViewSet(viewsets.ModelViewSet):
     queryset = CourseAttachmentsModel.objects.all()
     serializer_class = CourseAttachmentModelSerializer
     parser_classes = (MultiPartParser, FormParser)
 
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get_queryset(self):
-        if not self.request.user.is_authenticated:
+        principal = get_principal(self.request.user)
+        if principal.university_id is None:
             return CourseAttachmentsModel.objects.none()
-
-        if hasattr(self.request.user, "student_profile"):
-            return CourseAttachmentsModel.objects.filter(
-                course__subject__university=self.request.user.student_profile.university
-            )
-
-        if hasattr(self.request.user, "professor_profile"):
-            return CourseModel.objects.filter(
-                course__subject__university=self.request.user.professor_profile.university
-            )
-        if hasattr(self.request.user, "university"):
-            return CourseAttachmentsModel.objects.filter(
-                course__subject__university=self.request.user.university
-            )
+        return CourseAttachmentsModel.objects.filter(
+            course__subject__university_id=principal.university_id
+        )
 
     @swagger_auto_schema(
         tags=["Course Attachments"],
@@ -631,7 +786,7 @@ class CourseAttachmentModelViewSet(viewsets.ModelViewSet):
 
 class StudentCourseViewSet(viewsets.ViewSet):
     queryset = StudentCourseModel.objects.all()
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     @swagger_auto_schema(
         methods=["post"],
@@ -644,16 +799,20 @@ class StudentCourseViewSet(viewsets.ViewSet):
     def student_course(self, request):
         data = request.data
 
-        if not hasattr(request.user, "student_profile"):
+        principal = get_principal(request.user)
+        if not principal.is_student:
             return response.Response({"detail": "Not a student."}, status=404)
-        student = request.user.student_profile
-
         serializer = StudentCourseModelSerializer(
             data=data, context={"request": request}
         )
 
         serializer.is_valid(raise_exception=True)
-        instance = serializer.save(student=student, start_time=timezone.now())
+        # starting a course again returns the enrollment already started
+        instance, _ = StudentCourseModel.objects.get_or_create(
+            student_id=principal.profile_id,
+            course=serializer.validated_data["course"],
+            defaults={"start_time": timezone.now()},
+        )
         return response.Response(
             data=StudentCourseModelSerializer(instance=instance).data,
             status=status.HTTP_200_OK,
@@ -670,15 +829,15 @@ class StudentCourseViewSet(viewsets.ViewSet):
     def student_course_end(self, request):
         data = request.data
 
-        if not hasattr(request.user, "student_profile"):
+        principal = get_principal(request.user)
+        if not principal.is_student:
             return response.Response({"detail": "Not a student."}, status=404)
-        student = request.user.student_profile
         course_id = request.data.get("course")
         if not course_id:
             return response.Response({"detail": "Course ID is required."}, status=400)
         try:
             instance = StudentCourseModel.objects.get(
-                student=student, course_id=course_id
+                student_id=principal.profile_id, course_id=course_id
             )
             if instance.end_time:
                 raise serializers.ValidationError("this course already ended")
@@ -705,7 +864,8 @@ class StudentCourseViewSet(viewsets.ViewSet):
     )
     @action(methods=["post"], detail=False, url_path="add-progress")
     def add_progress(self, request):
-        if not hasattr(request.user, "student_profile"):
+        principal = get_principal(request.user)
+        if not principal.is_student:
             return response.Response({"detail": "Not a student."}, status=404)
 
         serialized_data = StudentCourseProgressModelSerializer(
@@ -728,14 +888,13 @@ class StudentCourseViewSet(viewsets.ViewSet):
     )
     @action(detail=True, methods=["post"])
     def complete(self, request, pk=None):
-        if not hasattr(request.user, "student_profile"):
+        principal = get_principal(request.user)
+        if not principal.is_student:
             return response.Response({"detail": "Not a student."}, status=404)
 
-        student = request.user.student_profile
-
         try:
             progress = StudentCourseProgressModel.objects.get(
-                pk=pk, student_course__student=student
+                pk=pk, student_course__student_id=principal.profile_id
             )
         except StudentCourseProgressModel.DoesNotExist:
             return response.Response({"detail": "Progress not found."}, status=404)
@@ -1,4 +1,5 @@
 from unfold.admin import ModelAdmin
+from unfold.contrib.filters.admin import AutocompleteSelectFilter
 from .models import ProfessorProfileModel, ProfessorsSubjectModel
 from django.contrib import admin
 
@@ -7,6 +8,7 @@ class ProfessorProfileModelAdmin(ModelAdmin):
     list_display = ("id", "professor_id", "user", "university")
     search_fields = ("professor_id", "user__username", "university__name")
     list_filter = ("university",)
+    list_select_related = ("user", "university")
     ordering = ("university", "professor_id")
     readonly_fields = ("id",)
 
@@ -14,6 +16,11 @@ class ProfessorProfileModelAdmin(ModelAdmin):
 class ProfessorsSubjectModelAdmin(ModelAdmin):
     list_display = ("id", "professor", "subject")
     search_fields = ("professor__professor_id", "subject__name")
-    list_filter = ("professor", "subject")
+    list_filter = (
+        ("professor", AutocompleteSelectFilter),
+        ("subject", AutocompleteSelectFilter),
+    )
+    list_select_related = ("professor__university", "subject__university")
+    autocomplete_fields = ("professor", "subject")
     ordering = ("professor", "subject")
     readonly_fields = ("id",)
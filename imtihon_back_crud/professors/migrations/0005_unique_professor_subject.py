@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:21
+
+from django.db import migrations, models
+
+
+def remove_duplicate_links(app_label, model_name, fields):
+    """Keep the oldest row of each duplicated link before the unique constraint."""
+
+    def forwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        keep = (
+            model.objects.values(*fields)
+            .annotate(keep_id=models.Min("id"), rows=models.Count("id"))
+            .filter(rows__gt=1)
+        )
+        for row in keep:
+            model.objects.filter(**{f: row[f] for f in fields}).exclude(
+                id=row["keep_id"]
+            ).delete()
+
+    return forwards
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('professors', '0004_alter_professorssubjectmodel_professor'),
+        ('university', '0006_reference_data_unique_codes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_links(
+                "professors", "ProfessorsSubjectModel", ["professor", "subject"]
+            ),
+            migrations.RunPython.noop,
+        ),
+        migrations.AlterUniqueTogether(
+            name='professorssubjectmodel',
+            unique_together={('professor', 'subject')},
+        ),
+    ]
@@ -32,3 +32,6 @@ class ProfessorsSubjectModel(models.Model):
 
     def __str__(self):
         return f"{self.professor} - subject:{self.subject.name}"
+
+    class Meta:
+        unique_together = ("professor", "subject")
@@ -8,6 +8,7 @@ from .serializers import (
 )
 from rest_framework.permissions import IsAuthenticated
 from core.permissions import IsProfessorOwnerOrReadOnly
+from core.principal import get_principal
 
 
 class ProfessorProfileModelViewSet(viewsets.ModelViewSet):
@@ -33,10 +34,13 @@ class ProfessorProfileModelViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if not user.is_authenticated:
             return self.queryset.none()
-        if hasattr(user, "professor_profile"):
-            return ProfessorProfileModel.objects.filter(user=user)
-        elif hasattr(user, "university"):
-            return ProfessorProfileModel.objects.filter(university__user=user)
+        principal = get_principal(user)
+        if principal.is_professor:
+            return ProfessorProfileModel.objects.filter(id=principal.profile_id)
+        if principal.is_owner:
+            return ProfessorProfileModel.objects.filter(
+                university_id=principal.university_id
+            )
         return ProfessorProfileModel.objects.none()
 
     serializer_class = ProfessorProfileModelSerializer
@@ -166,11 +170,14 @@ class ProfessorsSubjectModelViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if not user.is_authenticated:
             return self.queryset.none()
-        if hasattr(user, "professor_profile"):
-            return ProfessorsSubjectModel.objects.filter(professor__user=user)
-        elif hasattr(user, "university"):
+        principal = get_principal(user)
+        if principal.is_professor:
+            return ProfessorsSubjectModel.objects.filter(
+                professor_id=principal.profile_id
+            )
+        if principal.is_owner:
             return ProfessorsSubjectModel.objects.filter(
-                professor__university__user=user
+                professor__university_id=principal.university_id
             )
         return ProfessorsSubjectModel.objects.none()
 
@@ -1,4 +1,5 @@
 from unfold.admin import ModelAdmin, TabularInline
+from unfold.contrib.filters.admin import AutocompleteSelectFilter
 from .models import (
     StudentProfileModel,
     StudentsGroupModel,
@@ -9,6 +10,7 @@ from .models import (
     StudentSessionModel,
 )
 from django.contrib import admin
+from django.db.models import Count, F
 
 
 class StudentTimeTablesubjectModelInline(TabularInline):
@@ -16,6 +18,7 @@ class StudentTimeTablesubjectModelInline(TabularInline):
     extra = 1  # Number of empty forms to display
     fields = ("subject", "professor", "day", "start_time", "end_time", "room")
     ordering = ("day", "start_time")
+    autocomplete_fields = ("subject", "professor")
 
 
 from django.utils.html import format_html
@@ -27,25 +30,48 @@ class CheatingEvidenceModelInline(TabularInline):
     extra = 1
     fields = ("type", "evidence_file", "preview")  # Add preview field
     readonly_fields = ("type", "preview")  # make both read-only
+    # a long session has hundreds of frames; show the newest ones only
+    max_previews = 20
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # the formset only narrows to the parent session after this, so the
+        # cap has to be taken within the session being edited
+        session_id = request.resolver_match.kwargs.get("object_id")
+        if session_id is None:
+            return queryset
+        newest = (
+            queryset.filter(session_id=session_id)
+            .order_by("-id")
+            .values_list("pk", flat=True)[: self.max_previews]
+        )
+        return queryset.filter(pk__in=list(newest)).order_by("-id")
 
     def preview(self, instance):
         if not instance.evidence_file:
             return "-"
 
         file_url = instance.evidence_file.url
+        if instance.thumbnail:
+            # small WebP, loaded when scrolled into view; full image on click
+            return format_html(
+                '<a href="{}" target="_blank"><img src="{}" loading="lazy" '
+                'style="max-height: 150px;" /></a>',
+                file_url,
+                instance.thumbnail.url,
+            )
         mime_type, _ = mimetypes.guess_type(file_url)
 
-        if mime_type:
-            if mime_type.startswith("image/"):
-                return format_html(
-                    f'<img src="{file_url}" style="max-height: 150px;" />'
-                )
-            elif mime_type.startswith("audio/"):
-                return format_html(
-                    f'<audio controls><source src="{file_url}" type="{mime_type}">Your browser does not support the audio tag.</audio>'
-                )
+        if mime_type and mime_type.startswith("audio/"):
+            return format_html(
+                '<audio controls preload="none"><source src="{}" type="{}">'
+                "Your browser does not support the audio tag.</audio>",
+                file_url,
+                mime_type,
+            )
 
-        return format_html(f'<a href="{file_url}" target="_blank">Download File</a>')
+        # images without a thumbnail yet are linked, never embedded full size
+        return format_html('<a href="{}" target="_blank">Open file</a>', file_url)
 
     preview.short_description = "Preview"
 
@@ -53,6 +79,7 @@ class CheatingEvidenceModelInline(TabularInline):
 class StudentsGroupInline(TabularInline):
     model = StudentsGroupModel
     extra = 0
+    autocomplete_fields = ("group",)
 
 
 @admin.register(StudentProfileModel)
@@ -80,6 +107,7 @@ class StudentProfileAdmin(ModelAdmin):
         "email",
     )
     list_filter = ("university",)
+    list_select_related = ("user", "university")
     inlines = [StudentsGroupInline]
     readonly_fields = ("id",)
 
@@ -87,8 +115,10 @@ class StudentProfileAdmin(ModelAdmin):
 @admin.register(StudentsGroupModel)
 class StudentsGroupModelAdmin(ModelAdmin):
     list_display = ("id", "student", "group")
-    search_fields = ("student__student_id", "group__number")
-    list_filter = ("group",)
+    search_fields = ("student__student_id_number", "group__name")
+    list_filter = (("group", AutocompleteSelectFilter),)
+    list_select_related = ("student__university", "group__university")
+    autocomplete_fields = ("student", "group")
     ordering = ("group", "student")
     readonly_fields = ("id",)
 
@@ -97,14 +127,20 @@ class StudentsGroupModelAdmin(ModelAdmin):
 class StudentTimetableModelAdmin(ModelAdmin):
     inlines = [StudentTimeTablesubjectModelInline]
     list_display = ("id", "group", "get_subject_count")
-    search_fields = ("group__number",)
+    search_fields = ("group__name",)
+    list_select_related = ("group__university",)
+    autocomplete_fields = ("group",)
     ordering = ("group",)
     readonly_fields = ("id",)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(subject_count=Count("subjects"))
+
     def get_subject_count(self, obj):
-        return obj.subjects.count()
+        return obj.subject_count
 
     get_subject_count.short_description = "Number of Subjects"
+    get_subject_count.admin_order_field = "subject_count"
 
 
 @admin.register(StudentSessionModel)
@@ -120,15 +156,42 @@ class StudentSessionModelAdmin(ModelAdmin):
         "grade",
         "get_evidence_count",
     )
-    list_filter = ("assignment__subject", "start_time", "cheating_score", "grade")
-    search_fields = ("student__student_id", "assignment__description")
+    list_filter = (
+        ("assignment", AutocompleteSelectFilter),
+        ("assignment__subject", AutocompleteSelectFilter),
+        "start_time",
+        "cheating_score",
+        "grade",
+    )
+    search_fields = ("student__student_id_number", "assignment__description")
+    list_select_related = (
+        "student__university",
+        "assignment__subject",
+        "assignment__professor",
+    )
+    autocomplete_fields = ("student", "assignment")
     ordering = ("student", "assignment", "start_time")
     readonly_fields = ("id", "start_time")
 
+    def get_queryset(self, request):
+        # the per-type counters are kept up to date by the evidence signals
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                evidence_count=F("device_count")
+                + F("multiple_people_count")
+                + F("audio_count")
+                + F("ai_count")
+                + F("tab_switch_count")
+            )
+        )
+
     def get_evidence_count(self, obj):
-        return obj.cheating_evidence.count()
+        return obj.evidence_count
 
     get_evidence_count.short_description = "Evidence Count"
+    get_evidence_count.admin_order_field = "evidence_count"
 
 
 @admin.register(StudentTimeTablesubjectModel)
@@ -143,8 +206,19 @@ class StudentTimeTablesubjectModelAdmin(ModelAdmin):
         "end_time",
         "room",
     )
-    list_filter = ("day", "subject", "timetable__group", "professor")
+    list_filter = (
+        "day",
+        ("subject", AutocompleteSelectFilter),
+        ("timetable__group", AutocompleteSelectFilter),
+        ("professor", AutocompleteSelectFilter),
+    )
     search_fields = ("subject__name", "professor__professor_id", "room")
+    list_select_related = (
+        "timetable__group__university",
+        "subject__university",
+        "professor__university",
+    )
+    autocomplete_fields = ("timetable", "subject", "professor")
     ordering = ("timetable__group", "day", "start_time")
     readonly_fields = ("id",)
 
@@ -169,10 +243,15 @@ class StudentAnswerModelAdmin(ModelAdmin):
         "text_answer",
     )
     search_fields = (
-        "session__student__student_id",
+        "session__student__student_id_number",
         "question__question",
         "choice__choice",
     )
-    list_filter = ("session", "question")
+    list_filter = (
+        ("session", AutocompleteSelectFilter),
+        ("question", AutocompleteSelectFilter),
+    )
+    list_select_related = ("session", "question", "choice")
+    autocomplete_fields = ("session", "question", "choice")
     ordering = ("session", "question")
     readonly_fields = ("id",)
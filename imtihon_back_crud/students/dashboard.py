@@ -0,0 +1,165 @@
+# dashboard.py
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from assignments.models import AssignmentModel
+from students.models import StudentCourseModel, StudentSessionModel
+from students.progress import completion_percent
+from students.serializers import StudentProfileModelSerializer
+
+UPCOMING_ASSIGNMENTS_LIMIT = 10
+RECENT_GRADES_LIMIT = 5
+
+
+def _profile(profile):
+    return StudentProfileModelSerializer(profile).data
+
+
+def _upcoming_assignments(profile):
+    submitted = StudentSessionModel.objects.filter(
+        student=profile, assignment=OuterRef("pk"), end_time__isnull=False
+    )
+    assignments = (
+        AssignmentModel.objects.filter(
+            groups__group__students__student=profile,
+            end_time__gte=timezone.now(),
+        )
+        .annotate(submitted=Exists(submitted))
+        .order_by("start_time")
+        .values(
+            "id",
+            "type",
+            "description",
+            "start_time",
+            "end_time",
+            "max_grade",
+            "subject_id",
+            "subject__name",
+            "submitted",
+        )
+        .distinct()[:UPCOMING_ASSIGNMENTS_LIMIT]
+    )
+    return [
+        {
+            "id": item["id"],
+            "type": item["type"],
+            "description": item["description"],
+            "start_time": item["start_time"],
+            "end_time": item["end_time"],
+            "max_grade": item["max_grade"],
+            "subject": {"id": item["subject_id"], "name": item["subject__name"]},
+            "submitted": item["submitted"],
+        }
+        for item in assignments
+    ]
+
+
+def _courses(profile):
+    courses = (
+        StudentCourseModel.objects.filter(student=profile)
+        .order_by("-start_time")
+        .values(
+            "id",
+            "course_id",
+            "course__name",
+            "is_completed",
+            "grade",
+            "course__lesson_count",
+            "completed_lessons",
+        )
+    )
+    return [
+        {
+            "id": item["id"],
+            "course": {"id": item["course_id"], "name": item["course__name"]},
+            "is_completed": item["is_completed"],
+            "grade": item["grade"],
+            "total_lessons": item["course__lesson_count"],
+            "completed_lessons": item["completed_lessons"],
+            "completion_percent": completion_percent(
+                item["completed_lessons"], item["course__lesson_count"]
+            ),
+        }
+        for item in courses
+    ]
+
+
+def _open_session(profile):
+    return (
+        StudentSessionModel.objects.filter(student=profile, end_time__isnull=True)
+        .order_by("-start_time")
+        .values(
+            "id",
+            "assignment_id",
+            "assignment__type",
+            "assignment__end_time",
+            "start_time",
+            "is_live",
+        )
+        .first()
+    )
+
+
+def _recent_grades(profile):
+    return list(
+        StudentSessionModel.objects.filter(student=profile, grade__isnull=False)
+        .order_by("-end_time")
+        .values(
+            "id",
+            "assignment_id",
+            "assignment__type",
+            "assignment__subject__name",
+            "assignment__max_grade",
+            "grade",
+            "cheating_score",
+            "end_time",
+        )[:RECENT_GRADES_LIMIT]
+    )
+
+
+SECTIONS = {
+    "profile": _profile,
+    "upcoming_assignments": _upcoming_assignments,
+    "courses": _courses,
+    "open_session": _open_session,
+    "recent_grades": _recent_grades,
+}
+
+
+def _section_key(profile_id, section):
+    return f"student_dashboard:{profile_id}:{section}"
+
+
+def get_dashboard(profile):
+    """
+    Summary for the student home page. Every section is cached on its own so a
+    write only rebuilds the sections it touched (see students/signals.py).
+    """
+    keys = {section: _section_key(profile.id, section) for section in SECTIONS}
+    cached = cache.get_many(keys.values())
+
+    dashboard, missing = {}, {}
+    for section, key in keys.items():
+        if key in cached:
+            dashboard[section] = cached[key]
+        else:
+            dashboard[section] = missing[key] = SECTIONS[section](profile)
+
+    if missing:
+        cache.set_many(missing, settings.STUDENT_DASHBOARD_CACHE_TIMEOUT)
+    return dashboard
+
+
+def invalidate_dashboard(profile_ids, *sections):
+    """Drop cached sections (all of them by default) for the given students."""
+    sections = sections or tuple(SECTIONS)
+    cache.delete_many(
+        [
+            _section_key(profile_id, section)
+            for profile_id in set(profile_ids)
+            for section in sections
+        ]
+    )
@@ -0,0 +1,71 @@
+# feed.py
+
+import hashlib
+import hmac
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from core.events import publish
+from students.scoring import session_counts
+from students.serializers import StudentSessionMonitorSerializer
+
+
+def feed_channel(assignment_id):
+    """Redis channel the proctoring feed of an assignment is published on."""
+    return f"proctoring:assignment:{assignment_id}"
+
+
+def publish_session(kind, session):
+    """
+    ``kind`` is "started", "ended" or "live". The payload is the same row the
+    assignment ``sessions`` endpoint returns, so clients can merge it in place.
+    """
+    publish(
+        feed_channel(session.assignment_id),
+        {
+            "type": f"session.{kind}",
+            "session": StudentSessionMonitorSerializer(session).data,
+        },
+    )
+
+
+def publish_evidence(evidence, session):
+    """New evidence with the session's counters and score after counting it."""
+    publish(
+        feed_channel(session.assignment_id),
+        {
+            "type": "evidence.created",
+            "session": session.id,
+            "evidence": {
+                "id": evidence.id,
+                "type": evidence.type,
+                "file": evidence.evidence_file.url if evidence.evidence_file else None,
+                # follows in an "evidence.thumbnail" event once generated
+                "thumbnail": evidence.thumbnail.url if evidence.thumbnail else None,
+            },
+            "counts": session_counts(session),
+            "cheating_score": session.cheating_score,
+        },
+    )
+
+
+def _signature(message):
+    if not settings.PROCTORING_FEED_SECRET:
+        raise ImproperlyConfigured("PROCTORING_FEED_SECRET is not set")
+    return hmac.new(
+        settings.PROCTORING_FEED_SECRET.encode(), message.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def issue_ticket(assignment_id, user_id):
+    """
+    Short-lived ticket for the feed socket: ``assignment.user.expires.sig``.
+    The feed service checks it with the shared PROCTORING_FEED_SECRET, so it
+    needs neither the JWT key nor the database.
+    """
+    expires = int(time.time()) + settings.PROCTORING_FEED_TICKET_TTL
+    message = f"{assignment_id}.{user_id}.{expires}"
+    return f"{message}.{_signature(message)}"
+
@@ -0,0 +1,73 @@
+# grading.py
+
+from django.db.models import Count, F, Q
+
+from assignments.models import QuestionModel
+from students.dashboard import invalidate_dashboard
+from students.models import StudentSessionModel
+
+# a question is auto-gradable when it has an answer key; open questions are
+# left to the professor even with a reference answer, since free text rarely
+# matches it exactly
+GRADABLE = Q(type="mcq") | Q(type="true_false", true_false_answer__isnull=False)
+
+
+def correct_answer(prefix=""):
+    """
+    Q matching StudentAnswerModel rows that agree with the answer key;
+    ``prefix`` is the path to the answer, e.g. "answers__" from a session.
+    """
+    p = prefix
+    return Q(**{f"{p}question__type": "mcq", f"{p}choice__is_correct": True}) | Q(
+        **{
+            f"{p}question__type": "true_false",
+            f"{p}question__true_false_answer__isnull": False,
+            f"{p}true_false_answer": F(f"{p}question__true_false_answer"),
+        }
+    )
+
+
+def compute_grades(assignment, sessions):
+    """
+    {session_id: (student_id, grade)} for ``sessions`` of ``assignment``, from
+    one aggregate query. Grades are scaled to ``assignment.max_grade``; open
+    questions are left out of the total.
+    """
+    gradable = (
+        QuestionModel.objects.filter(assignment=assignment).filter(GRADABLE).count()
+    )
+    if not gradable:
+        return {}
+
+    rows = (
+        sessions.filter(assignment=assignment)
+        .annotate(correct=Count("answers", filter=correct_answer("answers__")))
+        .values_list("id", "student_id", "correct")
+    )
+    return {
+        session_id: (student_id, round(correct * assignment.max_grade / gradable))
+        for session_id, student_id, correct in rows
+    }
+
+
+def grade_sessions(assignment, sessions=None):
+    """
+    Grade finished sessions of ``assignment`` (all of them by default) and
+    store the grades with bulk_update. Returns the number of sessions graded.
+    """
+    if sessions is None:
+        sessions = StudentSessionModel.objects.filter(end_time__isnull=False)
+
+    grades = compute_grades(assignment, sessions)
+    StudentSessionModel.objects.bulk_update(
+        [
+            StudentSessionModel(id=session_id, grade=grade)
+            for session_id, (_, grade) in grades.items()
+        ],
+        ["grade"],
+        batch_size=1000,
+    )
+    invalidate_dashboard(
+        [student_id for student_id, _ in grades.values()], "recent_grades"
+    )
+    return len(grades)
@@ -0,0 +1,107 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import ORJSONRenderer
+from core.values import values_serializer
+from students.models import (
+    StudentAnswerModel,
+    StudentCourseProgressModel,
+    StudentSessionModel,
+)
+from students.serializers import (
+    StudentAnswerModelSerializer,
+    StudentCourseProgressModelSerializer,
+    StudentSessionModelSerializer,
+    StudentSessionMonitorSerializer,
+)
+
+# (name, queryset for the ModelSerializer path, serializer)
+TARGETS = [
+    (
+        "sessions",
+        lambda: StudentSessionModel.objects.all(),
+        StudentSessionModelSerializer,
+    ),
+    (
+        "monitor",
+        lambda: StudentSessionModel.objects.select_related("student"),
+        StudentSessionMonitorSerializer,
+    ),
+    ("answers", lambda: StudentAnswerModel.objects.all(), StudentAnswerModelSerializer),
+    (
+        "progress",
+        lambda: StudentCourseProgressModel.objects.all(),
+        StudentCourseProgressModelSerializer,
+    ),
+]
+
+
+def _repeat(rows, count):
+    return (rows * (count // len(rows) + 1))[:count]
+
+
+def _timed(function, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-row cost of rendering hot list endpoints with ModelSerializer + "
+        "JSONRenderer versus .values() + ORJSONRenderer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+        parser.add_argument(
+            "--target", choices=[name for name, _, _ in TARGETS], action="append"
+        )
+
+    def handle(self, *args, **options):
+        count, repeat = options["rows"], options["repeat"]
+        if count < 1 or repeat < 1:
+            raise CommandError("--rows and --repeat must be positive")
+
+        for name, queryset, serializer_class in TARGETS:
+            if options["target"] and name not in options["target"]:
+                continue
+            fast = values_serializer(serializer_class)
+            queryset = queryset().order_by("-id")
+
+            fetch_models = _timed(lambda: list(queryset[:count]), repeat)
+            fetch_values = _timed(lambda: list(fast.values(queryset)[:count]), repeat)
+            instances = list(queryset[:count])
+            if not instances:
+                self.stdout.write(f"{name}: no rows, skipped")
+                continue
+            fetched = len(instances)
+            # serialization cost per row does not depend on the data, so a
+            # small table is repeated up to --rows
+            instances = _repeat(instances, count)
+            rows = _repeat(list(fast.values(queryset)[:count]), count)
+
+            slow = _timed(
+                lambda: JSONRenderer().render(
+                    serializer_class(instances, many=True).data
+                ),
+                repeat,
+            )
+            quick = _timed(
+                lambda: ORJSONRenderer().render(fast.to_representation(rows)), repeat
+            )
+            self.stdout.write(
+                f"{name} ({count} rows, {fetched} distinct): "
+                f"serializer {slow / count * 1e6:.1f} us/row, "
+                f"values {quick / count * 1e6:.1f} us/row "
+                f"({slow / quick:.1f}x); "
+                f"fetch {fetch_models / fetched * 1e6:.1f} vs "
+                f"{fetch_values / fetched * 1e6:.1f} us/row"
+            )
@@ -0,0 +1,147 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+
+from assignments.models import AssignmentModel
+from professors.models import ProfessorsSubjectModel
+from students.models import (
+    CheatingEvidenceModel,
+    StudentCourseModel,
+    StudentSessionModel,
+    StudentsGroupModel,
+    StudentSubjectModel,
+)
+from university.models import DepartmentModel, FacultyModel, GroupModel, SubjectModel
+
+
+# (name, queryset, expected index: explicit name or the indexed columns)
+HOT_QUERIES = [
+    (
+        "open session of a student",
+        lambda: StudentSessionModel.objects.filter(student_id=0, end_time=None),
+        "session_open_student_idx",
+    ),
+    (
+        "student's session for an assignment",
+        lambda: StudentSessionModel.objects.filter(assignment_id=0, student_id=0),
+        "session_assignment_student_idx",
+    ),
+    (
+        "evidence counts by type",
+        lambda: CheatingEvidenceModel.objects.filter(session_id=0)
+        .values("type")
+        .annotate(count=Count("id")),
+        "evidence_session_type_idx",
+    ),
+    (
+        "assignments of a university owner",
+        lambda: AssignmentModel.objects.filter(professor__university__user_id=0),
+        (AssignmentModel, ["professor_id"]),
+    ),
+    (
+        "faculty upsert lookup",
+        lambda: FacultyModel.objects.filter(university_id=0, code=""),
+        (FacultyModel, ["university_id", "code"]),
+    ),
+    (
+        "department upsert lookup",
+        lambda: DepartmentModel.objects.filter(faculty_id=0, code=""),
+        (DepartmentModel, ["faculty_id", "code"]),
+    ),
+    (
+        "group upsert lookup",
+        lambda: GroupModel.objects.filter(university_id=0, department_id=0, name=""),
+        (GroupModel, ["university_id", "department_id", "name"]),
+    ),
+    (
+        "subject upsert lookup",
+        lambda: SubjectModel.objects.filter(
+            university_id=0, department_id=0, code=""
+        ),
+        (SubjectModel, ["university_id", "department_id", "code"]),
+    ),
+    (
+        "student group link",
+        lambda: StudentsGroupModel.objects.filter(student_id=0, group_id=0),
+        (StudentsGroupModel, ["student_id", "group_id"]),
+    ),
+    (
+        "student subject link",
+        lambda: StudentSubjectModel.objects.filter(student_id=0, subject_id=0),
+        (StudentSubjectModel, ["student_id", "subject_id"]),
+    ),
+    (
+        "professor subject link",
+        lambda: ProfessorsSubjectModel.objects.filter(professor_id=0, subject_id=0),
+        (ProfessorsSubjectModel, ["professor_id", "subject_id"]),
+    ),
+    (
+        "student course enrollment",
+        lambda: StudentCourseModel.objects.filter(student_id=0, course_id=0),
+        (StudentCourseModel, ["student_id", "course_id"]),
+    ),
+]
+
+
+def _index_names(cursor, expected):
+    if isinstance(expected, str):
+        return {expected}
+    model, columns = expected
+    constraints = connection.introspection.get_constraints(
+        cursor, model._meta.db_table
+    )
+    return {
+        name
+        for name, info in constraints.items()
+        if info["index"] or info["unique"]
+        if info["columns"] == columns
+    }
+
+
+def _used_indexes(plan):
+    found = set()
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if "Index Name" in node:
+            found.add(node["Index Name"])
+        stack.extend(node.get("Plans", []))
+    return found
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot queries and check each one is served by its index."
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("explain_hot_queries needs a PostgreSQL database.")
+
+        failures = []
+        with transaction.atomic(), connection.cursor() as cursor:
+            # tiny tables would be seq-scanned anyway; ask whether an index *can* serve
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            for name, build, expected in HOT_QUERIES:
+                sql, params = build().query.sql_with_params()
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+
+                wanted = _index_names(cursor, expected)
+                used = _used_indexes(plan[0]["Plan"])
+                if wanted & used:
+                    self.stdout.write(f"OK    {name}: {', '.join(sorted(wanted & used))}")
+                else:
+                    failures.append(name)
+                    self.stdout.write(
+                        self.style.ERROR(
+                            f"FAIL  {name}: expected {sorted(wanted) or expected}, "
+                            f"plan used {sorted(used) or 'no index'}"
+                        )
+                    )
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries are not index-backed.")
+        self.stdout.write(self.style.SUCCESS("All hot queries use their indexes."))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from students.models import CheatingEvidenceModel
+from students.thumbnails import make_thumbnail
+
+
+class Command(BaseCommand):
+    help = "Hash and thumbnail evidence files that were stored before thumbnails."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, help="stop after this many evidence files"
+        )
+
+    def handle(self, *args, **options):
+        # sha256 is set for every processed file, images and audio alike
+        pending = (
+            CheatingEvidenceModel.objects.filter(sha256="")
+            .exclude(evidence_file="")
+            .order_by("id")
+        )
+        if options["limit"]:
+            pending = pending[: options["limit"]]
+
+        done = failed = 0
+        for evidence in pending.iterator(chunk_size=500):
+            try:
+                make_thumbnail(evidence)
+            except OSError as e:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"evidence {evidence.id}: {e}"))
+                continue
+            done += 1
+            if done % 500 == 0:
+                self.stdout.write(f"{done} evidence files processed")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed {done} evidence files, {failed} failed.")
+        )
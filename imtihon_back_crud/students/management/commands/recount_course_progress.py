@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from students.progress import recount_progress
+
+
+class Command(BaseCommand):
+    help = "Rebuild lesson counts of courses and completed lessons of enrollments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            type=int,
+            action="append",
+            dest="courses",
+            help="only this course id (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        enrollments = recount_progress(options["courses"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Recounted progress of {enrollments} enrollments.")
+        )
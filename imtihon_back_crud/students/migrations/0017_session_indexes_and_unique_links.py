@@ -0,0 +1,87 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:21
+
+import importlib
+
+from django.db import migrations, models
+
+
+# one copy of the merge, kept with the first migration that needed it
+merge_duplicates = importlib.import_module(
+    "university.migrations.0006_reference_data_unique_codes"
+).merge_duplicates
+
+
+def drop_duplicate_progress(apps, schema_editor):
+    """
+    Keep one progress row per lesson across enrollments about to be merged,
+    a completed one when there is one, so moving them to the kept enrollment
+    cannot leave two rows for a lesson.
+    """
+    enrollment = apps.get_model("students", "StudentCourseModel")
+    progress = apps.get_model("students", "StudentCourseProgressModel")
+    groups = (
+        enrollment.objects.values("student", "course")
+        .annotate(rows=models.Count("id"))
+        .filter(rows__gt=1)
+    )
+    for group in groups:
+        rows = progress.objects.filter(
+            student_course__student=group["student"],
+            student_course__course=group["course"],
+        ).order_by("lesson", "-is_completed", "id")
+        seen, extra = set(), []
+        for row_id, lesson_id in rows.values_list("id", "lesson"):
+            if lesson_id in seen:
+                extra.append(row_id)
+            seen.add(lesson_id)
+        progress.objects.filter(id__in=extra).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0005_alter_assignmentsgroupmodel_unique_together'),
+        ('course', '0004_alter_courseattachmentsmodel_course_and_more'),
+        ('students', '0016_studentsessionmodel_is_live'),
+        ('university', '0006_reference_data_unique_codes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_progress, migrations.RunPython.noop),
+        migrations.RunPython(
+            merge_duplicates("students", "StudentCourseModel", ["student", "course"]),
+            migrations.RunPython.noop,
+        ),
+        migrations.RunPython(
+            merge_duplicates("students", "StudentsGroupModel", ["student", "group"]),
+            migrations.RunPython.noop,
+        ),
+        migrations.RunPython(
+            merge_duplicates("students", "StudentSubjectModel", ["student", "subject"]),
+            migrations.RunPython.noop,
+        ),
+        migrations.AlterUniqueTogether(
+            name='studentcoursemodel',
+            unique_together={('student', 'course')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='studentsgroupmodel',
+            unique_together={('student', 'group')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='studentsubjectmodel',
+            unique_together={('student', 'subject')},
+        ),
+        migrations.AddIndex(
+            model_name='cheatingevidencemodel',
+            index=models.Index(fields=['session', 'type'], name='evidence_session_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentsessionmodel',
+            index=models.Index(condition=models.Q(('end_time__isnull', True)), fields=['student'], name='session_open_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentsessionmodel',
+            index=models.Index(fields=['assignment', 'student'], name='session_assignment_student_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:23
+
+from django.db import migrations, models
+
+EVIDENCE_TYPES = ("device", "multiple_people", "audio", "ai", "tab_switch")
+
+
+def backfill_counters(apps, schema_editor):
+    StudentSessionModel = apps.get_model("students", "StudentSessionModel")
+    CheatingEvidenceModel = apps.get_model("students", "CheatingEvidenceModel")
+
+    counts = {}
+    rows = (
+        CheatingEvidenceModel.objects.values_list("session_id", "type")
+        .annotate(count=models.Count("id"))
+        .order_by()
+    )
+    for session_id, kind, count in rows:
+        if kind in EVIDENCE_TYPES:
+            counts.setdefault(session_id, {})[f"{kind}_count"] = count
+
+    sessions = list(StudentSessionModel.objects.filter(id__in=counts))
+    for session in sessions:
+        for field, count in counts[session.id].items():
+            setattr(session, field, count)
+    StudentSessionModel.objects.bulk_update(
+        sessions, [f"{kind}_count" for kind in EVIDENCE_TYPES], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0017_session_indexes_and_unique_links'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentsessionmodel',
+            name='ai_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='studentsessionmodel',
+            name='audio_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='studentsessionmodel',
+            name='device_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='studentsessionmodel',
+            name='multiple_people_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='studentsessionmodel',
+            name='tab_switch_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
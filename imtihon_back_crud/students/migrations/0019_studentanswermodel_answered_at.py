@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0018_session_evidence_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentanswermodel',
+            name='answered_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0019_studentanswermodel_answered_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cheatingevidencemodel',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cheatingevidencemodel',
+            name='sha256',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='cheatingevidencemodel',
+            name='thumbnail',
+            field=models.FileField(blank=True, null=True, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='cheatingevidencemodel',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:44
+
+import django.db.models.deletion
+import uploads.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0020_evidence_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cheatingevidencemodel',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='students.cheatingevidencemodel'),
+        ),
+        migrations.AddField(
+            model_name='cheatingevidencemodel',
+            name='phash',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='cheatingevidencemodel',
+            name='evidence_file',
+            field=models.FileField(storage=uploads.storage.blob_storage, upload_to=''),
+        ),
+        migrations.AlterField(
+            model_name='cheatingevidencemodel',
+            name='thumbnail',
+            field=models.FileField(blank=True, null=True, storage=uploads.storage.blob_storage, upload_to=''),
+        ),
+    ]
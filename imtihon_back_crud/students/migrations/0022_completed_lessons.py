@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    StudentCourseModel = apps.get_model("students", "StudentCourseModel")
+
+    enrollments = list(
+        StudentCourseModel.objects.annotate(
+            count=models.Count(
+                "progresses", filter=models.Q(progresses__is_completed=True)
+            )
+        )
+    )
+    for enrollment in enrollments:
+        enrollment.completed_lessons = enrollment.count
+    StudentCourseModel.objects.bulk_update(
+        enrollments, ["completed_lessons"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0021_evidence_blobs'),
+        ('course', '0007_lesson_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentcoursemodel',
+            name='completed_lessons',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
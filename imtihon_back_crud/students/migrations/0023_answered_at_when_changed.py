@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0022_completed_lessons'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentanswermodel',
+            name='answered_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, null=True),
+        ),
+    ]
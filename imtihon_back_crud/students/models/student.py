@@ -54,3 +54,6 @@ class StudentsGroupModel(models.Model):
 
     def __str__(self) -> str:
         return f"{self.group} - student: {self.student.student_id_number}"
+
+    class Meta:
+        unique_together = ("student", "group")
@@ -14,10 +14,15 @@ class StudentCourseModel(models.Model):
     end_time = models.DateTimeField(null=True, blank=True)
     is_completed = models.BooleanField(null=True, blank=True)
     grade = models.IntegerField(null=True, blank=True)
+    # completed StudentCourseProgressModel rows, kept by students.progress
+    completed_lessons = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self) -> str:
         return f"student_id: {self.student} course: {self.course.name}"
 
+    class Meta:
+        unique_together = ("student", "course")
+
 
 class StudentCourseProgressModel(models.Model):
     student_course = models.ForeignKey(
@@ -1,6 +1,8 @@
 from django.db import models
+from django.utils import timezone
 from students.models import StudentProfileModel
 from assignments.models import AssignmentModel, QuestionModel, QuestionChoiceModel
+from uploads.storage import blob_storage
 
 
 # // student assignment taking
@@ -27,8 +29,28 @@ class StudentSessionModel(models.Model):
     grade = models.IntegerField(null=True, blank=True)
     is_live = models.BooleanField(default=False)
 
+    # evidence counters per type, kept current by students.scoring.apply_evidence
+    device_count = models.PositiveIntegerField(default=0)
+    multiple_people_count = models.PositiveIntegerField(default=0)
+    audio_count = models.PositiveIntegerField(default=0)
+    ai_count = models.PositiveIntegerField(default=0)
+    tab_switch_count = models.PositiveIntegerField(default=0)
+
     def __str__(self) -> str:
-        return f"session: {self.id} of student: {self.student.id}"
+        return f"session: {self.id} of student: {self.student_id}"
+
+    class Meta:
+        indexes = [
+            # at most one open session per student: session-start/end, dashboard
+            models.Index(
+                fields=["student"],
+                condition=models.Q(end_time__isnull=True),
+                name="session_open_student_idx",
+            ),
+            models.Index(
+                fields=["assignment", "student"], name="session_assignment_student_idx"
+            ),
+        ]
 
 
 class CheatingEvidenceModel(models.Model):
@@ -44,11 +66,31 @@ class CheatingEvidenceModel(models.Model):
         StudentSessionModel, on_delete=models.CASCADE, related_name="cheating_evidence"
     )
     type = models.CharField(max_length=20, choices=type_choices)
-    evidence_file = models.FileField()
+    evidence_file = models.FileField(storage=blob_storage)
+
+    # filled in the background by students.thumbnails after the insert
+    thumbnail = models.FileField(null=True, blank=True, storage=blob_storage)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, default="")
+    phash = models.CharField(max_length=16, blank=True, default="")
+    # a near-identical earlier frame of the session whose files this row shares
+    duplicate_of = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="duplicates",
+    )
 
     def __str__(self) -> str:
         return f"id: {self.id}: {self.session} type: {self.type}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["session", "type"], name="evidence_session_type_idx"),
+        ]
+
 
 class StudentAnswerModel(models.Model):
     session = models.ForeignKey(
@@ -68,6 +110,9 @@ class StudentAnswerModel(models.Model):
     )
 
     true_false_answer = models.BooleanField(null=True, blank=True)
+    # when the answer was given or last changed; null for answers from before
+    # it existed. Set by default and by answers-bulk, never by the client.
+    answered_at = models.DateTimeField(default=timezone.now, null=True, editable=False)
 
     def __str__(self) -> str:
         return f"id: {self.id} - {self.session}"
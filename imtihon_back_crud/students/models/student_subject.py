@@ -10,3 +10,6 @@ class StudentSubjectModel(models.Model):
     subject = models.ForeignKey(
         SubjectModel, on_delete=models.CASCADE, related_name="students"
     )
+
+    class Meta:
+        unique_together = ("student", "subject")
@@ -0,0 +1,92 @@
+# progress.py
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from course.models import CourseLessonModel, CourseModel, CourseSectionModel
+from students.models import StudentCourseModel, StudentCourseProgressModel
+
+
+def completion_percent(completed, total):
+    """Whole percent of ``total`` lessons done; 0 for a course without lessons."""
+    if not total:
+        return 0
+    return min(round(completed * 100 / total), 100)
+
+
+def count_lessons(section_id, delta):
+    """
+    Move lesson_count of a section and of its course by ``delta``. Single
+    UPDATEs, so concurrent edits of one course never lose a count.
+    """
+    with transaction.atomic():
+        CourseSectionModel.objects.filter(pk=section_id).update(
+            lesson_count=Greatest(F("lesson_count") + delta, 0)
+        )
+        CourseModel.objects.filter(sections__pk=section_id).update(
+            lesson_count=Greatest(F("lesson_count") + delta, 0)
+        )
+
+
+def move_section(old_course_id, new_course_id, lessons):
+    """A section and its ``lessons`` changed course."""
+    with transaction.atomic():
+        CourseModel.objects.filter(pk=old_course_id).update(
+            lesson_count=Greatest(F("lesson_count") - lessons, 0)
+        )
+        CourseModel.objects.filter(pk=new_course_id).update(
+            lesson_count=F("lesson_count") + lessons
+        )
+
+
+def count_completed(student_course_id, delta):
+    StudentCourseModel.objects.filter(pk=student_course_id).update(
+        completed_lessons=Greatest(F("completed_lessons") + delta, 0)
+    )
+
+
+def _count(queryset, group_by):
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values(group_by)
+            .annotate(count=Count("pk"))
+            .values("count"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def recount_progress(course_ids=None):
+    """
+    Rebuild the counters from the lesson and progress tables, for all
+    courses or only ``course_ids``. Returns the number of enrollments.
+    """
+    courses = CourseModel.objects.all()
+    sections = CourseSectionModel.objects.all()
+    enrollments = StudentCourseModel.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(pk__in=course_ids)
+        sections = sections.filter(course_id__in=course_ids)
+        enrollments = enrollments.filter(course_id__in=course_ids)
+
+    lessons = CourseLessonModel.objects
+    with transaction.atomic():
+        sections.update(
+            lesson_count=_count(lessons.filter(section=OuterRef("pk")), "section")
+        )
+        courses.update(
+            lesson_count=_count(
+                lessons.filter(section__course=OuterRef("pk")), "section__course"
+            )
+        )
+        return enrollments.update(
+            completed_lessons=_count(
+                StudentCourseProgressModel.objects.filter(
+                    student_course=OuterRef("pk"), is_completed=True
+                ),
+                "student_course",
+            )
+        )
@@ -0,0 +1,100 @@
+# scoring.py
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils.module_loading import import_string
+
+from students.models import StudentSessionModel
+
+EVIDENCE_TYPES = ("device", "multiple_people", "audio", "ai", "tab_switch")
+
+# weight of each evidence type and the count at which it is fully "present"
+DEFAULT_SCORING = {
+    "weights": {
+        "device": 0.20,
+        "multiple_people": 0.20,
+        "audio": 0.20,
+        "ai": 0.20,
+        "tab_switch": 0.20,
+    },
+    "saturation": {
+        "device": 1,
+        "multiple_people": 1,
+        "audio": 1,
+        "ai": 1,
+        "tab_switch": 5,
+    },
+}
+
+
+def counter_field(evidence_type):
+    """Name of the StudentSessionModel column counting ``evidence_type``."""
+    return f"{evidence_type}_count"
+
+
+def session_counts(session):
+    return {kind: getattr(session, counter_field(kind)) for kind in EVIDENCE_TYPES}
+
+
+def scoring_for(assignment_type):
+    """Defaults overridden by settings.CHEATING_SCORING[assignment_type]."""
+    overrides = getattr(settings, "CHEATING_SCORING", {}).get(assignment_type, {})
+    return {
+        "weights": {**DEFAULT_SCORING["weights"], **overrides.get("weights", {})},
+        "saturation": {
+            **DEFAULT_SCORING["saturation"],
+            **overrides.get("saturation", {}),
+        },
+    }
+
+
+def weighted_score(counts, scoring):
+    """
+    0 (clean) .. 100. Each type contributes its weight scaled by how close its
+    count is to saturation.
+    """
+    clean = sum(
+        weight
+        * (1 - min(counts.get(kind, 0) / scoring["saturation"].get(kind, 1), 1.0))
+        for kind, weight in scoring["weights"].items()
+    )
+    return 100 - int(round(clean * 100))
+
+
+def cheating_score(session, assignment_type=None):
+    """Score a session from its counters, without touching the evidence table."""
+    if assignment_type is None:
+        assignment_type = session.assignment.type
+    score_function = import_string(
+        getattr(settings, "CHEATING_SCORE_FUNCTION", "students.scoring.weighted_score")
+    )
+    return score_function(session_counts(session), scoring_for(assignment_type))
+
+
+def apply_evidence(session_id, evidence_type, delta=1):
+    """
+    Adjust one counter and the live score of a session. The UPDATE holds the
+    row lock until commit, so concurrent evidence for a session is serialized.
+    Returns the session with its new counters and score, or None.
+    """
+    if evidence_type not in EVIDENCE_TYPES:
+        return None
+    field = counter_field(evidence_type)
+    with transaction.atomic():
+        updated = StudentSessionModel.objects.filter(pk=session_id).update(
+            **{field: Greatest(F(field) + delta, 0)}
+        )
+        if not updated:
+            return None
+        session = (
+            StudentSessionModel.objects.select_related("assignment")
+            .only("assignment__type", *(counter_field(kind) for kind in EVIDENCE_TYPES))
+            .get(pk=session_id)
+        )
+        session.cheating_score = cheating_score(session)
+        StudentSessionModel.objects.filter(pk=session_id).update(
+            cheating_score=session.cheating_score
+        )
+    return session
@@ -14,6 +14,8 @@ from university.models import SubjectModel
 from professors.models import ProfessorProfileModel
 from university.serializers import SubjectModelSerializer
 from professors.serializers import ProfessorProfileModelSerializer
+from students.progress import completion_percent
+from core.principal import get_principal
 
 
 class StudentProfileSerializer(serializers.ModelSerializer):
@@ -55,6 +57,11 @@ class StudentsGroupModelSerializer(serializers.ModelSerializer):
 
 
 class StudentCourseModelSerializer(serializers.ModelSerializer):
+    total_lessons = serializers.IntegerField(
+        source="course.lesson_count", read_only=True
+    )
+    completion_percent = serializers.SerializerMethodField()
+
     class Meta:
         model = StudentCourseModel
         fields = [
@@ -65,6 +72,9 @@ class StudentCourseModelSerializer(serializers.ModelSerializer):
             "end_time",
             "is_completed",
             "grade",
+            "completed_lessons",
+            "total_lessons",
+            "completion_percent",
         ]
         read_only_fields = [
             "student",
@@ -74,14 +84,17 @@ class StudentCourseModelSerializer(serializers.ModelSerializer):
             "end_time",
         ]
 
+    def get_completion_percent(self, instance) -> int:
+        return completion_percent(
+            instance.completed_lessons, instance.course.lesson_count
+        )
+
     def validate_course(self, course):
-        user = self.context["request"].user
-        if not hasattr(user, "student_profile"):
+        principal = get_principal(self.context["request"].user)
+        if not principal.is_student:
             raise serializers.ValidationError("user is not a student")
 
-        university = user.student_profile.university
-
-        if course.subject.university != university:
+        if course.subject.university_id != principal.university_id:
             raise serializers.ValidationError("Student cannot attend other's courses")
 
         return course
@@ -93,11 +106,11 @@ class StudentCourseProgressModelSerializer(serializers.ModelSerializer):
         fields = ["id", "student_course", "lesson", "is_completed"]
 
     def validate_student_course(self, student_course):
-        user = self.context["request"].user
-        if not hasattr(user, "student_profile"):
+        principal = get_principal(self.context["request"].user)
+        if not principal.is_student:
             raise serializers.ValidationError("user is not a student")
 
-        if student_course.student != user.student_profile:
+        if student_course.student_id != principal.profile_id:
             raise serializers.ValidationError("course is not the student's")
 
         return student_course
@@ -128,6 +141,32 @@ class StudentSessionModelSerializer(serializers.ModelSerializer):
             self.fields.pop(field, None)
 
 
+class StudentSessionMonitorSerializer(serializers.ModelSerializer):
+    """Live view of a session for the professor: counters and current score."""
+
+    student_id_number = serializers.CharField(source="student.student_id_number")
+    student_name = serializers.CharField(source="student.full_name")
+
+    class Meta:
+        model = StudentSessionModel
+        fields = [
+            "id",
+            "student",
+            "student_id_number",
+            "student_name",
+            "start_time",
+            "end_time",
+            "is_live",
+            "cheating_score",
+            "grade",
+            "device_count",
+            "multiple_people_count",
+            "audio_count",
+            "ai_count",
+            "tab_switch_count",
+        ]
+
+
 class StudentSessionStartModelSerializer(serializers.ModelSerializer):
     class Meta:
         model = StudentSessionModel
@@ -140,7 +179,32 @@ class CheatingEvidenceModelSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CheatingEvidenceModel
-        fields = ["id", "evidence_file", "type", "session"]
+        fields = [
+            "id",
+            "evidence_file",
+            "thumbnail",
+            "width",
+            "height",
+            "sha256",
+            "type",
+            "session",
+        ]
+        read_only_fields = ["thumbnail", "width", "height", "sha256"]
+
+
+def validate_answer_shape(question_type, text_answer, choice, true_false_answer):
+    """Exactly the field matching the question type must be filled in."""
+    if question_type == "open":
+        if not text_answer or choice or true_false_answer is not None:
+            raise serializers.ValidationError("Invalid answer for text question.")
+    elif question_type == "mcq":
+        if not choice or text_answer or true_false_answer is not None:
+            raise serializers.ValidationError(
+                "Invalid answer for multiple choice question."
+            )
+    elif question_type == "true_false":
+        if true_false_answer is None or text_answer or choice:
+            raise serializers.ValidationError("Invalid answer for true/false question.")
 
 
 class StudentAnswerModelSerializer(serializers.ModelSerializer):
@@ -153,7 +217,8 @@ class StudentAnswerModelSerializer(serializers.ModelSerializer):
         session = data.get("session")
 
         if request and session:
-            if session.student != request.user.student_profile:
+            principal = get_principal(request.user)
+            if not principal.is_student or session.student_id != principal.profile_id:
                 raise serializers.ValidationError(
                     "You do not have permission to submit an answer for this session."
                 )
@@ -162,33 +227,36 @@ class StudentAnswerModelSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "This session has already ended. You cannot submit answers."
             )
-        # You can also call the earlier question-type validation here
         question = data.get("question")
         if question:
-            qtype = question.type  # e.g. "text", "multiple_choice", etc.
-            ta = data.get("text_answer")
-            ch = data.get("choice")
-            tf = data.get("true_false_answer")
-
-            if qtype == "open":
-                if not ta or ch or tf is not None:
-                    raise serializers.ValidationError(
-                        "Invalid answer for text question."
-                    )
-            elif qtype == "mcq":
-                if not ch or ta or tf is not None:
-                    raise serializers.ValidationError(
-                        "Invalid answer for multiple choice question."
-                    )
-            elif qtype == "true_false":
-                if tf is None or ta or ch:
-                    raise serializers.ValidationError(
-                        "Invalid answer for true/false question."
-                    )
+            validate_answer_shape(
+                question.type,
+                data.get("text_answer"),
+                data.get("choice"),
+                data.get("true_false_answer"),
+            )
 
         return data
 
 
+class StudentAnswerBulkItemSerializer(serializers.Serializer):
+    question = serializers.IntegerField()
+    text_answer = serializers.CharField(
+        required=False, allow_null=True, allow_blank=True, trim_whitespace=False
+    )
+    choice = serializers.IntegerField(required=False, allow_null=True)
+    true_false_answer = serializers.BooleanField(required=False, allow_null=True)
+
+
+class StudentAnswerBulkSerializer(serializers.Serializer):
+    """Many answers of one session, saved together (exam autosave)."""
+
+    session = serializers.IntegerField()
+    answers = serializers.ListField(
+        child=StudentAnswerBulkItemSerializer(), allow_empty=False, max_length=500
+    )
+
+
 class StudentTimeTablesubjectModelSerializer(serializers.ModelSerializer):
     subject = SubjectModelSerializer(read_only=True)
     professor = ProfessorProfileModelSerializer(read_only=True)
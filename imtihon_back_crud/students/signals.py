@@ -0,0 +1,176 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from assignments.analytics import invalidate_analytics
+from core import background
+from assignments.models import AssignmentModel, AssignmentsGroupModel
+from course.models import CourseLessonModel, CourseSectionModel
+from students.dashboard import invalidate_dashboard
+from students.feed import publish_evidence
+from students.progress import count_completed, count_lessons, move_section
+from students.scoring import apply_evidence
+from students.thumbnails import generate_thumbnail
+from students.models import (
+    CheatingEvidenceModel,
+    StudentCourseModel,
+    StudentCourseProgressModel,
+    StudentProfileModel,
+    StudentAnswerModel,
+    StudentSessionModel,
+    StudentsGroupModel,
+)
+
+
+@receiver(post_save, sender=StudentProfileModel)
+def refresh_dashboard_profile(sender, instance, **kwargs):
+    invalidate_dashboard([instance.id], "profile")
+
+
+@receiver([post_save, post_delete], sender=StudentSessionModel)
+def refresh_dashboard_sessions(sender, instance, **kwargs):
+    invalidate_dashboard(
+        [instance.student_id],
+        "open_session",
+        "recent_grades",
+        "upcoming_assignments",
+    )
+
+
+@receiver([post_save, post_delete], sender=StudentCourseModel)
+def refresh_dashboard_courses(sender, instance, **kwargs):
+    invalidate_dashboard([instance.student_id], "courses")
+
+
+@receiver([post_save, post_delete], sender=StudentCourseProgressModel)
+def refresh_dashboard_progress(sender, instance, **kwargs):
+    student_ids = StudentCourseModel.objects.filter(
+        pk=instance.student_course_id
+    ).values_list("student_id", flat=True)
+    invalidate_dashboard(student_ids, "courses")
+
+
+@receiver([post_save, post_delete], sender=StudentsGroupModel)
+def refresh_dashboard_group_membership(sender, instance, **kwargs):
+    invalidate_dashboard([instance.student_id], "upcoming_assignments")
+
+
+@receiver([post_save, post_delete], sender=AssignmentsGroupModel)
+def refresh_dashboard_group_assignments(sender, instance, **kwargs):
+    student_ids = StudentsGroupModel.objects.filter(
+        group_id=instance.group_id
+    ).values_list("student_id", flat=True)
+    invalidate_dashboard(student_ids, "upcoming_assignments")
+
+
+@receiver(post_save, sender=AssignmentModel)
+def refresh_dashboard_assignment(sender, instance, created, **kwargs):
+    if created:
+        return  # reaches students only once it is attached to a group
+    student_ids = StudentsGroupModel.objects.filter(
+        group__assignment_groups__assignment=instance
+    ).values_list("student_id", flat=True)
+    invalidate_dashboard(student_ids, "upcoming_assignments", "recent_grades")
+
+
+@receiver(post_save, sender=CheatingEvidenceModel)
+def count_new_evidence(sender, instance, created, **kwargs):
+    if created:
+        session = apply_evidence(instance.session_id, instance.type)
+        if session is not None:
+            publish_evidence(instance, session)
+        background.submit(generate_thumbnail, instance.id)
+
+
+@receiver(post_delete, sender=CheatingEvidenceModel)
+def uncount_deleted_evidence(sender, instance, **kwargs):
+    apply_evidence(instance.session_id, instance.type, delta=-1)
+
+
+@receiver([post_save, post_delete], sender=StudentSessionModel)
+def refresh_analytics_sessions(sender, instance, **kwargs):
+    invalidate_analytics(instance.assignment_id)
+
+
+@receiver([post_save, post_delete], sender=StudentAnswerModel)
+def refresh_analytics_answers(sender, instance, **kwargs):
+    # answers-bulk writes with bulk_create and invalidates by itself
+    assignment_ids = StudentSessionModel.objects.filter(
+        pk=instance.session_id
+    ).values_list("assignment_id", flat=True)
+    for assignment_id in assignment_ids:
+        invalidate_analytics(assignment_id)
+
+
+# progress counters: post_init remembers what a row was counted under, so a
+# save only has to apply the difference. __dict__ avoids loading deferred fields.
+
+
+@receiver(post_init, sender=CourseLessonModel)
+def remember_lesson_section(sender, instance, **kwargs):
+    instance._counted_section_id = instance.__dict__.get("section_id")
+
+
+@receiver(post_save, sender=CourseLessonModel)
+def count_saved_lesson(sender, instance, created, **kwargs):
+    previous = None if created else instance._counted_section_id
+    if previous == instance.section_id:
+        return
+    if previous is not None:
+        count_lessons(previous, -1)
+    count_lessons(instance.section_id, 1)
+    instance._counted_section_id = instance.section_id
+    student_ids = StudentCourseModel.objects.filter(
+        course__sections__in=[instance.section_id, previous]
+    ).values_list("student_id", flat=True)
+    invalidate_dashboard(student_ids, "courses")
+
+
+@receiver(post_delete, sender=CourseLessonModel)
+def count_deleted_lesson(sender, instance, **kwargs):
+    count_lessons(instance._counted_section_id, -1)
+    student_ids = StudentCourseModel.objects.filter(
+        course__sections=instance._counted_section_id
+    ).values_list("student_id", flat=True)
+    invalidate_dashboard(student_ids, "courses")
+
+
+@receiver(post_init, sender=CourseSectionModel)
+def remember_section_course(sender, instance, **kwargs):
+    instance._counted_course_id = instance.__dict__.get("course_id")
+
+
+@receiver(post_save, sender=CourseSectionModel)
+def count_moved_section(sender, instance, created, **kwargs):
+    previous = instance._counted_course_id
+    instance._counted_course_id = instance.course_id
+    if created or previous == instance.course_id:
+        return
+    lessons = CourseSectionModel.objects.get(pk=instance.pk).lesson_count
+    move_section(previous, instance.course_id, lessons)
+
+
+@receiver(post_init, sender=StudentCourseProgressModel)
+def remember_progress(sender, instance, **kwargs):
+    if instance.__dict__.get("is_completed"):
+        instance._counted_for = instance.__dict__.get("student_course_id")
+    else:
+        instance._counted_for = None
+
+
+@receiver(post_save, sender=StudentCourseProgressModel)
+def count_saved_progress(sender, instance, created, **kwargs):
+    previous = None if created else instance._counted_for
+    current = instance.student_course_id if instance.is_completed else None
+    if previous == current:
+        return
+    if previous is not None:
+        count_completed(previous, -1)
+    if current is not None:
+        count_completed(current, 1)
+    instance._counted_for = current
+
+
+@receiver(post_delete, sender=StudentCourseProgressModel)
+def count_deleted_progress(sender, instance, **kwargs):
+    if instance._counted_for is not None:
+        count_completed(instance._counted_for, -1)
@@ -1,7 +1,19 @@
+import hashlib
+import hmac
+import json
+import tempfile
+import time
+from unittest import mock, skipUnless
+
 from rest_framework.test import APITestCase
 from django.urls import reverse
 from rest_framework import status
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from students.models import (
     StudentProfileModel,
     StudentsGroupModel,
@@ -20,11 +32,48 @@ from university.models import (
     FacultyModel,
     SubjectModel,
 )
-from course.models import CourseModel, CourseLessonModel, CourseSectionModel
-from professors.models import ProfessorProfileModel
-from assignments.models import AssignmentModel
+from students.feed import issue_ticket
+from students.grading import compute_grades
+from students.scoring import apply_evidence
+from students.serializers import (
+    CheatingEvidenceModelSerializer,
+    StudentAnswerModelSerializer,
+    StudentCourseProgressModelSerializer,
+    StudentSessionModelSerializer,
+    StudentSessionMonitorSerializer,
+)
+from course.serializers import CourseModelSerializer
+from core.authentication import (
+    PrincipalJWTAuthentication,
+    users_with_profiles,
+)
+from core.principal import ANONYMOUS, get_principal
+from core.renderers import ORJSONRenderer
+from core.testing import StudentFixtureMixin
+from core.values import ValuesSerializer, values_serializer
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+from course.models import (
+    CourseModel,
+    CourseLessonModel,
+    CourseSectionModel,
+)
+from professors.models import ProfessorProfileModel, ProfessorsSubjectModel
+from assignments.models import (
+    AssignmentModel,
+    AssignmentsGroupModel,
+    QuestionChoiceModel,
+    QuestionModel,
+)
 from django.utils import timezone
 from datetime import timedelta
+from io import BytesIO, StringIO
+
+from PIL import Image
+import numpy as np
+from uploads.models import BlobModel
 
 
 class StudentsAPITestCase(APITestCase):
@@ -141,3 +190,833 @@ class StudentsAPITestCase(APITestCase):
         url = reverse("studenttimetablesubjectmodel-list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class StudentDashboardTestCase(StudentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("student-dashboard")
+
+    def test_dashboard_summary(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data["profile"]["id"], self.profile.id)
+        self.assertEqual(
+            [item["id"] for item in data["upcoming_assignments"]], [self.assignment.id]
+        )
+        self.assertEqual(data["courses"][0]["completion_percent"], 50)
+        self.assertIsNone(data["open_session"])
+
+    def test_dashboard_cached_until_write(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        session = StudentSessionModel.objects.create(
+            student=self.profile, assignment=self.assignment
+        )
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["open_session"]["id"], session.id)
+
+
+class StudentPaginationTestCase(StudentFixtureMixin, APITestCase):
+    def test_sessions_paginated_by_cursor(self):
+        sessions = [
+            StudentSessionModel.objects.create(
+                student=self.profile, assignment=self.assignment, end_time=timezone.now()
+            )
+            for _ in range(3)
+        ]
+        url = reverse("student-sessions")
+        first = self.client.get(url, {"page_size": 2, "count": "exact"}).json()
+        self.assertEqual(first["count"], 3)
+        self.assertEqual(
+            [item["id"] for item in first["results"]],
+            [sessions[2].id, sessions[1].id],
+        )
+
+        second = self.client.get(first["next"]).json()
+        self.assertEqual([item["id"] for item in second["results"]], [sessions[0].id])
+        self.assertIsNone(second["next"])
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN plans are Postgres specific")
+class HotQueryIndexTestCase(TestCase):
+    def test_hot_queries_use_indexes(self):
+        call_command("explain_hot_queries", stdout=StringIO())
+
+
+class LiveCheatingScoreTestCase(StudentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = StudentSessionModel.objects.create(
+            student=self.profile, assignment=self.assignment
+        )
+
+    def add_evidence(self, kind, times=1):
+        for _ in range(times):
+            CheatingEvidenceModel.objects.create(
+                session=self.session, type=kind, evidence_file="evidence.png"
+            )
+
+    def test_counters_and_live_score(self):
+        self.add_evidence("device")
+        self.add_evidence("tab_switch", times=2)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.device_count, 1)
+        self.assertEqual(self.session.tab_switch_count, 2)
+        # device fully present (0.2) + tab switches at 2/5 of saturation (0.08)
+        self.assertEqual(self.session.cheating_score, 28)
+
+        CheatingEvidenceModel.objects.filter(type="device").delete()
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.device_count, 0)
+        self.assertEqual(self.session.cheating_score, 8)
+
+    def test_session_end_uses_counters(self):
+        self.add_evidence("ai")
+        response = self.client.patch(
+            reverse("student-session-end"), {"session_id": self.session.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["cheating_score"], 20)
+
+    def test_session_end_keeps_evidence_counted_meanwhile(self):
+        def count_evidence(*args):
+            apply_evidence(self.session.id, "audio")
+            return {}
+
+        with mock.patch("students.views.compute_grades", side_effect=count_evidence):
+            response = self.client.patch(
+                reverse("student-session-end"), {"session_id": self.session.id}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.audio_count, 1)
+        self.assertIsNotNone(self.session.end_time)
+
+    def test_professor_monitor_query_count_is_constant(self):
+        self.add_evidence("audio")
+        for i in range(5):
+            user = User.objects.create_user(username=f"s{i}", password="testpass")
+            student = StudentProfileModel.objects.create(
+                user=user,
+                student_id_number=f"S1{i}",
+                image_url="http://a.com/a.png",
+                first_name="Student",
+                university=self.university,
+            )
+            StudentSessionModel.objects.create(student=student, assignment=self.assignment)
+
+        self.client.force_authenticate(self.professor.user)
+        url = reverse("assignmentmodel-sessions", args=[self.assignment.id])
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {"live": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 6)
+        own = next(item for item in results if item["id"] == self.session.id)
+        self.assertEqual(own["audio_count"], 1)
+
+
+class BulkAnswerTestCase(StudentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = StudentSessionModel.objects.create(
+            student=self.profile, assignment=self.assignment
+        )
+        self.mcq = QuestionModel.objects.create(
+            assignment=self.assignment, question="2+2?", type="mcq"
+        )
+        self.right = QuestionChoiceModel.objects.create(
+            question=self.mcq, choice="4", is_correct=True
+        )
+        self.wrong = QuestionChoiceModel.objects.create(
+            question=self.mcq, choice="5", is_correct=False
+        )
+        self.true_false = QuestionModel.objects.create(
+            assignment=self.assignment, question="Sky is blue", type="true_false"
+        )
+        self.open = QuestionModel.objects.create(
+            assignment=self.assignment, question="Why?", type="open"
+        )
+        self.url = reverse("student-answers-bulk")
+
+    def post(self, answers):
+        return self.client.post(
+            self.url, {"session": self.session.id, "answers": answers}, format="json"
+        )
+
+    def test_bulk_upsert(self):
+        response = self.post(
+            [
+                {"question": self.mcq.id, "choice": self.wrong.id},
+                {"question": self.true_false.id, "true_false_answer": True},
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["saved"], 2)
+
+        with self.assertNumQueries(5):
+            response = self.post(
+                [
+                    {"question": self.mcq.id, "choice": self.right.id},
+                    {"question": self.open.id, "text_answer": "Because"},
+                ]
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        answers = StudentAnswerModel.objects.filter(session=self.session)
+        self.assertEqual(answers.count(), 3)
+        self.assertEqual(answers.get(question=self.mcq).choice_id, self.right.id)
+
+    def test_unchanged_answers_are_not_rewritten(self):
+        answers = [
+            {"question": self.mcq.id, "choice": self.wrong.id},
+            {"question": self.open.id, "text_answer": "Because"},
+        ]
+        self.post(answers)
+        first = dict(
+            StudentAnswerModel.objects.values_list("question_id", "answered_at")
+        )
+
+        with mock.patch("students.views.invalidate_analytics") as invalidate:
+            response = self.post(answers)
+        self.assertEqual(response.json()["saved"], 2)
+        invalidate.assert_not_called()
+
+        answers[0]["choice"] = self.right.id
+        with mock.patch("students.views.invalidate_analytics") as invalidate:
+            self.post(answers)
+        invalidate.assert_called_once_with(self.assignment.id)
+        answered_at = dict(
+            StudentAnswerModel.objects.values_list("question_id", "answered_at")
+        )
+        self.assertEqual(answered_at[self.open.id], first[self.open.id])
+        self.assertGreater(answered_at[self.mcq.id], first[self.mcq.id])
+
+    def test_invalid_answers_are_rejected_together(self):
+        other = QuestionModel.objects.create(
+            assignment=self.assignment, question="Other", type="mcq"
+        )
+        response = self.post(
+            [
+                {"question": self.true_false.id, "true_false_answer": False},
+                {"question": other.id, "choice": self.right.id},
+                {"question": self.open.id, "true_false_answer": True},
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.json()["answers"]), {"1", "2"})
+        self.assertFalse(StudentAnswerModel.objects.exists())
+
+    def test_ended_session_rejected(self):
+        self.session.end_time = timezone.now()
+        self.session.save()
+        response = self.post([{"question": self.open.id, "text_answer": "x"}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GradingTestCase(StudentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = StudentSessionModel.objects.create(
+            student=self.profile, assignment=self.assignment
+        )
+        mcq = QuestionModel.objects.create(
+            assignment=self.assignment, question="2+2?", type="mcq"
+        )
+        self.right = QuestionChoiceModel.objects.create(
+            question=mcq, choice="4", is_correct=True
+        )
+        self.wrong = QuestionChoiceModel.objects.create(
+            question=mcq, choice="5", is_correct=False
+        )
+        self.true_false = QuestionModel.objects.create(
+            assignment=self.assignment,
+            question="Sky is blue",
+            type="true_false",
+            true_false_answer=True,
+        )
+        # open questions are left to the professor, reference answer or not
+        self.open_question = QuestionModel.objects.create(
+            assignment=self.assignment,
+            question="Capital of Uzbekistan?",
+            type="open",
+            text_answer="Tashkent",
+        )
+        QuestionModel.objects.create(
+            assignment=self.assignment, question="Essay", type="open"
+        )
+        StudentAnswerModel.objects.bulk_create(
+            [
+                StudentAnswerModel(session=self.session, question=mcq, choice=self.wrong),
+                StudentAnswerModel(
+                    session=self.session,
+                    question=self.true_false,
+                    true_false_answer=True,
+                ),
+                StudentAnswerModel(
+                    session=self.session,
+                    question=self.open_question,
+                    text_answer="It is Tashkent",
+                ),
+            ]
+        )
+
+    def test_session_end_grades(self):
+        response = self.client.patch(
+            reverse("student-session-end"), {"session_id": self.session.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # 1 of 2 gradable questions right, max_grade 100
+        self.assertEqual(response.json()["grade"], 50)
+
+    def test_open_questions_with_a_reference_answer_are_not_graded(self):
+        sessions = StudentSessionModel.objects.filter(pk=self.session.pk)
+        graded = {self.session.id: (self.profile.id, 50)}
+        self.assertEqual(compute_grades(self.assignment, sessions), graded)
+        # matching the reference answer does not count either
+        StudentAnswerModel.objects.filter(question=self.open_question).update(
+            text_answer="tashkent"
+        )
+        self.assertEqual(compute_grades(self.assignment, sessions), graded)
+
+    def test_regrade_after_key_correction(self):
+        self.session.end_time = timezone.now()
+        self.session.save()
+        QuestionChoiceModel.objects.filter(pk=self.wrong.pk).update(is_correct=True)
+
+        self.client.force_authenticate(self.professor.user)
+        url = reverse("assignmentmodel-regrade", args=[self.assignment.id])
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"graded": 1})
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.grade, 100)
+
+    def test_regrade_requires_owner(self):
+        response = self.client.post(
+            reverse("assignmentmodel-regrade", args=[self.assignment.id])
+        )
+        self.assertIn(response.status_code, (403, 404))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ValuesSerializerTestCase(StudentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = StudentSessionModel.objects.create(
+            student=self.profile, assignment=self.assignment, cheating_score=12
+        )
+        StudentSessionModel.objects.filter(pk=self.session.pk).update(
+            end_time=timezone.now().replace(microsecond=123456)
+        )
+        question = QuestionModel.objects.create(
+            assignment=self.assignment, question="2+2?", type="mcq"
+        )
+        choice = QuestionChoiceModel.objects.create(
+            question=question, choice="4", is_correct=True
+        )
+        StudentAnswerModel.objects.create(
+            session=self.session, question=question, choice=choice
+        )
+        CheatingEvidenceModel.objects.create(
+            session=self.session,
+            type="audio",
+            evidence_file=SimpleUploadedFile("clip.webm", b"audio"),
+        )
+        CheatingEvidenceModel.objects.create(session=self.session, type="ai")
+
+    def assertSameOutput(self, queryset, serializer_class):
+        request = APIRequestFactory().get("/")
+        fast = values_serializer(serializer_class)
+        slow = JSONRenderer().render(
+            serializer_class(queryset, many=True, context={"request": request}).data
+        )
+        quick = ORJSONRenderer().render(
+            fast.to_representation(fast.values(queryset), request)
+        )
+        self.assertEqual(json.loads(quick), json.loads(slow))
+        return json.loads(quick)
+
+    def test_parity_with_model_serializers(self):
+        sessions = StudentSessionModel.objects.order_by("id")
+        data = self.assertSameOutput(sessions, StudentSessionModelSerializer)
+        self.assertTrue(data[-1]["end_time"].endswith("+05:00"))
+        self.assertSameOutput(sessions, StudentSessionMonitorSerializer)
+        self.assertSameOutput(
+            StudentAnswerModel.objects.all(), StudentAnswerModelSerializer
+        )
+        self.assertSameOutput(
+            StudentCourseProgressModel.objects.all(),
+            StudentCourseProgressModelSerializer,
+        )
+        evidence = self.assertSameOutput(
+            CheatingEvidenceModel.objects.order_by("id"),
+            CheatingEvidenceModelSerializer,
+        )
+        self.assertTrue(evidence[0]["evidence_file"].startswith("http://testserver/"))
+        self.assertIsNone(evidence[1]["evidence_file"])
+
+    def test_fields_without_a_column_are_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(CourseModelSerializer)
+
+    def test_endpoints_use_the_values_path(self):
+        response = self.client.get(reverse("student-sessions"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"][0]["id"], self.session.id)
+        self.client.force_authenticate(self.professor.user)
+        url = reverse("assignmentmodel-sessions", args=[self.assignment.id])
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.json()["results"][0]["student_id_number"], "S001")
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("benchmark_serializers", rows=20, repeat=1, stdout=out)
+        self.assertIn("sessions (20 rows, 1 distinct)", out.getvalue())
+        self.assertIn("us/row", out.getvalue())
+
+
+def png_upload(name="frame.png", size=(800, 600)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+def pattern_upload(seed, name="frame.jpg", image_format="JPEG"):
+    """A frame with structure for perceptual hashing; same seed, same scene."""
+    pixels = np.random.default_rng(seed).integers(0, 256, (12, 16, 3), dtype=np.uint8)
+    image = Image.fromarray(pixels).resize((640, 480), Image.BILINEAR)
+    buffer = BytesIO()
+    image.save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@override_settings(
+    BACKGROUND_TASKS_EAGER=True,
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    PROCTORING_FEED_SECRET="feed-secret",
+)
+class ProctoringFeedTestCase(StudentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch("core.events.get_redis")
+        self.redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def published(self):
+        return [
+            (channel, json.loads(message))
+            for (channel, message), _ in self.redis.publish.call_args_list
+        ]
+
+    def test_session_and_evidence_events(self):
+        channel = f"proctoring:assignment:{self.assignment.id}"
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("student-session-start"),
+                {"assignment": self.assignment.id},
+                format="json",
+            )
+        session_id = response.json()["id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            CheatingEvidenceModel.objects.create(
+                session_id=session_id, type="device", evidence_file=png_upload()
+            )
+
+        (_, started), (evidence_channel, evidence), (_, thumbnail) = self.published()
+        self.assertEqual(started["type"], "session.started")
+        self.assertEqual(started["session"]["student_id_number"], "S001")
+        self.assertEqual(evidence_channel, channel)
+        self.assertEqual(evidence["type"], "evidence.created")
+        self.assertEqual(evidence["counts"]["device"], 1)
+        self.assertEqual(evidence["cheating_score"], 20)
+        self.assertEqual(thumbnail["type"], "evidence.thumbnail")
+        self.assertTrue(thumbnail["thumbnail"].endswith(".webp"))
+
+    def test_nothing_published_on_rollback(self):
+        session = StudentSessionModel.objects.create(
+            student=self.profile, assignment=self.assignment
+        )
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            CheatingEvidenceModel.objects.create(
+                session=session, type="audio", evidence_file=png_upload()
+            )
+        self.assertEqual(len(callbacks), 2)  # the evidence and its thumbnail
+        self.redis.publish.assert_not_called()
+
+    def test_service_ingest_endpoints(self):
+        session = StudentSessionModel.objects.create(
+            student=self.profile, assignment=self.assignment
+        )
+        self.client.force_authenticate(None)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("evidence-list"),
+                {"session": session.id, "type": "device", "evidence_file": png_upload()},
+                format="multipart",
+                HTTP_HOST="localhost",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["session"], session.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("evidence-live-check"),
+                {"session_id": session.id, "is_live": True},
+                format="json",
+                HTTP_HOST="localhost",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["is_live"])
+        types = [event["type"] for _, event in self.published()]
+        self.assertIn("evidence.created", types)
+        self.assertEqual(types[-1], "session.live")
+
+    def test_feed_ticket(self):
+        url = reverse("assignmentmodel-live-feed", args=[self.assignment.id])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.professor.user)
+        ticket = self.client.get(url).json()["ticket"]
+        assignment_id, user_id, expires, signature = ticket.split(".")
+        self.assertEqual(int(assignment_id), self.assignment.id)
+        self.assertEqual(int(user_id), self.professor.user.id)
+        self.assertGreater(int(expires), time.time())
+        # what the feed service checks (imtihon_back_ai/routes/proctoring_feed.py)
+        message = f"{assignment_id}.{user_id}.{expires}"
+        expected = hmac.new(b"feed-secret", message.encode(), hashlib.sha256)
+        self.assertEqual(signature, expected.hexdigest())
+
+    @override_settings(PROCTORING_FEED_SECRET="")
+    def test_feed_ticket_needs_the_secret(self):
+        with self.assertRaises(ImproperlyConfigured):
+            issue_ticket(self.assignment.id, self.professor.user.id)
+
+
+class AdminChangelistQueryTestCase(StudentFixtureMixin, APITestCase):
+    CHANGELISTS = [
+        "students_studentprofilemodel",
+        "students_studentsgroupmodel",
+        "students_studentsessionmodel",
+        "students_studentanswermodel",
+        "students_studenttimetablemodel",
+        "students_studenttimetablesubjectmodel",
+        "assignments_assignmentmodel",
+        "assignments_questionmodel",
+        "assignments_questionchoicemodel",
+        "assignments_assignmentsgroupmodel",
+        "professors_professorprofilemodel",
+        "professors_professorssubjectmodel",
+        "university_departmentmodel",
+        "university_groupmodel",
+        "university_subjectmodel",
+        "course_coursemodel",
+        "course_courselessonmodel",
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(
+            User.objects.create_superuser(username="admin", password="testpass")
+        )
+        self.rows = 0
+
+    def add_rows(self, count):
+        """One more of everything, each with its own relations."""
+        for _ in range(count):
+            i = self.rows = self.rows + 1
+            faculty = FacultyModel.objects.create(
+                university=self.university, name=f"F{i}", code=f"XF{i}"
+            )
+            department = DepartmentModel.objects.create(
+                faculty=faculty, name=f"D{i}", code=f"XD{i}"
+            )
+            group = GroupModel.objects.create(
+                university=self.university, department=department, name=f"XG{i}"
+            )
+            subject = SubjectModel.objects.create(
+                university=self.university,
+                department=department,
+                name=f"S{i}",
+                code=f"XS{i}",
+            )
+            professor = ProfessorProfileModel.objects.create(
+                user=User.objects.create_user(username=f"xprof{i}"),
+                university=self.university,
+                professor_id=f"XP{i}",
+            )
+            ProfessorsSubjectModel.objects.create(professor=professor, subject=subject)
+            assignment = AssignmentModel.objects.create(
+                subject=subject,
+                professor=professor,
+                type="quiz",
+                start_time=timezone.now(),
+                end_time=timezone.now(),
+                description="desc",
+                max_grade=10,
+            )
+            AssignmentsGroupModel.objects.create(assignment=assignment, group=group)
+            question = QuestionModel.objects.create(
+                assignment=assignment, question="q", type="mcq"
+            )
+            choice = QuestionChoiceModel.objects.create(
+                question=question, choice="a", is_correct=True
+            )
+            student = StudentProfileModel.objects.create(
+                user=User.objects.create_user(username=f"xstudent{i}"),
+                student_id_number=f"XS{i}",
+                image_url="http://a.com/a.png",
+                first_name="X",
+                university=self.university,
+            )
+            StudentsGroupModel.objects.create(student=student, group=group)
+            session = StudentSessionModel.objects.create(
+                student=student, assignment=assignment
+            )
+            StudentAnswerModel.objects.create(
+                session=session, question=question, choice=choice
+            )
+            CheatingEvidenceModel.objects.create(
+                session=session, type="device", evidence_file="evidence.png"
+            )
+            timetable = StudentTimetableModel.objects.create(group=group)
+            StudentTimeTablesubjectModel.objects.create(
+                timetable=timetable,
+                subject=subject,
+                professor=professor,
+                day="monday",
+                start_time="09:00",
+                end_time="10:00",
+                room="1",
+            )
+            course = CourseModel.objects.create(
+                subject=subject, name=f"C{i}", description="desc"
+            )
+            section = CourseSectionModel.objects.create(
+                course=course, name="S", description="desc"
+            )
+            CourseLessonModel.objects.create(section=section, name="L", text="t")
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_changelists_run_constant_queries(self):
+        self.add_rows(1)
+        urls = [reverse(f"admin:{name}_changelist") for name in self.CHANGELISTS]
+        before = [self.count_queries(url) for url in urls]
+        self.add_rows(4)
+        for name, url, expected in zip(self.CHANGELISTS, urls, before):
+            with self.subTest(name):
+                self.assertEqual(self.count_queries(url), expected)
+
+    def test_evidence_inline_is_capped(self):
+        session = StudentSessionModel.objects.create(
+            student=self.profile, assignment=self.assignment
+        )
+        CheatingEvidenceModel.objects.bulk_create(
+            CheatingEvidenceModel(session=session, type="audio", evidence_file=f"{i}.wav")
+            for i in range(30)
+        )
+        response = self.client.get(
+            reverse("admin:students_studentsessionmodel_change", args=[session.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content.count(b"<audio controls"), 20)
+
+    def test_evidence_inline_cap_is_per_session(self):
+        older, newer = (
+            StudentSessionModel.objects.create(
+                student=self.profile, assignment=self.assignment
+            )
+            for _ in range(2)
+        )
+        for session, count in ((older, 3), (newer, 25)):
+            CheatingEvidenceModel.objects.bulk_create(
+                CheatingEvidenceModel(
+                    session=session, type="audio", evidence_file=f"{i}.wav"
+                )
+                for i in range(count)
+            )
+        response = self.client.get(
+            reverse("admin:students_studentsessionmodel_change", args=[older.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content.count(b"<audio controls"), 3)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True, MEDIA_ROOT=tempfile.mkdtemp())
+class EvidenceThumbnailTestCase(StudentFixtureMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = StudentSessionModel.objects.create(
+            student=self.profile, assignment=self.assignment
+        )
+
+    def test_image_evidence_gets_webp_thumbnail(self):
+        upload = png_upload()
+        expected_hash = hashlib.sha256(upload.read()).hexdigest()
+        upload.seek(0)
+        evidence = CheatingEvidenceModel.objects.create(
+            session=self.session, type="device", evidence_file=upload
+        )
+        evidence.refresh_from_db()
+        self.assertEqual((evidence.width, evidence.height), (800, 600))
+        self.assertEqual(evidence.sha256, expected_hash)
+        with evidence.thumbnail.open("rb") as f:
+            thumbnail = Image.open(f)
+            self.assertEqual(thumbnail.format, "WEBP")
+            self.assertEqual(thumbnail.size, (320, 240))
+
+        data = CheatingEvidenceModelSerializer(evidence).data
+        self.assertTrue(data["thumbnail"].endswith(".webp"))
+
+    def test_audio_is_hashed_only(self):
+        evidence = CheatingEvidenceModel.objects.create(
+            session=self.session,
+            type="audio",
+            evidence_file=SimpleUploadedFile("clip.wav", b"RIFF....WAVE"),
+        )
+        evidence.refresh_from_db()
+        self.assertFalse(evidence.thumbnail)
+        self.assertEqual(len(evidence.sha256), 64)
+
+    def test_backfill_command(self):
+        with self.settings(BACKGROUND_TASKS_EAGER=False):
+            evidence = CheatingEvidenceModel.objects.create(
+                session=self.session, type="device", evidence_file=png_upload()
+            )
+        self.assertEqual(CheatingEvidenceModel.objects.get(pk=evidence.pk).sha256, "")
+        out = StringIO()
+        call_command("generate_evidence_thumbnails", stdout=out)
+        evidence.refresh_from_db()
+        self.assertTrue(evidence.thumbnail)
+        self.assertIn("Processed 1", out.getvalue())
+
+    def test_identical_uploads_share_one_blob(self):
+        first, second = (
+            CheatingEvidenceModel.objects.create(
+                session=self.session, type="device", evidence_file=png_upload(name)
+            )
+            for name in ("a.png", "b.png")
+        )
+        self.assertEqual(first.evidence_file.name, second.evidence_file.name)
+        self.assertTrue(first.evidence_file.name.startswith("cas/"))
+        blob = BlobModel.objects.get(name=first.evidence_file.name)
+        self.assertEqual(blob.refcount, 2)
+
+        # django_cleanup deletes the file of a deleted row after the commit
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.refcount, 1)
+        self.assertTrue(second.evidence_file.storage.exists(blob.name))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(BlobModel.objects.filter(name=blob.name).exists())
+        self.assertFalse(second.evidence_file.storage.exists(blob.name))
+
+    @override_settings(EVIDENCE_PHASH_THRESHOLD=8)
+    def test_near_identical_frames_are_collapsed(self):
+        original = CheatingEvidenceModel.objects.create(
+            session=self.session,
+            type="device",
+            evidence_file=pattern_upload(1, "a.png", "PNG"),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            # the same scene re-encoded as JPEG: other bytes, same picture
+            duplicate = CheatingEvidenceModel.objects.create(
+                session=self.session, type="device", evidence_file=pattern_upload(1)
+            )
+        own_file = duplicate.evidence_file.name
+        other = CheatingEvidenceModel.objects.create(
+            session=self.session, type="device", evidence_file=pattern_upload(2)
+        )
+        original.refresh_from_db()
+        duplicate.refresh_from_db()
+        other.refresh_from_db()
+
+        self.assertEqual(duplicate.duplicate_of, original)
+        self.assertEqual(duplicate.evidence_file.name, original.evidence_file.name)
+        self.assertEqual(duplicate.thumbnail.name, original.thumbnail.name)
+        self.assertEqual(
+            BlobModel.objects.get(name=original.evidence_file.name).refcount, 2
+        )
+        self.assertFalse(duplicate.evidence_file.storage.exists(own_file))
+        self.assertIsNone(other.duplicate_of)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.device_count, 3)
+
+    def test_frames_are_kept_without_threshold(self):
+        for _ in range(2):
+            CheatingEvidenceModel.objects.create(
+                session=self.session, type="device", evidence_file=pattern_upload(1)
+            )
+        self.assertFalse(
+            CheatingEvidenceModel.objects.filter(duplicate_of__isnull=False).exists()
+        )
+
+
+class PrincipalTestCase(StudentFixtureMixin, APITestCase):
+    def bearer(self, user):
+        token = RefreshToken.for_user(user).access_token
+        return APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_roles(self):
+        student = get_principal(self.user)
+        self.assertTrue(student.is_student)
+        self.assertEqual(student.profile_id, self.profile.id)
+        self.assertEqual(student.university_id, self.university.id)
+
+        professor = get_principal(self.professor.user)
+        self.assertTrue(professor.is_professor and professor.is_staff)
+        self.assertEqual(professor.profile_id, self.professor.id)
+
+        owner = get_principal(self.university.user)
+        self.assertTrue(owner.is_owner)
+        self.assertEqual(owner.university_id, self.university.id)
+
+        self.assertFalse(get_principal(User.objects.create_user("nobody")).role)
+        self.assertIs(get_principal(None), ANONYMOUS)
+
+    def test_professor_with_a_student_profile_stays_professor(self):
+        StudentProfileModel.objects.create(
+            user=self.professor.user,
+            student_id_number="S-PROF",
+            image_url="http://a.com/a.png",
+            first_name="Prof",
+            university=self.university,
+        )
+        user = users_with_profiles(User).get(pk=self.professor.user.pk)
+        self.assertTrue(get_principal(user).is_professor)
+        self.assertTrue(get_principal(User.objects.get(pk=user.pk)).is_professor)
+
+    def test_authentication_resolves_role_in_one_query(self):
+        for user in (self.user, self.professor.user, self.university.user):
+            request = self.bearer(user)
+            with self.assertNumQueries(1):
+                authenticated, _ = PrincipalJWTAuthentication().authenticate(request)
+                principal = get_principal(authenticated)
+                self.assertEqual(principal.user_id, user.id)
+                self.assertTrue(principal.role)
+
+    def test_owner_sees_university_records(self):
+        self.client.force_authenticate(self.university.user)
+        response = self.client.get(reverse("assignmentmodel-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [row["id"] for row in response.data["results"]]
+        self.assertEqual(ids, [self.assignment.id])
+
+    def test_owner_sees_university_groups_and_reference_data(self):
+        self.client.force_authenticate(self.university.user)
+        response = self.client.get(reverse("assignmentsgroupmodel-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        response = self.client.get(reverse("groupmodel-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"][0]["id"], self.group.id)
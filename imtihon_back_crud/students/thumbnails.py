@@ -0,0 +1,184 @@
+# thumbnails.py
+
+import hashlib
+import io
+import logging
+import os
+
+import numpy as np
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from core.events import publish
+from students.feed import feed_channel
+from students.models import CheatingEvidenceModel
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 64 * 1024
+# earlier frames of the same session and type compared against a new one
+PHASH_CANDIDATES = 50
+
+_DCT_SIZE = 32
+# DCT-II basis; rows are frequencies, columns sample positions
+_DCT = np.cos(
+    np.pi
+    * np.outer(np.arange(_DCT_SIZE), 2 * np.arange(_DCT_SIZE) + 1)
+    / (2 * _DCT_SIZE)
+)
+
+
+def thumbnail_name(evidence_name):
+    """Upload name ``frame_x.jpg`` -> ``frame_x.thumb.webp``."""
+    return f"{os.path.splitext(evidence_name)[0]}.thumb.webp"
+
+
+def _sha256(f):
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def perceptual_hash(image):
+    """
+    64-bit pHash as 16 hex digits: signs of the lowest 8x8 DCT frequencies of
+    a 32x32 grey copy against their median. Re-encoding, resizing and small
+    changes flip few bits; a different scene flips about half.
+    """
+    grey = image.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS)
+    low = (_DCT @ np.asarray(grey, dtype=float) @ _DCT.T)[:8, :8].flatten()
+    bits = low > np.median(low[1:])  # the DC term only measures brightness
+    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):016x}"
+
+
+def _webp_thumbnail(f):
+    """
+    (width, height, webp bytes, phash) of an image file, or None when it is
+    not one.
+    """
+    size = settings.EVIDENCE_THUMBNAIL_SIZE
+    try:
+        image = Image.open(f)
+        width, height = image.size
+        # JPEG frames are decoded at a reduced scale instead of full size
+        image.draft("RGB", (size, size))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+    except (UnidentifiedImageError, OSError):
+        return None
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, "WEBP", quality=settings.EVIDENCE_THUMBNAIL_QUALITY, method=4)
+    return width, height, buffer.getvalue(), perceptual_hash(image)
+
+
+def _earlier_duplicate(evidence):
+    """Recent original frame of the session within EVIDENCE_PHASH_THRESHOLD."""
+    threshold = settings.EVIDENCE_PHASH_THRESHOLD
+    value = int(evidence.phash, 16)
+    # a flat frame (black screen, covered camera) hashes to 0 whatever its colour
+    if threshold is None or value == 0:
+        return None
+    candidates = (
+        CheatingEvidenceModel.objects.filter(
+            session_id=evidence.session_id,
+            type=evidence.type,
+            pk__lt=evidence.pk,
+            duplicate_of__isnull=True,
+        )
+        .exclude(phash="")
+        .order_by("-id")[:PHASH_CANDIDATES]
+    )
+    for candidate in candidates:
+        if (int(candidate.phash, 16) ^ value).bit_count() <= threshold:
+            return candidate
+    return None
+
+
+def _collapse(evidence, original):
+    """
+    Point ``evidence`` at the files of ``original`` and drop its own file.
+    The row, its type and the session counters stay as they are.
+    """
+    storage = evidence.evidence_file.storage
+    own_file = evidence.evidence_file.name
+    with transaction.atomic():
+        storage.reference(original.evidence_file.name)
+        if original.thumbnail:
+            storage.reference(original.thumbnail.name)
+        CheatingEvidenceModel.objects.filter(pk=evidence.pk).update(
+            evidence_file=original.evidence_file.name,
+            thumbnail=original.thumbnail.name,
+            width=original.width,
+            height=original.height,
+            sha256=original.sha256,
+            phash=evidence.phash,
+            duplicate_of=original,
+        )
+        transaction.on_commit(lambda: storage.delete(own_file))
+    evidence.evidence_file.name = original.evidence_file.name
+    evidence.thumbnail.name = original.thumbnail.name
+    evidence.width, evidence.height = original.width, original.height
+    evidence.sha256, evidence.duplicate_of = original.sha256, original
+    return evidence
+
+
+def make_thumbnail(evidence):
+    """
+    Hash the evidence file and, for images, store a small WebP thumbnail with
+    the original dimensions, unless a near-identical earlier frame lets the
+    row share that frame's files. Audio gets the hash only. Written with
+    update() so no evidence signals fire again.
+    """
+    with evidence.evidence_file.open("rb") as f:
+        evidence.sha256 = _sha256(f)
+        f.seek(0)
+        result = _webp_thumbnail(f)
+
+    fields = {"sha256": evidence.sha256}
+    if result is not None:
+        evidence.width, evidence.height, data, evidence.phash = result
+        original = _earlier_duplicate(evidence)
+        if original is not None:
+            return _collapse(evidence, original)
+        evidence.thumbnail.save(
+            thumbnail_name(evidence.evidence_file.name), ContentFile(data), save=False
+        )
+        fields.update(
+            thumbnail=evidence.thumbnail.name,
+            width=evidence.width,
+            height=evidence.height,
+            phash=evidence.phash,
+        )
+    CheatingEvidenceModel.objects.filter(pk=evidence.pk).update(**fields)
+    return evidence
+
+
+def generate_thumbnail(evidence_id):
+    """Background entry point run after an evidence insert commits."""
+    evidence = (
+        CheatingEvidenceModel.objects.select_related("session")
+        .filter(pk=evidence_id)
+        .first()
+    )
+    if evidence is None or not evidence.evidence_file:
+        return
+    try:
+        make_thumbnail(evidence)
+    except OSError:
+        logger.warning("could not thumbnail evidence %s", evidence_id, exc_info=True)
+        return
+    if evidence.thumbnail:
+        publish(
+            feed_channel(evidence.session.assignment_id),
+            {
+                "type": "evidence.thumbnail",
+                "session": evidence.session_id,
+                "evidence": evidence.id,
+                "thumbnail": evidence.thumbnail.url,
+            },
+        )
@@ -1,3 +1,5 @@
+from adrf.viewsets import ViewSet as AsyncViewSet
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, response, status, views, parsers
 from rest_framework.decorators import action
 from drf_yasg.utils import swagger_auto_schema
@@ -21,14 +23,25 @@ from .serializers import (
     StudentAnswerModelSerializer,
     StudentTimetableModelSerializer,
     StudentSessionStartModelSerializer,
+    StudentAnswerBulkSerializer,
+    validate_answer_shape,
 )
 from rest_framework import serializers
 from rest_framework.permissions import IsAuthenticated
 from core.permissions import IsStudentOwnerOrReadOnly
-from rest_framework_simplejwt.authentication import JWTAuthentication
-
+from students.dashboard import get_dashboard
+from students.feed import publish_session
+from core.pagination import paginated_response, values_paginated_response
+from core.renderers import FAST_RENDERER_CLASSES
+from students.scoring import cheating_score
+from students.grading import compute_grades
+from assignments.analytics import invalidate_analytics
+from assignments.models import QuestionModel, QuestionChoiceModel
+from core.authentication import PrincipalJWTAuthentication
+from core.principal import get_principal
+
+from django.db import transaction
 from django.utils import timezone
-from django.db.models import Count
 
 
 class StudentViewSet(viewsets.ViewSet):
@@ -38,7 +51,7 @@ class StudentViewSet(viewsets.ViewSet):
     """
 
     permission_classes = [IsAuthenticated, IsStudentOwnerOrReadOnly]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     @swagger_auto_schema(
         methods=["get"],
@@ -95,23 +108,40 @@ class StudentViewSet(viewsets.ViewSet):
 
     @swagger_auto_schema(
         methods=["get"],
-        operation_summary="Get my timetable",
-        responses={200: StudentTimetableModelSerializer(many=True)},
+        operation_summary="Get my dashboard",
+        operation_description=(
+            "Profile, upcoming assignments of my groups, course completion, "
+            "open session and recent grades in one response."
+        ),
+        responses={200: openapi.Response(description="Student dashboard")},
         tags=["Student"],
     )
-    @action(detail=False, methods=["get"], url_path="timetable")
-    def timetable(self, request):
+    @action(detail=False, methods=["get"], url_path="dashboard")
+    def dashboard(self, request):
         user = request.user
         if not user.is_authenticated:
             return response.Response({"detail": "Not a student."}, status=404)
         profile = getattr(user, "student_profile", None)
         if not profile:
             return response.Response({"detail": "Not a student."}, status=404)
+        return response.Response(get_dashboard(profile))
+
+    @swagger_auto_schema(
+        methods=["get"],
+        operation_summary="Get my timetable",
+        responses={200: StudentTimetableModelSerializer(many=True)},
+        tags=["Student"],
+    )
+    @action(detail=False, methods=["get"], url_path="timetable")
+    def timetable(self, request):
+        principal = get_principal(request.user)
+        if not principal.is_student:
+            return response.Response({"detail": "Not a student."}, status=404)
         timetables = StudentTimetableModel.objects.filter(
-            group__students__student=profile
+            group__students__student_id=principal.profile_id
         )
-        return response.Response(
-            StudentTimetableModelSerializer(timetables, many=True).data
+        return paginated_response(
+            request, timetables, StudentTimetableModelSerializer, view=self
         )
 
     @swagger_auto_schema(
@@ -122,14 +152,15 @@ class StudentViewSet(viewsets.ViewSet):
     )
     @action(detail=False, methods=["get"], url_path="courses")
     def courses(self, request):
-        user = request.user
-        if not user.is_authenticated:
+        principal = get_principal(request.user)
+        if not principal.is_student:
             return response.Response({"detail": "Not a student."}, status=404)
-        profile = getattr(user, "student_profile", None)
-        if not profile:
-            return response.Response({"detail": "Not a student."}, status=404)
-        courses = StudentCourseModel.objects.filter(student=profile)
-        return response.Response(StudentCourseModelSerializer(courses, many=True).data)
+        courses = StudentCourseModel.objects.filter(
+            student_id=principal.profile_id
+        ).select_related("course")
+        return paginated_response(
+            request, courses, StudentCourseModelSerializer, view=self
+        )
 
     @swagger_auto_schema(
         methods=["get"],
@@ -137,19 +168,21 @@ class StudentViewSet(viewsets.ViewSet):
         responses={200: StudentCourseProgressModelSerializer(many=True)},
         tags=["Student"],
     )
-    @action(detail=False, methods=["get"], url_path="progress")
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="progress",
+        renderer_classes=FAST_RENDERER_CLASSES,
+    )
     def progress(self, request):
-        user = request.user
-        if not user.is_authenticated:
-            return response.Response({"detail": "Not a student."}, status=404)
-        profile = getattr(user, "student_profile", None)
-        if not profile:
+        principal = get_principal(request.user)
+        if not principal.is_student:
             return response.Response({"detail": "Not a student."}, status=404)
         progress = StudentCourseProgressModel.objects.filter(
-            student_course__student=profile
+            student_course__student_id=principal.profile_id
         )
-        return response.Response(
-            StudentCourseProgressModelSerializer(progress, many=True).data
+        return values_paginated_response(
+            request, progress, StudentCourseProgressModelSerializer, view=self
         )
 
     @swagger_auto_schema(
@@ -158,17 +191,19 @@ class StudentViewSet(viewsets.ViewSet):
         responses={200: StudentSessionModelSerializer(many=True)},
         tags=["Student"],
     )
-    @action(detail=False, methods=["get"], url_path="sessions")
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="sessions",
+        renderer_classes=FAST_RENDERER_CLASSES,
+    )
     def sessions(self, request):
-        user = request.user
-        if not user.is_authenticated:
-            return response.Response({"detail": "Not a student."}, status=404)
-        profile = getattr(user, "student_profile", None)
-        if not profile:
+        principal = get_principal(request.user)
+        if not principal.is_student:
             return response.Response({"detail": "Not a student."}, status=404)
-        sessions = StudentSessionModel.objects.filter(student=profile)
-        return response.Response(
-            StudentSessionModelSerializer(sessions, many=True).data
+        sessions = StudentSessionModel.objects.filter(student_id=principal.profile_id)
+        return values_paginated_response(
+            request, sessions, StudentSessionModelSerializer, view=self
         )
 
     @swagger_auto_schema(
@@ -177,16 +212,22 @@ class StudentViewSet(viewsets.ViewSet):
         responses={200: StudentAnswerModelSerializer(many=True)},
         tags=["Student"],
     )
-    @action(detail=False, methods=["get"], url_path="answers")
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="answers",
+        renderer_classes=FAST_RENDERER_CLASSES,
+    )
     def answers(self, request):
-        user = request.user
-        if not user.is_authenticated:
-            return response.Response({"detail": "Not a student."}, status=404)
-        profile = getattr(user, "student_profile", None)
-        if not profile:
+        principal = get_principal(request.user)
+        if not principal.is_student:
             return response.Response({"detail": "Not a student."}, status=404)
-        answers = StudentAnswerModel.objects.filter(session__student=profile)
-        return response.Response(StudentAnswerModelSerializer(answers, many=True).data)
+        answers = StudentAnswerModel.objects.filter(
+            session__student_id=principal.profile_id
+        )
+        return values_paginated_response(
+            request, answers, StudentAnswerModelSerializer, view=self
+        )
 
     @swagger_auto_schema(
         methods=["get"],
@@ -196,15 +237,14 @@ class StudentViewSet(viewsets.ViewSet):
     )
     @action(detail=False, methods=["get"], url_path="cheating-evidence")
     def cheating_evidence(self, request):
-        user = request.user
-        if not user.is_authenticated:
-            return response.Response({"detail": "Not a student."}, status=404)
-        profile = getattr(user, "student_profile", None)
-        if not profile:
+        principal = get_principal(request.user)
+        if not principal.is_student:
             return response.Response({"detail": "Not a student."}, status=404)
-        evidence = CheatingEvidenceModel.objects.filter(session__student=profile)
-        return response.Response(
-            CheatingEvidenceModelSerializer(evidence, many=True).data
+        evidence = CheatingEvidenceModel.objects.filter(
+            session__student_id=principal.profile_id
+        )
+        return paginated_response(
+            request, evidence, CheatingEvidenceModelSerializer, view=self
         )
 
     @swagger_auto_schema(
@@ -236,6 +276,7 @@ class StudentViewSet(viewsets.ViewSet):
 
         if serialized_data.is_valid(raise_exception=True):
             instance = serialized_data.save(student=profile)
+            publish_session("started", instance)
             return response.Response(
                 data=StudentSessionModelSerializer(instance=instance).data,
                 status=status.HTTP_200_OK,
@@ -276,47 +317,33 @@ class StudentViewSet(viewsets.ViewSet):
         if session_id is None:
             return response.Response({"detail": "Session id not provided"}, status=404)
 
-        session = profile.sessions.filter(id=session_id)
-        if not session.exists():
-            return response.Response(
-                {"detail": f"You have no session with id: {session_id} ."}, status=404
+        with transaction.atomic():
+            # the lock waits out evidence being counted (students.scoring), so
+            # the counters read here are the final ones
+            session = (
+                profile.sessions.select_for_update(of=("self",))
+                .select_related("assignment")
+                .filter(id=session_id)
+                .first()
             )
-        session = session.first()
-        session.end_time = timezone.now()
-
-        counts = session.cheating_evidence.values("type").annotate(count=Count("id"))
-        count_map = {item["type"]: item["count"] for item in counts}
-
-        # Step 2: Normalize each metric (1 = evidence present, 0 = clean)
-        metrics = {
-            "device": 1 if count_map.get("device", 0) > 0 else 0,
-            "multiple_people": 1 if count_map.get("multiple_people", 0) > 0 else 0,
-            "audio": 1 if count_map.get("audio", 0) > 0 else 0,
-            "ai": 1 if count_map.get("ai", 0) > 0 else 0,
-        }
-
-        # Normalize tab_switch (scale from 0 to 1, max = 5)
-        raw_tab_switch = count_map.get("tab_switch", 0)
-        ts_norm = min(raw_tab_switch / 5.0, 1.0)
-        metrics["tab_switch"] = ts_norm
-
-        # Step 3: Weights (equal weight for each of 5 types)
-        weights = {
-            "device": 0.20,
-            "multiple_people": 0.20,
-            "audio": 0.20,
-            "ai": 0.20,
-            "tab_switch": 0.20,
-        }
-
-        # Step 4: Compute raw score (0–1)
-        raw_score = sum(weights[key] * (1 - metrics[key]) for key in weights)
-
-        # Step 5: Convert to percentage
-        score_percent = int(round(raw_score * 100))
-
-        session.cheating_score = 100 - score_percent
-        session.save()
+            if session is None:
+                return response.Response(
+                    {"detail": f"You have no session with id: {session_id} ."},
+                    status=404,
+                )
+            session.end_time = timezone.now()
+
+            # counters are maintained as evidence arrives, no aggregate needed here
+            session.cheating_score = cheating_score(session)
+            grades = compute_grades(
+                session.assignment, StudentSessionModel.objects.filter(pk=session.pk)
+            )
+            if session.id in grades:
+                session.grade = grades[session.id][1]
+            # only what is decided here: a full save would write the counters
+            # back as loaded
+            session.save(update_fields=["end_time", "cheating_score", "grade"])
+        publish_session("ended", session)
 
         return response.Response(
             data=StudentSessionModelSerializer(session).data, status=status.HTTP_200_OK
@@ -357,9 +384,137 @@ class StudentViewSet(viewsets.ViewSet):
             serialized_data.errors, status=status.HTTP_400_BAD_REQUEST
         )
 
+    @swagger_auto_schema(
+        methods=["post"],
+        operation_summary="Save many answers of a session at once",
+        operation_description=(
+            "Creates or overwrites the answers of one open session. Meant for "
+            "autosave: send the current state of every answered question."
+        ),
+        request_body=StudentAnswerBulkSerializer,
+        responses={
+            200: openapi.Response(
+                description="Answers saved",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "session": openapi.Schema(type=openapi.TYPE_INTEGER),
+                        "saved": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    },
+                ),
+            ),
+            400: "Invalid answers; errors are keyed by position in `answers`",
+        },
+        tags=["Student"],
+    )
+    @action(detail=False, methods=["post"], url_path="answers-bulk")
+    def answers_bulk(self, request):
+        user = request.user
+        if not user.is_authenticated:
+            return response.Response({"detail": "Authentication required."}, status=401)
+        profile = getattr(user, "student_profile", None)
+        if not profile:
+            return response.Response({"detail": "Not a student."}, status=403)
+
+        payload = StudentAnswerBulkSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        session_id = payload.validated_data["session"]
+        # last answer wins when the client sends the same question twice
+        items = {
+            item["question"]: (position, item)
+            for position, item in enumerate(payload.validated_data["answers"])
+        }
+
+        session = profile.sessions.filter(id=session_id).first()
+        if session is None:
+            return response.Response(
+                {"detail": f"You have no session with id: {session_id} ."}, status=404
+            )
+        if session.end_time is not None:
+            return response.Response(
+                {"detail": "This session has already ended. You cannot submit answers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        question_types = dict(
+            QuestionModel.objects.filter(
+                assignment_id=session.assignment_id, id__in=items
+            ).values_list("id", "type")
+        )
+        choice_ids = [
+            item["choice"] for _, item in items.values() if item.get("choice")
+        ]
+        choice_questions = dict(
+            QuestionChoiceModel.objects.filter(
+                id__in=choice_ids, question_id__in=question_types
+            ).values_list("id", "question_id")
+        )
+
+        stored_rows = StudentAnswerModel.objects.filter(
+            session=session, question_id__in=question_types
+        ).values_list("question_id", "text_answer", "choice_id", "true_false_answer")
+        stored = {question_id: tuple(answer) for question_id, *answer in stored_rows}
+
+        answers, errors = [], {}
+        for question_id, (position, item) in items.items():
+            question_type = question_types.get(question_id)
+            choice_id = item.get("choice")
+            try:
+                if question_type is None:
+                    raise serializers.ValidationError(
+                        "Question does not belong to this session's assignment."
+                    )
+                validate_answer_shape(
+                    question_type,
+                    item.get("text_answer"),
+                    choice_id,
+                    item.get("true_false_answer"),
+                )
+                if choice_id and choice_questions.get(choice_id) != question_id:
+                    raise serializers.ValidationError(
+                        "Choice does not belong to this question."
+                    )
+            except serializers.ValidationError as exc:
+                errors[position] = exc.detail
+                continue
+            answer = (item.get("text_answer"), choice_id, item.get("true_false_answer"))
+            if stored.get(question_id) == answer:
+                # autosave resends every answer; answered_at is when it changed
+                continue
+            answers.append(
+                StudentAnswerModel(
+                    session=session,
+                    question_id=question_id,
+                    text_answer=item.get("text_answer"),
+                    choice_id=choice_id,
+                    true_false_answer=item.get("true_false_answer"),
+                )
+            )
+
+        if errors:
+            return response.Response(
+                {"answers": errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if answers:
+            StudentAnswerModel.objects.bulk_create(
+                answers,
+                update_conflicts=True,
+                unique_fields=["session", "question"],
+                update_fields=[
+                    "text_answer",
+                    "choice",
+                    "true_false_answer",
+                    "answered_at",
+                ],
+            )
+            invalidate_analytics(session.assignment_id)
+        return response.Response(
+            {"session": session.id, "saved": len(items)}, status=status.HTTP_200_OK
+        )
 
-class CheatingEvidenceView(viewsets.ViewSet):
 
+class CheatingEvidenceView(AsyncViewSet):
     permission_classes = [HasValidAPIKey]
     parser_classes = [parsers.MultiPartParser, parsers.JSONParser]
 
@@ -369,17 +524,18 @@ class CheatingEvidenceView(viewsets.ViewSet):
         responses={200: CheatingEvidenceModelSerializer()},
         tags=["Services"],
     )
-    def create(self, request):
-        data = request.data
-        serializer = CheatingEvidenceModelSerializer(data=data)
-
+    async def create(self, request):
+        data = await sync_to_async(self.save_evidence)(request)
+        return response.Response(data=data, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def save_evidence(request):
+        # parsing the upload, storage, counters and the feed event: all sync
+        # work, done off the event loop
+        serializer = CheatingEvidenceModelSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         evidence = serializer.save()
-
-        return response.Response(
-            data=CheatingEvidenceModelSerializer(evidence).data,
-            status=status.HTTP_200_OK,
-        )
+        return CheatingEvidenceModelSerializer(evidence).data
 
     @swagger_auto_schema(
         operation_summary="Submit liveness of student",
@@ -395,8 +551,7 @@ class CheatingEvidenceView(viewsets.ViewSet):
         tags=["Services"],
     )
     @action(detail=False, methods=["post"], url_path="live-check")
-    def live_check(self, request):
-
+    async def live_check(self, request):
         data = request.data
         session_id = data.get("session_id")
         is_live = data.get("is_live")
@@ -406,9 +561,11 @@ class CheatingEvidenceView(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        session = StudentSessionModel.objects.filter(
-            id=session_id, end_time__isnull=True
-        ).first()
+        session = await (
+            StudentSessionModel.objects.select_related("student")
+            .filter(id=session_id, end_time__isnull=True)
+            .afirst()
+        )
 
         if not session:
             return response.Response(
@@ -417,7 +574,8 @@ class CheatingEvidenceView(viewsets.ViewSet):
             )
 
         session.is_live = True
-        session.save()
+        await session.asave(update_fields=["is_live"])
+        await sync_to_async(publish_session)("live", session)
         return response.Response(
             data=StudentSessionModelSerializer(instance=session).data,
             status=status.HTTP_200_OK,
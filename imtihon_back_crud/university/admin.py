@@ -1,4 +1,5 @@
 from unfold.admin import ModelAdmin
+from unfold.contrib.filters.admin import AutocompleteSelectFilter
 from .models import (
     UniversityModel,
     FacultyModel,
@@ -14,6 +15,7 @@ class UniversityModelAdmin(ModelAdmin):
     list_display = ("id", "name", "location", "number", "email", "website", "user")
     search_fields = ("name", "location", "number", "email", "website", "user__username")
     list_filter = ("location",)
+    list_select_related = ("user",)
     ordering = ("name",)
     readonly_fields = ("id",)
 
@@ -23,6 +25,7 @@ class FacultyModelAdmin(ModelAdmin):
     list_display = ("id", "name", "code", "university")
     search_fields = ("name", "code", "university__name")
     list_filter = ("university",)
+    list_select_related = ("university",)
     ordering = ("university", "name")
     readonly_fields = ("id",)
 
@@ -31,7 +34,9 @@ class FacultyModelAdmin(ModelAdmin):
 class DepartmentModelAdmin(ModelAdmin):
     list_display = ("id", "name", "code", "faculty")
     search_fields = ("name", "code", "faculty__name")
-    list_filter = ("faculty",)
+    list_filter = (("faculty", AutocompleteSelectFilter),)
+    list_select_related = ("faculty__university",)
+    autocomplete_fields = ("faculty",)
     ordering = ("faculty", "name")
     readonly_fields = ("id",)
 
@@ -40,7 +45,9 @@ class DepartmentModelAdmin(ModelAdmin):
 class GroupModelAdmin(ModelAdmin):
     list_display = ("id", "name", "university", "department")
     search_fields = ("name", "university__name", "department__name")
-    list_filter = ("university", "department")
+    list_filter = ("university", ("department", AutocompleteSelectFilter))
+    list_select_related = ("university", "department__faculty__university")
+    autocomplete_fields = ("department",)
     ordering = ("university", "department", "name")
     readonly_fields = ("id",)
 
@@ -58,6 +65,8 @@ class SubjectModelAdmin(ModelAdmin):
         "university__name",
         "department__name",
     )
-    list_filter = ("university", "department")
+    list_filter = ("university", ("department", AutocompleteSelectFilter))
+    list_select_related = ("university", "department__faculty__university")
+    autocomplete_fields = ("department",)
     ordering = ("university", "department", "name")
     readonly_fields = ("id",)
@@ -0,0 +1,31 @@
+from core.cache import VersionedCacheMixin, bump_version
+from core.principal import get_principal
+
+
+def reference_namespace(university_id):
+    return f"university_reference:{university_id}"
+
+
+def bump_reference_data(university_id):
+    """Invalidate cached faculties/departments/groups/subjects of a university."""
+    namespaces = [reference_namespace("all")]
+    if university_id is not None:
+        namespaces.append(reference_namespace(university_id))
+    bump_version(*namespaces)
+
+
+class ReferenceDataCacheMixin(VersionedCacheMixin):
+    """Caches university structure per university and per role of the user."""
+
+    def get_cache_scope(self):
+        user = self.request.user
+        if not user.is_authenticated:
+            return None
+        if user.is_superuser:
+            return reference_namespace("all"), "superuser"
+        principal = get_principal(user)
+        if principal.is_professor:
+            return reference_namespace(principal.university_id), "professor"
+        if principal.is_owner:
+            return reference_namespace(principal.university_id), f"owner:{user.id}"
+        return None
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.4 on 2026-10-19 14:21
+
+from django.db import IntegrityError, migrations, models, transaction
+
+
+def merge_duplicates(app_label, model_name, fields):
+    """
+    Fold each group of rows duplicated on ``fields`` into its oldest row
+    before the unique constraint: rows pointing at a duplicate are moved to
+    the kept one (or dropped when the kept one already has an equal row),
+    then the duplicates are deleted.
+    """
+
+    def forwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        groups = (
+            model.objects.values(*fields)
+            .annotate(keep_id=models.Min("id"), rows=models.Count("id"))
+            .filter(rows__gt=1)
+        )
+        relations = [
+            rel for rel in model._meta.related_objects if not rel.many_to_many
+        ]
+        for row in groups:
+            duplicates = model.objects.filter(
+                **{f: row[f] for f in fields}
+            ).exclude(id=row["keep_id"])
+            for rel in relations:
+                name = rel.field.name
+                dependents = rel.related_model.objects.filter(
+                    **{f"{name}__in": duplicates}
+                )
+                for dependent in dependents:
+                    try:
+                        with transaction.atomic():
+                            rel.related_model.objects.filter(
+                                pk=dependent.pk
+                            ).update(**{f"{name}_id": row["keep_id"]})
+                    except IntegrityError:
+                        dependent.delete()
+            duplicates.delete()
+
+    return forwards
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0005_alter_universitymodel_user'),
+    ]
+
+    operations = [
+        # parents first, so their children meet under one parent before
+        # their own duplicates are merged
+        migrations.RunPython(
+            merge_duplicates("university", "FacultyModel", ["university", "code"]),
+            migrations.RunPython.noop,
+        ),
+        migrations.RunPython(
+            merge_duplicates("university", "DepartmentModel", ["faculty", "code"]),
+            migrations.RunPython.noop,
+        ),
+        migrations.RunPython(
+            merge_duplicates(
+                "university", "GroupModel", ["university", "department", "name"]
+            ),
+            migrations.RunPython.noop,
+        ),
+        migrations.RunPython(
+            merge_duplicates(
+                "university", "SubjectModel", ["university", "department", "code"]
+            ),
+            migrations.RunPython.noop,
+        ),
+        migrations.AlterUniqueTogether(
+            name='departmentmodel',
+            unique_together={('faculty', 'code')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='facultymodel',
+            unique_together={('university', 'code')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='groupmodel',
+            unique_together={('university', 'department', 'name')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='subjectmodel',
+            unique_together={('university', 'department', 'code')},
+        ),
+    ]
@@ -15,3 +15,6 @@ class SubjectModel(models.Model):
 
     def __str__(self) -> str:
         return f"university: {self.university.name} subject:{self.name}"
+
+    class Meta:
+        unique_together = ("university", "department", "code")
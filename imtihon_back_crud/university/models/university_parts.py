@@ -13,6 +13,9 @@ class FacultyModel(models.Model):
     def __str__(self) -> str:
         return f"University: {self.university.name} - faculty: {self.name}"
 
+    class Meta:
+        unique_together = ("university", "code")
+
 
 class DepartmentModel(models.Model):
     faculty = models.ForeignKey(FacultyModel, on_delete=models.CASCADE)
@@ -23,6 +26,9 @@ class DepartmentModel(models.Model):
     def __str__(self) -> str:
         return f"university:{self.faculty.university.name} - group:{self.name}"
 
+    class Meta:
+        unique_together = ("faculty", "code")
+
 
 class GroupModel(models.Model):
     university = models.ForeignKey(
@@ -35,3 +41,6 @@ class GroupModel(models.Model):
 
     def __str__(self) -> str:
         return f"university: {self.university.name} - group:{self.name}"
+
+    class Meta:
+        unique_together = ("university", "department", "name")
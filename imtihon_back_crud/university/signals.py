@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from university.cache import bump_reference_data
+from university.models import DepartmentModel, FacultyModel, GroupModel, SubjectModel
+
+
+@receiver([post_save, post_delete], sender=FacultyModel)
+@receiver([post_save, post_delete], sender=GroupModel)
+@receiver([post_save, post_delete], sender=SubjectModel)
+def invalidate_reference_data(sender, instance, **kwargs):
+    bump_reference_data(instance.university_id)
+
+
+@receiver([post_save, post_delete], sender=DepartmentModel)
+def invalidate_department_reference_data(sender, instance, **kwargs):
+    # the faculty may already be gone when departments are cascade-deleted
+    university_id = (
+        FacultyModel.objects.filter(pk=instance.faculty_id)
+        .values_list("university_id", flat=True)
+        .first()
+    )
+    bump_reference_data(university_id)
@@ -2,7 +2,9 @@ from rest_framework.test import APITestCase
 from django.urls import reverse
 from rest_framework import status
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from university.models import UniversityModel, FacultyModel, DepartmentModel, GroupModel, SubjectModel
+from professors.models import ProfessorProfileModel
 
 class UniversityAPITestCase(APITestCase):
     def setUp(self):
@@ -37,3 +39,43 @@ class UniversityAPITestCase(APITestCase):
         url = reverse('subjectmodel-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ReferenceDataCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user(username='owner', password='testpass')
+        self.university = UniversityModel.objects.create(user=owner, name='Uni')
+        self.faculty = FacultyModel.objects.create(university=self.university, name='Faculty', code='F1')
+        self.user = User.objects.create_user(username='professor', password='testpass')
+        ProfessorProfileModel.objects.create(user=self.user, university=self.university, professor_id='P1', name='Prof')
+        self.client.force_authenticate(self.user)
+        self.url = reverse('facultymodel-list')
+
+    def test_cached_list_served_without_queries(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_model_change_invalidates_cache(self):
+        etag = self.client.get(self.url)['ETag']
+        FacultyModel.objects.create(university=self.university, name='Second', code='F2')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_other_university_not_invalidated(self):
+        etag = self.client.get(self.url)['ETag']
+        other_owner = User.objects.create_user(username='other', password='testpass')
+        other = UniversityModel.objects.create(user=other_owner, name='Other')
+        FacultyModel.objects.create(university=other, name='Foreign', code='F9')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -21,8 +21,10 @@ from .serializers import (
 from professors.serializers import ProfessorProfileModelSerializer
 from rest_framework.permissions import IsAuthenticated
 from core.permissions import IsUniversityOwnerOrReadOnly
+from core.principal import get_principal
+from university.cache import ReferenceDataCacheMixin
 
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from core.authentication import PrincipalJWTAuthentication
 
 
 class UniversityModelViewSet(viewsets.ModelViewSet):
@@ -43,7 +45,7 @@ class UniversityModelViewSet(viewsets.ModelViewSet):
     - University-specific configuration and settings
     """
 
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     permission_classes = [IsAuthenticated, IsUniversityOwnerOrReadOnly]
     queryset = UniversityModel.objects.all()
@@ -55,10 +57,10 @@ class UniversityModelViewSet(viewsets.ModelViewSet):
             return UniversityModel.objects.none()
         if user.is_superuser:
             return UniversityModel.objects.all()
-        if hasattr(user, "professor_profile"):
-            return UniversityModel.objects.filter(id=user.professor_profile.university_id)
-        if hasattr(user, "universities"):
-            return UniversityModel.objects.filter(user=user)
+        principal = get_principal(user)
+        # professors and owners see their own university's records
+        if principal.is_staff:
+            return UniversityModel.objects.filter(id=principal.university_id)
         return UniversityModel.objects.none()
 
     @swagger_auto_schema(
@@ -164,7 +166,7 @@ class UniversityModelViewSet(viewsets.ModelViewSet):
     #     return super().destroy(request, *args, **kwargs)
 
 
-class FacultyModelViewSet(viewsets.ReadOnlyModelViewSet):
+class FacultyModelViewSet(ReferenceDataCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for managing faculties within universities.
 
@@ -179,7 +181,7 @@ class FacultyModelViewSet(viewsets.ReadOnlyModelViewSet):
     - Faculty metadata and administrative information management
     """
 
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     permission_classes = [IsAuthenticated, IsUniversityOwnerOrReadOnly]
     queryset = FacultyModel.objects.all()
@@ -191,11 +193,10 @@ class FacultyModelViewSet(viewsets.ReadOnlyModelViewSet):
             return FacultyModel.objects.none()
         if user.is_superuser:
             return FacultyModel.objects.all()
-        if hasattr(user, "professor_profile"):
-            university = user.professor_profile.university
-            return FacultyModel.objects.filter(university=university)
-        if hasattr(user, "universities"):
-            return FacultyModel.objects.filter(university__user=user)
+        principal = get_principal(user)
+        # professors and owners see their own university's records
+        if principal.is_staff:
+            return FacultyModel.objects.filter(university_id=principal.university_id)
         return FacultyModel.objects.none()
 
     @swagger_auto_schema(
@@ -296,7 +297,7 @@ class FacultyModelViewSet(viewsets.ReadOnlyModelViewSet):
     #     return super().destroy(request, *args, **kwargs)
 
 
-class DepartmentModelViewSet(viewsets.ReadOnlyModelViewSet):
+class DepartmentModelViewSet(ReferenceDataCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for managing departments within faculties.
 
@@ -314,7 +315,7 @@ class DepartmentModelViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated, IsUniversityOwnerOrReadOnly]
     queryset = DepartmentModel.objects.all()
     serializer_class = DepartmentModelSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get_queryset(self):
         user = self.request.user
@@ -322,11 +323,12 @@ class DepartmentModelViewSet(viewsets.ReadOnlyModelViewSet):
             return DepartmentModel.objects.none()
         if user.is_superuser:
             return DepartmentModel.objects.all()
-        if hasattr(user, "professor_profile"):
-            university = user.professor_profile.university
-            return DepartmentModel.objects.filter(faculty__university=university)
-        if hasattr(user, "universities"):
-            return DepartmentModel.objects.filter(faculty__university__user=user)
+        principal = get_principal(user)
+        # professors and owners see their own university's records
+        if principal.is_staff:
+            return DepartmentModel.objects.filter(
+                faculty__university_id=principal.university_id
+            )
         return DepartmentModel.objects.none()
 
     @swagger_auto_schema(
@@ -427,7 +429,7 @@ class DepartmentModelViewSet(viewsets.ReadOnlyModelViewSet):
     #     return super().destroy(request, *args, **kwargs)
 
 
-class GroupModelViewSet(viewsets.ReadOnlyModelViewSet):
+class GroupModelViewSet(ReferenceDataCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for managing student groups within departments.
 
@@ -445,7 +447,7 @@ class GroupModelViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated, IsUniversityOwnerOrReadOnly]
     queryset = GroupModel.objects.all()
     serializer_class = GroupModelSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get_queryset(self):
         user = self.request.user
@@ -453,11 +455,10 @@ class GroupModelViewSet(viewsets.ReadOnlyModelViewSet):
             return GroupModel.objects.none()
         if user.is_superuser:
             return GroupModel.objects.all()
-        if hasattr(user, "professor_profile"):
-            university = user.professor_profile.university
-            return GroupModel.objects.filter(university=university)
-        if hasattr(user, "universities"):
-            return GroupModel.objects.filter(university__user=user)
+        principal = get_principal(user)
+        # professors and owners see their own university's records
+        if principal.is_staff:
+            return GroupModel.objects.filter(university_id=principal.university_id)
         return GroupModel.objects.none()
 
     @swagger_auto_schema(
@@ -558,7 +559,7 @@ class GroupModelViewSet(viewsets.ReadOnlyModelViewSet):
     #     return super().destroy(request, *args, **kwargs)
 
 
-class SubjectModelViewSet(viewsets.ReadOnlyModelViewSet):
+class SubjectModelViewSet(ReferenceDataCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for managing subjects within the educational system.
 
@@ -576,7 +577,7 @@ class SubjectModelViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated, IsUniversityOwnerOrReadOnly]
     queryset = SubjectModel.objects.all()
     serializer_class = SubjectModelSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get_queryset(self):
         user = self.request.user
@@ -584,11 +585,10 @@ class SubjectModelViewSet(viewsets.ReadOnlyModelViewSet):
             return SubjectModel.objects.none()
         if user.is_superuser:
             return SubjectModel.objects.all()
-        if hasattr(user, "professor_profile"):
-            university = user.professor_profile.university
-            return SubjectModel.objects.filter(university=university)
-        if hasattr(user, "universities"):
-            return SubjectModel.objects.filter(university__user=user)
+        principal = get_principal(user)
+        # professors and owners see their own university's records
+        if principal.is_staff:
+            return SubjectModel.objects.filter(university_id=principal.university_id)
         return SubjectModel.objects.none()
 
     @swagger_auto_schema(
@@ -707,7 +707,7 @@ class ProfessorProfileReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated, IsUniversityOwnerOrReadOnly]
     queryset = ProfessorProfileModel.objects.all()
     serializer_class = ProfessorProfileModelSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [PrincipalJWTAuthentication]
 
     def get_queryset(self):
         user = self.request.user
@@ -715,11 +715,12 @@ class ProfessorProfileReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
             return ProfessorProfileModel.objects.none()
         if user.is_superuser:
             return ProfessorProfileModel.objects.all()
-        if hasattr(user, "professor_profile"):
-            university = user.professor_profile.university
-            return ProfessorProfileModel.objects.filter(university=university)
-        if hasattr(user, "universities"):
-            return ProfessorProfileModel.objects.filter(university__user=user)
+        principal = get_principal(user)
+        # professors and owners see their own university's records
+        if principal.is_staff:
+            return ProfessorProfileModel.objects.filter(
+                university_id=principal.university_id
+            )
         return ProfessorProfileModel.objects.none()
 
     @swagger_auto_schema(
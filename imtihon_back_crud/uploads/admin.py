@@ -0,0 +1,33 @@
+from django.contrib import admin
+from unfold.admin import ModelAdmin
+
+from uploads.models import BlobModel, ResumableUploadModel
+
+
+@admin.register(BlobModel)
+class BlobAdmin(ModelAdmin):
+    list_display = ("id", "name", "size", "refcount", "created_at")
+    search_fields = ("name",)
+    readonly_fields = ("name", "size", "refcount", "created_at")
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ResumableUploadModel)
+class ResumableUploadAdmin(ModelAdmin):
+    list_display = (
+        "id",
+        "filename",
+        "target",
+        "object_id",
+        "offset",
+        "size",
+        "status",
+        "created_by",
+        "updated_at",
+    )
+    list_filter = ("status", "target")
+    list_select_related = ("created_by",)
+    search_fields = ("filename", "created_by__username")
+    readonly_fields = ("offset", "status", "result_id", "created_at", "updated_at")
@@ -0,0 +1,49 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from uploads.storage import BLOB_PREFIX, ContentAddressedStorage
+
+
+def blob_fields():
+    """(model, field name) of every file field stored content-addressed."""
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField) and isinstance(
+                field.storage, ContentAddressedStorage
+            ):
+                yield model, field.name
+
+
+class Command(BaseCommand):
+    help = "Move files saved before content-addressed storage into it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, help="stop after this many files")
+
+    def handle(self, *args, **options):
+        moved = missing = 0
+        for model, name in blob_fields():
+            storage = model._meta.get_field(name).storage
+            pending = (
+                model.objects.exclude(**{name: ""})
+                .exclude(**{f"{name}__isnull": True})
+                .exclude(**{f"{name}__startswith": BLOB_PREFIX + "/"})
+                .order_by("pk")
+                .values_list("pk", name)
+            )
+            for pk, old_name in pending.iterator(chunk_size=500):
+                if options["limit"] and moved >= options["limit"]:
+                    break
+                if not storage.exists(old_name):
+                    missing += 1
+                    continue
+                with storage.open(old_name, "rb") as f:
+                    new_name = storage.save(old_name, f)
+                model.objects.filter(pk=pk).update(**{name: new_name})
+                storage.delete(old_name)
+                moved += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Moved {moved} files, {missing} missing on disk.")
+        )
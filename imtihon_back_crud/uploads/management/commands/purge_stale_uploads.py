@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from uploads.models import ResumableUploadModel
+from uploads.resumable import remove_part
+
+
+class Command(BaseCommand):
+    help = "Delete unfinished resumable uploads and their chunks once idle."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(
+            hours=settings.RESUMABLE_UPLOAD_EXPIRY_HOURS
+        )
+        stale = ResumableUploadModel.objects.filter(
+            status="uploading", updated_at__lt=cutoff
+        )
+        count = 0
+        for upload in stale.iterator():
+            remove_part(upload)
+            upload.delete()
+            count += 1
+        # finished uploads only record where the file went
+        ResumableUploadModel.objects.filter(
+            status="done", updated_at__lt=cutoff
+        ).delete()
+        self.stdout.write(self.style.SUCCESS(f"Removed {count} stale uploads."))
@@ -0,0 +1,2 @@
+from .blob import BlobModel
+from .upload import ResumableUploadModel
@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class BlobModel(models.Model):
+    """
+    One stored file of uploads.storage.ContentAddressedStorage; ``refcount``
+    is the number of file fields pointing at it.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
@@ -0,0 +1,47 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class ResumableUploadModel(models.Model):
+    """
+    A file sent in chunks (uploads.resumable) and, once finalized, saved
+    into the file field of its target.
+    """
+
+    TARGET_CHOICES = [
+        ("course_attachment", "Course attachment"),
+        ("lesson_video", "Lesson video"),
+        ("assignment_attachment", "Assignment attachment"),
+    ]
+    STATUS_CHOICES = [
+        ("uploading", "Uploading"),
+        ("done", "Done"),
+    ]
+
+    # the id is the only handle on an upload; it should not be guessable
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="resumable_uploads",
+    )
+    target = models.CharField(max_length=30, choices=TARGET_CHOICES)
+    # course, lesson or assignment id depending on target
+    object_id = models.PositiveBigIntegerField()
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True, default="")
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default="uploading"
+    )
+    # id of the attachment / lesson the file ended up in
+    result_id = models.PositiveBigIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
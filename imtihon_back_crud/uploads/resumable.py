@@ -0,0 +1,139 @@
+# resumable.py
+
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files import File
+
+from assignments.models import AssignmentAttachmentsModel, AssignmentModel
+from core.principal import get_principal
+from course.models import CourseAttachmentsModel, CourseLessonModel, CourseModel
+
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+class ChunkError(Exception):
+    pass
+
+
+def resolve_target(user, target, object_id):
+    """The course, lesson or assignment an upload goes to, if ``user`` may."""
+    principal = get_principal(user)
+    if not principal.is_staff:
+        return None
+    university_id = principal.university_id
+    if target == "course_attachment":
+        queryset = CourseModel.objects.filter(subject__university_id=university_id)
+    elif target == "lesson_video":
+        queryset = CourseLessonModel.objects.filter(
+            section__course__subject__university_id=university_id
+        )
+    else:
+        queryset = AssignmentModel.objects.filter(subject__university_id=university_id)
+        # as AssignmentModelViewSet.can_monitor: own assignments, or the owner
+        if principal.is_professor:
+            queryset = queryset.filter(professor_id=principal.profile_id)
+    return queryset.filter(pk=object_id).first()
+
+
+def part_path(upload):
+    """
+    Where chunks are assembled: under MEDIA_ROOT, so finalizing is a rename
+    on the same filesystem rather than a copy.
+    """
+    return os.path.join(
+        settings.MEDIA_ROOT, settings.RESUMABLE_UPLOAD_DIR, f"{upload.id}.part"
+    )
+
+
+def create_part(upload):
+    path = part_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+
+
+def remove_part(upload):
+    try:
+        os.remove(part_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def write_chunk(upload, stream, length, checksum=None):
+    """
+    Copy ``length`` bytes of ``stream`` into the part file at
+    ``upload.offset`` in small buffers, hashing as they pass. A short body
+    or a SHA-256 mismatch truncates the file back, leaving the offset where
+    it was so the client resends the same chunk.
+    """
+    digest = hashlib.sha256()
+    written = 0
+    with open(part_path(upload), "r+b") as f:
+        f.seek(upload.offset)
+        while written < length:
+            data = stream.read(min(COPY_BUFFER_SIZE, length - written))
+            if not data:
+                break
+            f.write(data)
+            digest.update(data)
+            written += len(data)
+        if written != length:
+            error = "Chunk is shorter than its Content-Length."
+        elif checksum and checksum.lower() != digest.hexdigest():
+            error = "Chunk checksum does not match."
+        else:
+            error = None
+        if error:
+            f.truncate(upload.offset)
+            raise ChunkError(error)
+        f.truncate(upload.offset + written)
+    return written
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(COPY_BUFFER_SIZE), b""):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+class PartFile(File):
+    """
+    The assembled part file. FileSystemStorage moves anything with a
+    temporary_file_path() into place instead of copying it.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def _link(upload, target, content):
+    if upload.target == "course_attachment":
+        attachment = CourseAttachmentsModel(course=target)
+        attachment.attachment_file.save(upload.filename, content)
+        return attachment.id
+    if upload.target == "lesson_video":
+        target.video.save(upload.filename, content)
+        return target.id
+    attachment = AssignmentAttachmentsModel(assignment=target)
+    attachment.attachment_file.save(upload.filename, content)
+    return attachment.id
+
+
+def finalize(upload, target):
+    """
+    Check size and the whole-file checksum, then save the part file into
+    the target's file field. Returns the id of the row that holds it.
+    """
+    path = part_path(upload)
+    if upload.offset != upload.size:
+        raise ChunkError(f"Only {upload.offset} of {upload.size} bytes received.")
+    if upload.sha256 and file_sha256(path) != upload.sha256.lower():
+        raise ChunkError("File checksum does not match.")
+    with open(path, "rb") as f:
+        result_id = _link(upload, target, PartFile(f, name=upload.filename))
+    # content-addressed storage keeps the part when the blob already exists
+    remove_part(upload)
+    return result_id
@@ -0,0 +1,47 @@
+import re
+
+from django.conf import settings
+from rest_framework import serializers
+
+from uploads.models import ResumableUploadModel
+
+
+class ResumableUploadSerializer(serializers.ModelSerializer):
+    chunk_size = serializers.SerializerMethodField(
+        help_text="Largest chunk the server accepts, in bytes."
+    )
+
+    class Meta:
+        model = ResumableUploadModel
+        fields = (
+            "id",
+            "target",
+            "object_id",
+            "filename",
+            "size",
+            "sha256",
+            "offset",
+            "status",
+            "result_id",
+            "chunk_size",
+            "created_at",
+        )
+        read_only_fields = ("id", "offset", "status", "result_id", "created_at")
+
+    def get_chunk_size(self, obj):
+        return settings.RESUMABLE_UPLOAD_CHUNK_SIZE
+
+    def validate_size(self, size):
+        if not 0 < size <= settings.RESUMABLE_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"Size must be between 1 and {settings.RESUMABLE_UPLOAD_MAX_SIZE}."
+            )
+        return size
+
+    def validate_sha256(self, value):
+        if value and not re.fullmatch(r"[0-9a-fA-F]{64}", value):
+            raise serializers.ValidationError("Expected a hex SHA-256 digest.")
+        return value.lower()
+
+    def validate_filename(self, value):
+        return value.replace("\\", "/").rsplit("/", 1)[-1]
@@ -0,0 +1,43 @@
+from django.apps import apps
+from django.db.models import FileField
+from django.db.models.signals import pre_save
+
+from uploads.storage import ContentAddressedStorage, content_blob_name
+
+# django_cleanup releases a row's old file only when the name changes. A new
+# upload with the content the row already points at gets the same blob name,
+# so saving it would take a reference that is never given back; it is kept
+# as the committed file instead.
+
+
+def blob_fields(model):
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if isinstance(field, FileField)
+        and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def keep_unchanged_blobs(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding:
+        return
+    for field in blob_fields(sender):
+        if update_fields is not None and field.name not in update_fields:
+            continue
+        file = getattr(instance, field.attname)
+        if not file or file._committed:
+            continue
+        stored = (
+            sender._base_manager.filter(pk=instance.pk)
+            .values_list(field.attname, flat=True)
+            .first()
+        )
+        if stored and content_blob_name(file.name, file.file) == stored:
+            file.name = stored
+            file._committed = True
+
+
+for model in apps.get_models():
+    if blob_fields(model):
+        pre_save.connect(keep_unchanged_blobs, sender=model)
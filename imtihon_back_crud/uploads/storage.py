@@ -0,0 +1,86 @@
+# storage.py
+
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import transaction
+from django.db.models import F
+
+from uploads.models import BlobModel
+
+BLOB_PREFIX = "cas"
+
+
+def blob_name(digest, ext=""):
+    """``cas/ab/cd/abcd...<ext>``: two levels of 256 directories each."""
+    return f"{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{ext.lower()}"
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_PREFIX + "/")
+
+
+def content_blob_name(name, content):
+    """The blob name ``content`` is stored under, keeping the extension of ``name``."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return blob_name(digest.hexdigest(), os.path.splitext(name)[1])
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores each distinct content once, named by its SHA-256, and counts the
+    file fields that point at it. Saving the same bytes again only bumps the
+    count; delete() (what django_cleanup calls when a row is deleted or its
+    file replaced) drops one reference and removes the file with the last.
+    A row saved again with the content it already holds keeps its reference
+    (uploads.signals), as django_cleanup releases nothing for an unchanged name.
+    Names outside ``cas/`` are files from before and behave as before.
+    """
+
+    def _save(self, name, content):
+        name = content_blob_name(name, content)
+
+        # the reference is taken first: a concurrent delete() of the same blob
+        # holds its row lock until the file is gone, so the exists() below
+        # either sees the old file still referenced or writes it again
+        self.reference(name, content.size)
+        if not self.exists(name):
+            super()._save(name, content)
+        return name
+
+    def reference(self, name, size=0):
+        """Add a reference to a blob, e.g. when a row takes another row's file."""
+        with transaction.atomic():
+            # an update that matched nothing lost the row to a delete() of the
+            # last reference (or it never existed): create it with ours
+            while not BlobModel.objects.filter(name=name).update(
+                refcount=F("refcount") + 1
+            ):
+                _, created = BlobModel.objects.get_or_create(
+                    name=name, defaults={"size": size, "refcount": 1}
+                )
+                if created:
+                    return
+
+    def delete(self, name):
+        if not is_blob(name):
+            return super().delete(name)
+        with transaction.atomic():
+            blob = BlobModel.objects.select_for_update().filter(name=name).first()
+            if blob is not None and blob.refcount > 1:
+                BlobModel.objects.filter(pk=blob.pk).update(
+                    refcount=F("refcount") - 1
+                )
+                return
+            if blob is not None:
+                blob.delete()
+            super().delete(name)
+
+
+def blob_storage():
+    """``storage=`` of the evidence and course file fields."""
+    return storages["blobs"]
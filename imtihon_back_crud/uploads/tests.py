@@ -0,0 +1,274 @@
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.testing import StudentFixtureMixin
+from course.models import (
+    CourseAttachmentsModel,
+    CourseLessonModel,
+    CourseModel,
+    CourseSectionModel,
+)
+from professors.models import ProfessorProfileModel
+from university.models import (
+    DepartmentModel,
+    FacultyModel,
+    SubjectModel,
+    UniversityModel,
+)
+from uploads.models import BlobModel, ResumableUploadModel
+from uploads.resumable import part_path
+from uploads.storage import blob_storage
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ContentAddressedStorageTestCase(TestCase):
+    def setUp(self):
+        self.storage = blob_storage()
+
+    def test_same_content_is_stored_once(self):
+        first = self.storage.save("a/lecture.PDF", ContentFile(b"notes"))
+        second = self.storage.save("b/copy.pdf", ContentFile(b"notes"))
+        other = self.storage.save("c/other.pdf", ContentFile(b"other notes"))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertRegex(first, r"^cas/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$")
+        self.assertEqual(BlobModel.objects.get(name=first).refcount, 2)
+        self.assertEqual(BlobModel.objects.get(name=first).size, 5)
+
+    def test_last_reference_removes_the_file(self):
+        name = self.storage.save("a.txt", ContentFile(b"x"))
+        self.storage.save("b.txt", ContentFile(b"x"))
+        self.storage.delete(name)
+        self.assertTrue(self.storage.exists(name))
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(BlobModel.objects.filter(name=name).exists())
+
+        # saved again after removal, it is written again
+        self.assertEqual(self.storage.save("c.txt", ContentFile(b"x")), name)
+        self.assertTrue(self.storage.exists(name))
+
+    def test_files_from_before_are_deleted_directly(self):
+        path = os.path.join(self.storage.location, "old.txt")
+        with open(path, "wb") as f:
+            f.write(b"old")
+        self.storage.delete("old.txt")
+        self.assertFalse(os.path.exists(path))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class BlobFieldReferenceTestCase(StudentFixtureMixin, APITestCase):
+    def test_saving_the_same_content_again_keeps_one_reference(self):
+        attachment = CourseAttachmentsModel.objects.create(
+            course=self.course, attachment_file=ContentFile(b"slides", "a.pdf")
+        )
+        name = attachment.attachment_file.name
+        attachment = CourseAttachmentsModel.objects.get(pk=attachment.pk)
+        attachment.attachment_file = ContentFile(b"slides", "again.pdf")
+        attachment.save()
+        self.assertEqual(attachment.attachment_file.name, name)
+        self.assertEqual(BlobModel.objects.get(name=name).refcount, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            attachment.delete()
+        self.assertFalse(BlobModel.objects.filter(name=name).exists())
+        self.assertFalse(blob_storage().exists(name))
+
+    def test_reference_recreates_a_blob_row_deleted_meanwhile(self):
+        storage = blob_storage()
+        name = storage.save("a.pdf", ContentFile(b"slides"))
+        update = QuerySet.update
+
+        def racing_update(queryset, **kwargs):
+            # a concurrent delete() of the last reference commits first
+            BlobModel.objects.filter(name=name).delete()
+            patched.side_effect = update
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(
+            QuerySet, "update", autospec=True, side_effect=racing_update
+        ) as patched:
+            storage.reference(name, 6)
+        self.assertEqual(BlobModel.objects.get(name=name).refcount, 1)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class MoveMediaToBlobsTestCase(StudentFixtureMixin, APITestCase):
+    def test_command_moves_old_files(self):
+        storage = blob_storage()
+        for name in ("one.pdf", "two.pdf"):
+            with open(os.path.join(storage.location, name), "wb") as f:
+                f.write(b"same slides")
+            CourseAttachmentsModel.objects.create(
+                course=self.course, attachment_file=name
+            )
+
+        out = StringIO()
+        call_command("move_media_to_blobs", stdout=out)
+
+        names = set(
+            CourseAttachmentsModel.objects.values_list("attachment_file", flat=True)
+        )
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertTrue(name.startswith("cas/"))
+        self.assertEqual(BlobModel.objects.get(name=name).refcount, 2)
+        self.assertFalse(storage.exists("one.pdf"))
+        self.assertIn("Moved 2 files", out.getvalue())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), RESUMABLE_UPLOAD_CHUNK_SIZE=4)
+class ResumableUploadTestCase(APITestCase):
+    DATA = b"0123456789"
+
+    def setUp(self):
+        owner = User.objects.create_user(username="owner", password="testpass")
+        self.university = UniversityModel.objects.create(user=owner, name="Uni")
+        faculty = FacultyModel.objects.create(
+            university=self.university, name="Faculty", code="F1"
+        )
+        department = DepartmentModel.objects.create(
+            faculty=faculty, name="Dept", code="D1"
+        )
+        subject = SubjectModel.objects.create(
+            university=self.university, department=department, name="Math", code="M1"
+        )
+        self.course = CourseModel.objects.create(
+            subject=subject, name="Course", description="desc"
+        )
+        section = CourseSectionModel.objects.create(
+            course=self.course, name="Section", description="desc"
+        )
+        self.lesson = CourseLessonModel.objects.create(
+            section=section, name="Lesson", text="t"
+        )
+        self.user = User.objects.create_user(username="prof", password="testpass")
+        ProfessorProfileModel.objects.create(
+            user=self.user, university=self.university, professor_id="P1", name="P"
+        )
+        self.client.force_authenticate(self.user)
+
+    def start(self, target="course_attachment", object_id=None, **extra):
+        data = {
+            "target": target,
+            "object_id": object_id or self.course.id,
+            "filename": "../slides.pdf",
+            "size": len(self.DATA),
+            **extra,
+        }
+        return self.client.post(reverse("resumable-upload-list"), data, format="json")
+
+    def send(self, upload_id, offset, chunk, checksum=None):
+        headers = {"HTTP_UPLOAD_OFFSET": str(offset)}
+        if checksum is not None:
+            headers["HTTP_CHUNK_SHA256"] = checksum
+        return self.client.patch(
+            reverse("resumable-upload-detail", args=[upload_id]),
+            chunk,
+            content_type="application/offset+octet-stream",
+            **headers,
+        )
+
+    def finalize(self, upload_id):
+        return self.client.post(reverse("resumable-upload-finalize", args=[upload_id]))
+
+    def test_chunks_are_assembled_into_an_attachment(self):
+        response = self.start(sha256=hashlib.sha256(self.DATA).hexdigest())
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["filename"], "slides.pdf")
+        upload_id = response.data["id"]
+        for offset in range(0, len(self.DATA), 4):
+            chunk = self.DATA[offset : offset + 4]
+            response = self.send(
+                upload_id, offset, chunk, hashlib.sha256(chunk).hexdigest()
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Upload-Offset"], "10")
+
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "done")
+        attachment = CourseAttachmentsModel.objects.get(pk=response.data["result_id"])
+        self.assertEqual(attachment.course, self.course)
+        self.assertTrue(attachment.attachment_file.name.endswith(".pdf"))
+        with attachment.attachment_file.open("rb") as f:
+            self.assertEqual(f.read(), self.DATA)
+        upload = ResumableUploadModel.objects.get(pk=upload_id)
+        self.assertFalse(os.path.exists(part_path(upload)))
+
+    def test_bad_chunks_leave_the_offset(self):
+        upload_id = self.start().data["id"]
+        self.assertEqual(self.send(upload_id, 0, b"0123").status_code, 200)
+
+        response = self.send(upload_id, 0, b"0123")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["offset"], 4)
+        response = self.send(upload_id, 4, b"4567", checksum="0" * 64)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.send(upload_id, 4, b"45678")
+        self.assertEqual(response.status_code, 413)
+        detail = reverse("resumable-upload-detail", args=[upload_id])
+        self.assertEqual(self.client.get(detail).data["offset"], 4)
+
+        # resumed from the offset the server reports
+        self.send(upload_id, 4, b"4567")
+        self.assertEqual(self.finalize(upload_id).status_code, 400)  # incomplete
+        self.send(upload_id, 8, b"89")
+        self.assertEqual(self.finalize(upload_id).status_code, 200)
+
+    def test_whole_file_checksum_is_verified(self):
+        upload_id = self.start(sha256="a" * 64).data["id"]
+        for offset in range(0, len(self.DATA), 4):
+            self.send(upload_id, offset, self.DATA[offset : offset + 4])
+        response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(CourseAttachmentsModel.objects.exists())
+
+    def test_lesson_video_target(self):
+        upload_id = self.start("lesson_video", self.lesson.id, size=4).data["id"]
+        self.send(upload_id, 0, b"\x00\x00\x00\x18")
+        response = self.finalize(upload_id)
+        self.assertEqual(response.data["result_id"], self.lesson.id)
+        self.lesson.refresh_from_db()
+        self.assertTrue(self.lesson.video.name.startswith("cas/"))
+        # queued for the transcoder
+        self.assertEqual(self.lesson.hls_status, "pending")
+
+    def test_only_staff_of_the_university(self):
+        student = User.objects.create_user(username="student", password="testpass")
+        self.client.force_authenticate(student)
+        self.assertEqual(self.start().status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(self.user)
+        response = self.start(object_id=self.course.id + 100)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        upload_id = self.start().data["id"]
+        self.client.force_authenticate(student)
+        response = self.send(upload_id, 0, b"0123")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_purge_stale_uploads(self):
+        upload_id = self.start().data["id"]
+        upload = ResumableUploadModel.objects.get(pk=upload_id)
+        ResumableUploadModel.objects.filter(pk=upload_id).update(
+            updated_at=timezone.now() - timedelta(days=2)
+        )
+        call_command("purge_stale_uploads", stdout=StringIO())
+        self.assertFalse(ResumableUploadModel.objects.exists())
+        self.assertFalse(os.path.exists(part_path(upload)))
@@ -0,0 +1,11 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from .views import ResumableUploadViewSet
+
+router = DefaultRouter()
+router.register(r"resumable", ResumableUploadViewSet, basename="resumable-upload")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
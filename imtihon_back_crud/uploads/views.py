@@ -0,0 +1,184 @@
+from django.conf import settings
+from django.db import transaction
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from uploads.models import ResumableUploadModel
+from uploads.resumable import (
+    ChunkError,
+    create_part,
+    finalize,
+    remove_part,
+    resolve_target,
+    write_chunk,
+)
+from uploads.serializers import ResumableUploadSerializer
+
+
+class ResumableUploadViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Resumable uploads of course attachments, lesson videos and assignment
+    attachments.
+
+    **Protocol:**
+    - `POST` creates the upload with the target, file name, size and an
+      optional SHA-256 of the whole file
+    - `PATCH` appends one chunk as the raw request body at `Upload-Offset`,
+      with an optional `Chunk-SHA256` header
+    - `GET` returns the offset to resume from after a dropped connection
+    - `POST .../finalize/` checks the file and attaches it to the target
+    """
+
+    serializer_class = ResumableUploadSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_value_regex = "[0-9a-f-]{36}"
+    # chunk bodies are read from the request stream, never parsed
+    parser_classes = (JSONParser,)
+
+    def get_queryset(self):
+        return ResumableUploadModel.objects.filter(created_by=self.request.user)
+
+    @swagger_auto_schema(
+        tags=["Uploads"],
+        operation_summary="Start a resumable upload",
+        operation_description="Professors and university owners upload into courses, lessons and assignments of their university. Send the chunks with PATCH, then finalize.",
+        responses={201: ResumableUploadSerializer, 404: "Target not found"},
+    )
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        if resolve_target(self.request.user, data["target"], data["object_id"]) is None:
+            raise NotFound("Target not found.")
+        create_part(serializer.save(created_by=self.request.user))
+
+    @swagger_auto_schema(
+        tags=["Uploads"],
+        operation_summary="Offset of a resumable upload",
+        responses={200: ResumableUploadSerializer},
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        tags=["Uploads"],
+        operation_summary="Upload one chunk",
+        operation_description="The raw request body is written at Upload-Offset, which must equal the current offset. A failed or mismatched chunk leaves the offset unchanged; resend it.",
+        manual_parameters=[
+            openapi.Parameter(
+                "Upload-Offset",
+                openapi.IN_HEADER,
+                description="Byte offset of this chunk",
+                type=openapi.TYPE_INTEGER,
+                required=True,
+            ),
+            openapi.Parameter(
+                "Chunk-SHA256",
+                openapi.IN_HEADER,
+                description="Hex SHA-256 of this chunk",
+                type=openapi.TYPE_STRING,
+            ),
+        ],
+        request_body=openapi.Schema(type=openapi.TYPE_STRING, format="binary"),
+        responses={
+            200: ResumableUploadSerializer,
+            400: "Chunk incomplete or checksum mismatch",
+            409: "Offset does not match; resume from the returned offset",
+            413: "Chunk larger than chunk_size or past the file size",
+        },
+    )
+    def partial_update(self, request, *args, **kwargs):
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "Upload-Offset and Content-Length are required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            # one chunk at a time per upload
+            queryset = self.get_queryset().select_for_update()
+            upload = queryset.filter(pk=kwargs["pk"]).first()
+            if upload is None:
+                raise NotFound()
+            if upload.status != "uploading" or offset != upload.offset:
+                return Response(
+                    {"detail": "Offset mismatch.", "offset": upload.offset},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            if (
+                length > settings.RESUMABLE_UPLOAD_CHUNK_SIZE
+                or offset + length > upload.size
+            ):
+                return Response(
+                    {"detail": "Chunk too large.", "offset": upload.offset},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
+            checksum = request.headers.get("Chunk-SHA256")
+            try:
+                upload.offset += write_chunk(upload, request.stream, length, checksum)
+            except ChunkError as e:
+                return Response(
+                    {"detail": str(e), "offset": upload.offset},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            upload.save(update_fields=["offset", "updated_at"])
+        return Response(
+            self.get_serializer(upload).data,
+            headers={"Upload-Offset": str(upload.offset)},
+        )
+
+    @swagger_auto_schema(
+        tags=["Uploads"],
+        operation_summary="Cancel a resumable upload",
+        responses={204: "Upload and its received chunks deleted"},
+    )
+    def destroy(self, request, *args, **kwargs):
+        upload = self.get_object()
+        remove_part(upload)
+        upload.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @swagger_auto_schema(
+        methods=["post"],
+        tags=["Uploads"],
+        operation_summary="Finalize a resumable upload",
+        operation_description="Checks the size and the SHA-256 given at start, then moves the file into the course attachment, lesson video or assignment attachment. result_id is the attachment or lesson id.",
+        request_body=openapi.Schema(type=openapi.TYPE_OBJECT, properties={}),
+        responses={
+            200: ResumableUploadSerializer,
+            400: "File incomplete or checksum mismatch",
+            404: "Target no longer exists",
+        },
+    )
+    @action(detail=True, methods=["post"])
+    def finalize(self, request, pk=None):
+        with transaction.atomic():
+            upload = self.get_queryset().select_for_update().filter(pk=pk).first()
+            if upload is None:
+                raise NotFound()
+            if upload.status == "done":
+                return Response(self.get_serializer(upload).data)
+            target = resolve_target(request.user, upload.target, upload.object_id)
+            if target is None:
+                raise NotFound("Target not found.")
+            try:
+                upload.result_id = finalize(upload, target)
+            except ChunkError as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            upload.status = "done"
+            upload.save(update_fields=["status", "result_id", "updated_at"])
+        return Response(self.get_serializer(upload).data)